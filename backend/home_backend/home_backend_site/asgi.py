@@ -2,6 +2,7 @@
 ASGI config for home_backend_site project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+`GET /api/realtime/events/` (Server-Sent Events) is answered by realtime.asgi in front of Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -13,4 +14,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'home_backend_site.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from realtime.asgi import with_event_stream  # noqa: E402  (needs the app registry loaded)
+
+application = with_event_stream(django_application)
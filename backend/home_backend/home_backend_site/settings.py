@@ -49,6 +49,8 @@ INSTALLED_APPS = [
     'messaging',
     'notifications',
     'bookings',
+    'jobs',
+    'realtime',
 ]
 
 MIDDLEWARE = [
@@ -135,10 +137,61 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    # Property images are named by content hash: duplicates share a file, names never change meaning
+    # (served with far-future cache headers). `manage.py sweep_image_blobs` deletes unused files.
+    'property_images': {'BACKEND': 'properties.storage.ContentAddressedStorage'},
+}
+IMAGE_BLOB_SWEEP_GRACE_HOURS = 24  # unreferenced blobs younger than this are kept
+# Largest image the variant renderer will decode, counted after JPEG draft scaling (a 48 MP
+# photo decodes at 12 MP). Uploads above it are rejected with 400.
+PROPERTY_IMAGE_MAX_PIXELS = 40_000_000
+PROPERTY_IMAGE_MAX_BYTES = 20 * 1024 * 1024  # per entry of a bulk-upload zip
+PROPERTY_IMAGE_UPLOAD_THREADS = 4  # files checked and stored in parallel by the bulk upload
+# Stream every upload to a temp file instead of holding small ones in memory; storage then
+# moves the file into place without another copy.
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
 # Email (OTP / password reset). Console backend prints messages when DEBUG is True.
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@estatery.local'
 
+# Cache (dashboard aggregates). LocMem is per-process; use Redis/Memcached when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'estatery-default',
+    }
+}
+DASHBOARD_CACHE_TIMEOUT = 300  # seconds; writes bump a per-host version, this is only a backstop
+
+# Background jobs (emails, notifications). Run `python manage.py run_worker` alongside the web
+# process; with JOBS_EAGER the jobs run in-process after commit instead (no worker needed).
+JOBS_EAGER = DEBUG
+JOBS_WORKER_CONCURRENCY = 4
+JOBS_POLL_INTERVAL = 1.0  # seconds an idle worker thread sleeps
+JOBS_LOCK_TIMEOUT = 600  # seconds before a running job whose worker vanished is requeued
+JOBS_RETENTION_DAYS = 7  # succeeded jobs are purged after this
+
+# Realtime events (GET /api/realtime/events/, served by the ASGI app). Notifications are published
+# from `run_worker` as well as from requests, so the broker must reach other processes: the default
+# DatabaseBroker polls a table on any database; in production on PostgreSQL use
+# 'realtime.brokers.PostgresNotifyBroker'. 'realtime.brokers.InProcessBroker' only reaches streams
+# held by the publishing process.
+REALTIME_BROKER = 'realtime.brokers.DatabaseBroker'
+REALTIME_POLL_SECONDS = 1.0  # DatabaseBroker: how often each ASGI process reads new events
+REALTIME_EVENT_RETENTION_SECONDS = 60  # DatabaseBroker: published rows are purged after this
+REALTIME_HEARTBEAT_SECONDS = 20
+REALTIME_QUEUE_SIZE = 100  # events buffered per connection before the oldest are dropped
+REALTIME_TICKET_SECONDS = 30  # lifetime of a stream ticket (POST /api/realtime/tickets/); cache-backed
+
+# Cold storage (`python manage.py archive_history`, e.g. nightly from cron): messages of
+# conversations idle this long, and read notifications this old, move to compressed archive tables.
+ARCHIVE_MESSAGES_AFTER_DAYS = 180
+ARCHIVE_NOTIFICATIONS_AFTER_DAYS = 90
+
 # Default primary key field type to use custom user model
 AUTH_USER_MODEL = 'users.CustomUser'
 
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.views.static import serve
 
 from drf_spectacular.views import (
     SpectacularAPIView,
@@ -9,6 +10,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from properties.storage import IMMUTABLE_CACHE_CONTROL, is_content_addressed
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -25,10 +28,19 @@ urlpatterns = [
     path('api/auth/', include('users.urls')),
     path('api/messages/', include('messaging.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/realtime/', include('realtime.urls')),
     path('api/', include('properties.urls')),
 ]
 
 
+def serve_media(request, path, document_root=None, show_indexes=False):
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if is_content_addressed(path):
+        # Content-addressed names always hold the same bytes.
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
 # Serve media files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task_name", "status", "attempts", "max_attempts", "run_at", "locked_by", "created_at")
+    list_filter = ("status", "task_name")
+    search_fields = ("task_name", "dedupe_key", "last_error")
+    readonly_fields = ("created_at", "finished_at", "locked_at", "locked_by")
+    date_hierarchy = "created_at"
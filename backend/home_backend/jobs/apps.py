@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+    verbose_name = "Background jobs"
+
+    def ready(self):
+        # Register @task functions from every app's tasks.py so the worker can resolve them by name.
+        from django.utils.module_loading import autodiscover_modules
+
+        autodiscover_modules("tasks")
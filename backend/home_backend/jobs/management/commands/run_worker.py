@@ -0,0 +1,131 @@
+"""
+Run background jobs queued with jobs.queue (emails, in-app notifications, …).
+
+Usage (from backend/home_backend):
+  python manage.py run_worker
+  python manage.py run_worker --concurrency 8 --poll-interval 0.5
+  python manage.py run_worker --burst        # drain due jobs, then exit
+
+Several worker processes (or hosts) can share one database; a job is only ever claimed once.
+"""
+
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection
+
+from jobs.queue import claim_next, execute, purge_finished, requeue_stale
+
+logger = logging.getLogger(__name__)
+
+# How often the supervisor thread recovers stale locks and purges old rows.
+_HOUSEKEEPING_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "JOBS_WORKER_CONCURRENCY", 4),
+            help="Jobs run in parallel (threads).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=getattr(settings, "JOBS_POLL_INTERVAL", 1.0),
+            help="Seconds an idle thread waits before checking the queue again.",
+        )
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due.")
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        poll = options["poll_interval"]
+        if concurrency < 1:
+            raise CommandError("--concurrency must be >= 1.")
+        if poll <= 0:
+            raise CommandError("--poll-interval must be > 0.")
+
+        lock_timeout = timedelta(seconds=getattr(settings, "JOBS_LOCK_TIMEOUT", 600))
+        retention = timedelta(days=getattr(settings, "JOBS_RETENTION_DAYS", 7))
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        stop = threading.Event()
+        stats = {"succeeded": 0, "failed": 0}
+        stats_lock = threading.Lock()
+
+        def on_signal(signum, frame):
+            self.stdout.write("Stopping after running jobs finish…")
+            stop.set()
+
+        signal.signal(signal.SIGINT, on_signal)
+        signal.signal(signal.SIGTERM, on_signal)
+
+        def loop(n):
+            name = f"{worker_id}/{n}"
+            try:
+                while not stop.is_set():
+                    close_old_connections()
+                    try:
+                        job = claim_next(name)
+                    except DatabaseError:
+                        logger.exception("Worker %s could not claim a job", name)
+                        stop.wait(poll)
+                        continue
+                    if job is None:
+                        if options["burst"]:
+                            return
+                        stop.wait(poll)
+                        continue
+                    try:
+                        ok = execute(job)
+                    except DatabaseError:
+                        # Outcome not recorded; once its lock goes stale the job is requeued, or failed if
+                        # that was its last attempt.
+                        logger.exception("Worker %s could not record job #%s", name, job.pk)
+                        ok = False
+                    with stats_lock:
+                        stats["succeeded" if ok else "failed"] += 1
+            finally:
+                connection.close()
+
+        if getattr(settings, "REALTIME_BROKER", "") == "realtime.brokers.InProcessBroker":
+            logger.warning(
+                "REALTIME_BROKER is InProcessBroker: realtime events published by jobs reach no stream. "
+                "Use DatabaseBroker or PostgresNotifyBroker."
+            )
+        requeued = requeue_stale(lock_timeout)
+        purge_finished(retention)
+        self.stdout.write(
+            f"Worker {worker_id} started with {concurrency} thread(s); requeued {requeued} stale job(s)."
+        )
+        started = time.monotonic()
+        threads = [threading.Thread(target=loop, args=(i,), daemon=True) for i in range(concurrency)]
+        for th in threads:
+            th.start()
+
+        last_housekeeping = time.monotonic()
+        while any(th.is_alive() for th in threads):
+            stop.wait(1.0)
+            if not stop.is_set() and time.monotonic() - last_housekeeping >= _HOUSEKEEPING_SECONDS:
+                close_old_connections()
+                requeue_stale(lock_timeout)
+                purge_finished(retention)
+                last_housekeeping = time.monotonic()
+        for th in threads:
+            th.join()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Worker stopped after {elapsed:.1f}s. Succeeded={stats['succeeded']}, Failed={stats['failed']}"
+            )
+        )
@@ -0,0 +1,52 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    One queued call of a registered task (see jobs.queue). Rows are written in the caller's
+    transaction, so a job only becomes visible to `run_worker` once that transaction commits.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    task_name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True, help_text="{'args': [...], 'kwargs': {...}}")
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    dedupe_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        help_text="While a job with this key is queued or running, enqueueing the same key is a no-op.",
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # claim: next due queued job
+            models.Index(fields=["status", "run_at"]),
+            # retention purge of finished jobs
+            models.Index(fields=["status", "finished_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status__in=["queued", "running"]),
+                name="jobs_job_active_dedupe_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} #{self.pk} ({self.status})"
@@ -0,0 +1,251 @@
+"""
+Database-backed background jobs (no external broker).
+
+Declare a task once and enqueue calls to it from request code:
+
+    @task("notifications.send_email", max_attempts=5)
+    def send_email(*, subject, message, recipient_list): ...
+
+    send_email.enqueue(subject=..., message=..., recipient_list=[...], dedupe_key="booking:12:confirmed")
+
+`enqueue` writes a Job row inside the caller's transaction, so the job is dropped if the request
+rolls back and is only visible to `manage.py run_worker` after commit. Arguments must be
+JSON-serializable (pass ids, not model instances). With JOBS_EAGER = True the task runs
+in-process right after commit instead (development without a worker); a `dedupe_key` still
+writes a running Job row, so duplicates are dropped the same way until the inline run finishes.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_DEFAULT_MAX_ATTEMPTS = 5
+JOB_DEFAULT_BACKOFF_SECONDS = 30
+JOB_MAX_BACKOFF_SECONDS = 6 * 60 * 60
+_ERROR_MAX_CHARS = 4000
+
+_REGISTRY: dict[str, "Task"] = {}
+
+
+class Task:
+    def __init__(self, func, name: str, max_attempts: int, backoff_seconds: int):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<Task {self.name}>"
+
+    def enqueue(self, *args, dedupe_key: str | None = None, delay: timedelta | None = None, **kwargs):
+        return enqueue(self, args, kwargs, dedupe_key=dedupe_key, delay=delay)
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        """Exponential backoff with ±20% jitter: base, 2×base, 4×base, … capped at 6 hours."""
+        seconds = min(self.backoff_seconds * 2 ** max(attempts - 1, 0), JOB_MAX_BACKOFF_SECONDS)
+        return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def task(name: str | None = None, *, max_attempts: int = JOB_DEFAULT_MAX_ATTEMPTS,
+         backoff_seconds: int = JOB_DEFAULT_BACKOFF_SECONDS):
+    """Register `func` under `name` (default: module.qualname) and give it `.enqueue()`."""
+
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__qualname__}"
+        if task_name in _REGISTRY and _REGISTRY[task_name].func is not func:
+            raise ValueError(f"Task name {task_name!r} is already registered.")
+        registered = Task(func, task_name, max_attempts, backoff_seconds)
+        _REGISTRY[task_name] = registered
+        return registered
+
+    return decorator
+
+
+def get_task(name: str) -> Task | None:
+    return _REGISTRY.get(name)
+
+
+def _eager() -> bool:
+    return getattr(settings, "JOBS_EAGER", False)
+
+
+def _run_inline(t: Task, args, kwargs, job: Job | None = None) -> None:
+    try:
+        t.func(*args, **kwargs)
+    except Exception:
+        logger.exception("Inline job %s failed", t.name)
+        if job is not None:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.FAILED,
+                finished_at=timezone.now(),
+                locked_by="",
+                locked_at=None,
+                last_error=traceback.format_exc()[-_ERROR_MAX_CHARS:],
+            )
+        return
+    if job is not None:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.SUCCEEDED,
+            finished_at=timezone.now(),
+            payload={},
+            locked_by="",
+            locked_at=None,
+        )
+
+
+def enqueue(t: Task, args=(), kwargs=None, *, dedupe_key: str | None = None,
+            delay: timedelta | None = None) -> Job | None:
+    """
+    Queue one call of `t`. Returns the Job, or None when it runs inline (JOBS_EAGER) or a queued /
+    running job with the same `dedupe_key` already exists; the key is honoured in both modes.
+    """
+    kwargs = kwargs or {}
+    eager = _eager()
+    if eager and not dedupe_key:
+        transaction.on_commit(lambda: _run_inline(t, args, kwargs))
+        return None
+
+    job = Job(
+        task_name=t.name,
+        payload={"args": list(args), "kwargs": kwargs},
+        dedupe_key=dedupe_key or None,
+        max_attempts=t.max_attempts,
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+    if eager:
+        # Held as running (never claimed by a worker) so the dedupe constraint applies until the
+        # inline run after commit finishes.
+        job.status = Job.Status.RUNNING
+        job.attempts = 1
+        job.locked_by = "eager"
+        job.locked_at = timezone.now()
+    if not dedupe_key:
+        job.save()
+        return job
+    # Savepoint so a duplicate key does not break the caller's transaction.
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    if eager:
+        transaction.on_commit(lambda: _run_inline(t, args, kwargs, job))
+        return None
+    return job
+
+
+# ----- worker side -----
+
+def claim_next(worker_id: str, *, candidates: int = 5) -> Job | None:
+    """
+    Atomically take the next due queued job: SKIP LOCKED where the database supports it, then a
+    status-guarded UPDATE so two workers can never run the same row.
+    """
+    now = timezone.now()
+    qs = Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now).order_by("run_at", "id")
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    # Without row locks (SQLite) a read-then-write transaction only adds lock-upgrade failures;
+    # the guarded UPDATE alone decides who wins.
+    with transaction.atomic() if skip_locked else nullcontext():
+        if skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        for job_id in list(qs.values_list("id", flat=True)[:candidates]):
+            claimed = Job.objects.filter(pk=job_id, status=Job.Status.QUEUED).update(
+                status=Job.Status.RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+            if claimed:
+                return Job.objects.get(pk=job_id)
+    return None
+
+
+def execute(job: Job) -> bool:
+    """Run a claimed job and record the outcome. Returns True on success."""
+    t = get_task(job.task_name)
+    try:
+        if t is None:
+            raise LookupError(f"No task registered as {job.task_name!r}.")
+        t.func(*job.payload.get("args", []), **job.payload.get("kwargs", {}))
+    except Exception:
+        error = traceback.format_exc()[-_ERROR_MAX_CHARS:]
+        now = timezone.now()
+        if t is not None and job.attempts < job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.QUEUED,
+                run_at=now + t.retry_delay(job.attempts),
+                locked_by="",
+                locked_at=None,
+                last_error=error,
+            )
+            logger.warning("Job %s #%s failed (attempt %s/%s), retrying", job.task_name, job.pk,
+                           job.attempts, job.max_attempts)
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.FAILED,
+                finished_at=now,
+                locked_by="",
+                locked_at=None,
+                last_error=error,
+            )
+            logger.error("Job %s #%s failed permanently after %s attempt(s)", job.task_name, job.pk,
+                         job.attempts)
+        return False
+    # Arguments are not needed once the job is done.
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.SUCCEEDED,
+        finished_at=timezone.now(),
+        payload={},
+        locked_by="",
+        locked_at=None,
+    )
+    return True
+
+
+def requeue_stale(lock_timeout: timedelta) -> int:
+    """
+    Put back jobs whose worker died mid-run (locked longer than `lock_timeout`). Jobs that have
+    used up their attempts are failed instead, so one that keeps killing its worker stops.
+    Returns the number requeued.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - lock_timeout)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        finished_at=now,
+        locked_by="",
+        locked_at=None,
+        last_error="Worker stopped responding on the last attempt.",
+    )
+    if failed:
+        logger.error("Failed %s stale job(s) that had no attempts left", failed)
+    return stale.filter(attempts__lt=F("max_attempts")).update(
+        status=Job.Status.QUEUED,
+        run_at=now,
+        locked_by="",
+        locked_at=None,
+    )
+
+
+def purge_finished(older_than: timedelta) -> int:
+    """Delete succeeded jobs finished before now - `older_than`. Failed jobs are kept for review."""
+    cutoff = timezone.now() - older_than
+    deleted, _ = Job.objects.filter(status=Job.Status.SUCCEEDED, finished_at__lt=cutoff).delete()
+    return deleted
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Conversation, Message
+from .models import ArchivedMessageChunk, Conversation, Message
 
 
 class MessageInline(admin.TabularInline):
@@ -11,9 +11,11 @@ class MessageInline(admin.TabularInline):
 
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
-    list_display = ("id", "user_a", "user_b", "updated_at")
+    list_display = ("id", "user_a", "user_b", "last_message_at", "updated_at")
+    list_select_related = ("user_a", "user_b")
     search_fields = ("user_a__username", "user_a__email", "user_b__username", "user_b__email")
     raw_id_fields = ("user_a", "user_b")
+    readonly_fields = ("last_message", "last_message_preview", "last_sender", "last_message_at")
     date_hierarchy = "updated_at"
     inlines = [MessageInline]
 
@@ -29,3 +31,18 @@ class MessageAdmin(admin.ModelAdmin):
     @admin.display(description="Body")
     def body_preview(self, obj):
         return (obj.body[:60] + "…") if len(obj.body) > 60 else obj.body
+
+
+@admin.register(ArchivedMessageChunk)
+class ArchivedMessageChunkAdmin(admin.ModelAdmin):
+    list_display = ("id", "conversation", "message_count", "first_created_at", "last_created_at", "archived_at")
+    raw_id_fields = ("conversation",)
+    exclude = ("payload",)
+    readonly_fields = (
+        "first_message_id",
+        "last_message_id",
+        "first_created_at",
+        "last_created_at",
+        "message_count",
+        "archived_at",
+    )
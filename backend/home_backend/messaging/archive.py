@@ -0,0 +1,133 @@
+"""
+Cold storage for the history of inactive conversations.
+
+`archive_messages` moves the messages of conversations with no activity since a cutoff into
+ArchivedMessageChunk rows (zlib-compressed JSON, see notifications.archive), at most `batch_size`
+messages per chunk and per transaction. The conversation's last message stays in `Message`, so
+the inbox preview, read cursors and polling work unchanged, and archived messages are always
+older than the ones left behind. messaging.history reads the archive only when a client pages
+back past the last live message. Archived messages are not covered by message search.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.utils.dateparse import parse_datetime
+
+from notifications.archive import ARCHIVE_BATCH_SIZE, pack_rows, rows_before
+
+from .models import ArchivedMessageChunk, Conversation, Message
+
+_CONVERSATION_BATCH = 1000
+
+
+def _archive_conversation(
+    conversation_id: int, keep_id: int | None, older_than: datetime, batch_size: int, stats: dict
+) -> None:
+    if keep_id is None:
+        return
+    # Only messages older than the kept last one: a reply sent meanwhile is never a candidate.
+    candidates = Message.objects.filter(
+        conversation_id=conversation_id, pk__lt=keep_id, created_at__lt=older_than
+    )
+    while True:
+        with transaction.atomic():
+            # Re-check under the row lock that the conversation is still idle; a new message
+            # moves last_message on and the rest of its history stays live.
+            current = (
+                Conversation.objects.select_for_update()
+                .filter(pk=conversation_id)
+                .values_list("last_message_id", flat=True)
+                .first()
+            )
+            if current != keep_id:
+                return
+            rows = list(
+                candidates.select_for_update()
+                .order_by("created_at", "id")
+                .values("id", "sender_id", "body", "created_at")[:batch_size]
+            )
+            if not rows:
+                return
+            payload = pack_rows(rows)
+            ArchivedMessageChunk.objects.create(
+                conversation_id=conversation_id,
+                first_message_id=min(r["id"] for r in rows),
+                last_message_id=max(r["id"] for r in rows),
+                first_created_at=rows[0]["created_at"],
+                last_created_at=rows[-1]["created_at"],
+                message_count=len(rows),
+                payload=payload,
+            )
+            # Raw delete: a normal one would run the per-row post_delete refresh for messages
+            # that are never the conversation's last one (all are older than keep_id).
+            Message.objects.filter(pk__in=[r["id"] for r in rows])._raw_delete(Message.objects.db)
+        stats["messages"] += len(rows)
+        stats["chunks"] += 1
+        stats["stored_bytes"] += len(payload)
+
+
+def archive_messages(
+    *, older_than: datetime, batch_size: int = ARCHIVE_BATCH_SIZE, dry_run: bool = False
+) -> dict:
+    """Archive all but the last message of conversations whose last message predates `older_than`."""
+    inactive = Conversation.objects.filter(last_message_at__lt=older_than)
+    if dry_run:
+        count = (
+            Message.objects.filter(
+                conversation__in=inactive,
+                pk__lt=F("conversation__last_message_id"),
+                created_at__lt=older_than,
+            ).count()
+        )
+        return {"conversations": inactive.count(), "messages": count, "chunks": 0, "stored_bytes": 0}
+
+    stats = {"conversations": 0, "messages": 0, "chunks": 0, "stored_bytes": 0}
+    last_id = 0
+    while True:
+        batch = list(
+            inactive.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", "last_message_id")[:_CONVERSATION_BATCH]
+        )
+        if not batch:
+            return stats
+        last_id = batch[-1][0]
+        for conversation_id, keep_id in batch:
+            before = stats["messages"]
+            _archive_conversation(conversation_id, keep_id, older_than, batch_size, stats)
+            stats["conversations"] += stats["messages"] > before
+
+
+def has_archived_messages(conversation) -> bool:
+    return ArchivedMessageChunk.objects.filter(conversation=conversation).exists()
+
+
+def archived_messages_before(conversation, *, before_id: int, limit: int):
+    """
+    (unsaved Message instances oldest first, has_more): the archived messages just before
+    `before_id`, with `sender` set so MessageSerializer needs no further queries.
+    """
+    rows, has_more = rows_before(
+        ArchivedMessageChunk.objects.filter(conversation=conversation),
+        first_id_field="first_message_id",
+        last_id_field="last_message_id",
+        before_id=before_id,
+        limit=limit,
+    )
+    senders = get_user_model().objects.in_bulk({r["sender_id"] for r in rows})
+    messages = [
+        Message(
+            id=r["id"],
+            conversation=conversation,
+            sender=senders.get(r["sender_id"]),
+            body=r["body"],
+            created_at=parse_datetime(r["created_at"]),
+        )
+        for r in reversed(rows)
+    ]
+    return messages, has_more
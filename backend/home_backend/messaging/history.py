@@ -0,0 +1,83 @@
+"""
+Keyset pages of a conversation's messages, ordered by (created_at, id).
+
+`before_id` walks back through history, `after_id` returns only what arrived after the newest
+message a client already has (polling), and no anchor returns the latest page. Anchors are message
+ids; the anchor's `created_at` is looked up in a subquery scoped to the conversation, so an id from
+another thread simply matches nothing.
+
+Paging back past the oldest live message continues into the conversation's archive
+(messaging.archive); the archive is only read for `before_id` pages that run out of live rows.
+"""
+
+from __future__ import annotations
+
+from django.db.models import Q, Subquery
+from rest_framework.exceptions import ParseError
+
+from .archive import archived_messages_before, has_archived_messages
+from .models import Message
+
+MESSAGES_DEFAULT_LIMIT = 50
+MESSAGES_MAX_LIMIT = 200
+
+
+def _positive_int(query_params, name):
+    raw = query_params.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ParseError(f'"{name}" must be an integer.')
+    if value < 1:
+        raise ParseError(f'"{name}" must be >= 1.')
+    return value
+
+
+def parse_message_page_params(query_params) -> dict:
+    """Validate `before_id` / `after_id` / `limit`; raises ParseError (400 with `detail`)."""
+    before_id = _positive_int(query_params, "before_id")
+    after_id = _positive_int(query_params, "after_id")
+    if before_id and after_id:
+        raise ParseError('Use either "before_id" or "after_id", not both.')
+    limit = _positive_int(query_params, "limit") or MESSAGES_DEFAULT_LIMIT
+    return {"before_id": before_id, "after_id": after_id, "limit": min(limit, MESSAGES_MAX_LIMIT)}
+
+
+def message_page(conversation, params: dict):
+    """
+    Returns (messages oldest first, has_more). `has_more` means older messages exist beyond the
+    page for `before_id` / latest pages, and newer ones for `after_id` pages.
+    """
+    qs = Message.objects.filter(conversation=conversation).select_related("sender")
+    anchor_id = params["before_id"] or params["after_id"]
+    if anchor_id:
+        anchor_at = Subquery(
+            Message.objects.filter(conversation=conversation, pk=anchor_id).values("created_at")[:1]
+        )
+        if params["after_id"]:
+            qs = qs.filter(Q(created_at__gt=anchor_at) | Q(created_at=anchor_at, id__gt=anchor_id))
+        else:
+            qs = qs.filter(Q(created_at__lt=anchor_at) | Q(created_at=anchor_at, id__lt=anchor_id))
+
+    limit = params["limit"]
+    if params["after_id"]:
+        rows = list(qs.order_by("created_at", "id")[: limit + 1])
+        return rows[:limit], len(rows) > limit
+    rows = list(qs.order_by("-created_at", "-id")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    if not has_more:
+        # Out of live rows: archived messages are all older than the live ones.
+        if params["before_id"] and len(rows) < limit:
+            older, has_more = archived_messages_before(
+                conversation,
+                before_id=rows[0].pk if rows else params["before_id"],
+                limit=limit - len(rows),
+            )
+            rows = older + rows
+        else:
+            has_more = has_archived_messages(conversation)
+    return rows, has_more
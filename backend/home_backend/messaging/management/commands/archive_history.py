@@ -0,0 +1,59 @@
+"""
+Move cold rows out of the hot tables: messages of conversations with no activity for
+ARCHIVE_MESSAGES_AFTER_DAYS, and read notifications older than ARCHIVE_NOTIFICATIONS_AFTER_DAYS,
+into compressed archive chunks (messaging.archive, notifications.archive). Each batch is its own
+short transaction, so the command can be stopped and re-run at any time.
+
+Usage (from backend/home_backend):
+  python manage.py archive_history
+  python manage.py archive_history --dry-run
+  python manage.py archive_history --message-days 365 --notification-days 30 --batch-size 1000
+  python manage.py archive_history --skip-messages
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from messaging.archive import archive_messages
+from notifications.archive import ARCHIVE_BATCH_SIZE, archive_notifications
+
+
+class Command(BaseCommand):
+    help = "Archive messages of inactive conversations and old read notifications into compressed chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--message-days", type=int, default=settings.ARCHIVE_MESSAGES_AFTER_DAYS)
+        parser.add_argument("--notification-days", type=int, default=settings.ARCHIVE_NOTIFICATIONS_AFTER_DAYS)
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Rows per chunk and transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Count what would be archived only.")
+        parser.add_argument("--skip-messages", action="store_true")
+        parser.add_argument("--skip-notifications", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1.")
+        if options["message_days"] < 1 or options["notification_days"] < 1:
+            raise CommandError("--message-days and --notification-days must be >= 1.")
+        now = timezone.now()
+        jobs = []
+        if not options["skip_messages"]:
+            jobs.append(("Messages", archive_messages, now - timedelta(days=options["message_days"])))
+        if not options["skip_notifications"]:
+            jobs.append(
+                ("Notifications", archive_notifications, now - timedelta(days=options["notification_days"]))
+            )
+        for label, archive, cutoff in jobs:
+            started = time.monotonic()
+            stats = archive(older_than=cutoff, batch_size=options["batch_size"], dry_run=options["dry_run"])
+            elapsed = time.monotonic() - started
+            summary = ", ".join(f"{name}={n}" for name, n in stats.items())
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{label} archive {'dry run ' if options['dry_run'] else ''}done in {elapsed:.2f}s "
+                    f"(before {cutoff:%Y-%m-%d}). {summary}"
+                )
+            )
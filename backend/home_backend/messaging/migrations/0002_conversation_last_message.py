@@ -0,0 +1,79 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+PREVIEW_CHARS = 200
+
+
+def fill_last_message(apps, schema_editor):
+    """Copy the newest message of every existing conversation onto the conversation row."""
+    Conversation = apps.get_model("messaging", "Conversation")
+    Message = apps.get_model("messaging", "Message")
+    batch = []
+    for conv_id in Conversation.objects.values_list("pk", flat=True).iterator():
+        m = (
+            Message.objects.filter(conversation_id=conv_id)
+            .order_by("-created_at", "-id")
+            .only("pk", "body", "sender_id", "created_at")
+            .first()
+        )
+        if not m:
+            continue
+        batch.append(
+            Conversation(
+                pk=conv_id,
+                last_message_id=m.pk,
+                last_message_preview=m.body[:PREVIEW_CHARS] + ("…" if len(m.body) > PREVIEW_CHARS else ""),
+                last_sender_id=m.sender_id,
+                last_message_at=m.created_at,
+            )
+        )
+        if len(batch) >= 500:
+            Conversation.objects.bulk_update(
+                batch, ["last_message", "last_message_preview", "last_sender", "last_message_at"]
+            )
+            batch = []
+    if batch:
+        Conversation.objects.bulk_update(batch, ["last_message", "last_message_preview", "last_sender", "last_message_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=201),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user_a', '-updated_at'], name='conv_user_a_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user_b', '-updated_at'], name='conv_user_b_updated_idx'),
+        ),
+        migrations.RunPython(fill_last_message, migrations.RunPython.noop),
+    ]
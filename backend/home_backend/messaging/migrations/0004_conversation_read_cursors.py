@@ -0,0 +1,80 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:52
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def start_read_cursors(apps, schema_editor):
+    """
+    History counts as read, except messages since the oldest unread MESSAGE notification of that
+    thread (the only unread signal that existed before read cursors).
+    """
+    Conversation = apps.get_model("messaging", "Conversation")
+    Message = apps.get_model("messaging", "Message")
+    Notification = apps.get_model("notifications", "Notification")
+    unread_since = {
+        (row["user_id"], row["related_conversation_id"]): row["since"]
+        for row in Notification.objects.filter(
+            notification_type="message",
+            read_at__isnull=True,
+            related_conversation_id__isnull=False,
+        )
+        .values("user_id", "related_conversation_id")
+        .annotate(since=Min("created_at"))
+    }
+    batch = []
+    fields = ["user_a_read_up_to", "user_b_read_up_to", "user_a_unread_count", "user_b_unread_count"]
+    for conv in Conversation.objects.exclude(last_message=None).only("pk", "user_a_id", "user_b_id", "last_message_id").iterator():
+        for side, user_id, other_id in (
+            ("user_a", conv.user_a_id, conv.user_b_id),
+            ("user_b", conv.user_b_id, conv.user_a_id),
+        ):
+            since = unread_since.get((user_id, conv.pk))
+            if since is None:
+                setattr(conv, f"{side}_read_up_to", conv.last_message_id)
+                continue
+            msgs = Message.objects.filter(conversation_id=conv.pk)
+            setattr(
+                conv,
+                f"{side}_read_up_to",
+                msgs.filter(created_at__lt=since).order_by("-created_at", "-id").values_list("pk", flat=True).first(),
+            )
+            setattr(conv, f"{side}_unread_count", msgs.filter(created_at__gte=since, sender_id=other_id).count())
+        batch.append(conv)
+        if len(batch) >= 500:
+            Conversation.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Conversation.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_message_keyset_index'),
+        ('notifications', '0007_alter_notification_notification_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='user_a_read_up_to',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='user_a_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='user_b_read_up_to',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='user_b_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(start_read_cursors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:10
+
+from django.db import migrations
+
+# Kept in the database and maintained by it (see messaging.search): SQLite gets an
+# external-content FTS5 table synced by triggers, PostgreSQL a generated tsvector column.
+SQLITE_CREATE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS messaging_message_fts USING fts5(
+        body, content='messaging_message', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS messaging_message_fts_ai AFTER INSERT ON messaging_message BEGIN
+        INSERT INTO messaging_message_fts(rowid, body) VALUES (new.id, new.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messaging_message_fts_ad AFTER DELETE ON messaging_message BEGIN
+        INSERT INTO messaging_message_fts(messaging_message_fts, rowid, body) VALUES ('delete', old.id, old.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messaging_message_fts_au AFTER UPDATE OF body ON messaging_message BEGIN
+        INSERT INTO messaging_message_fts(messaging_message_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO messaging_message_fts(rowid, body) VALUES (new.id, new.body);
+    END""",
+    # Index the messages that already exist.
+    "INSERT INTO messaging_message_fts(messaging_message_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS messaging_message_fts_ai",
+    "DROP TRIGGER IF EXISTS messaging_message_fts_ad",
+    "DROP TRIGGER IF EXISTS messaging_message_fts_au",
+    "DROP TABLE IF EXISTS messaging_message_fts",
+]
+POSTGRES_CREATE = [
+    """ALTER TABLE messaging_message ADD COLUMN IF NOT EXISTS body_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english'::regconfig, body)) STORED""",
+    "CREATE INDEX IF NOT EXISTS messaging_message_body_tsv_gin ON messaging_message USING gin (body_tsv)",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS messaging_message_body_tsv_gin",
+    "ALTER TABLE messaging_message DROP COLUMN IF EXISTS body_tsv",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_CREATE, "postgresql": POSTGRES_CREATE})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_conversation_read_cursors'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_message_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessageChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_message_id', models.PositiveBigIntegerField()),
+                ('last_message_id', models.PositiveBigIntegerField()),
+                ('first_created_at', models.DateTimeField()),
+                ('last_created_at', models.DateTimeField()),
+                ('message_count', models.PositiveIntegerField()),
+                ('payload', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_chunks', to='messaging.conversation')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['conversation', '-last_message_id'], name='msg_archive_conv_last_idx')],
+            },
+        ),
+    ]
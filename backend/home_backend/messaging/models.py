@@ -2,6 +2,12 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+LAST_MESSAGE_PREVIEW_CHARS = 200
+
+
+def message_preview(body: str, limit: int = LAST_MESSAGE_PREVIEW_CHARS) -> str:
+    return body[:limit] + ("…" if len(body) > limit else "")
+
 
 class Conversation(models.Model):
     user_a = models.ForeignKey(
@@ -15,8 +21,36 @@ class Conversation(models.Model):
         related_name="conversations_as_b",
     )
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from the newest Message so the inbox needs no per-row query; kept in step by
+    # messaging.services.send_message (same transaction as the insert).
+    last_message = models.ForeignKey(
+        "Message",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    last_message_preview = models.CharField(max_length=LAST_MESSAGE_PREVIEW_CHARS + 1, blank=True, default="")
+    last_sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # Per-participant read cursor (id of the newest message they have seen) and unread counter,
+    # kept by messaging.services: +1 for the recipient on send, reset when the thread is read.
+    user_a_read_up_to = models.PositiveBigIntegerField(null=True, blank=True)
+    user_b_read_up_to = models.PositiveBigIntegerField(null=True, blank=True)
+    user_a_unread_count = models.PositiveIntegerField(default=0)
+    user_b_unread_count = models.PositiveIntegerField(default=0)
 
     class Meta:
+        indexes = [
+            models.Index(fields=["user_a", "-updated_at"], name="conv_user_a_updated_idx"),
+            models.Index(fields=["user_b", "-updated_at"], name="conv_user_b_updated_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(fields=["user_a", "user_b"], name="unique_conversation_pair"),
             models.CheckConstraint(
@@ -44,6 +78,37 @@ class Conversation(models.Model):
     def includes_user(self, user):
         return user.pk in (self.user_a_id, self.user_b_id)
 
+    def side_of(self, user_id) -> str | None:
+        """Field prefix ("user_a" / "user_b") of a participant's per-user columns."""
+        if user_id == self.user_a_id:
+            return "user_a"
+        if user_id == self.user_b_id:
+            return "user_b"
+        return None
+
+    def unread_count_for(self, user) -> int:
+        side = self.side_of(user.pk)
+        return getattr(self, f"{side}_unread_count") if side else 0
+
+    def read_up_to_for(self, user) -> int | None:
+        side = self.side_of(user.pk)
+        return getattr(self, f"{side}_read_up_to") if side else None
+
+    def refresh_last_message(self, save=True):
+        """Recompute the denormalized last-message fields from the messages table."""
+        m = self.messages.order_by("-created_at", "-id").first()
+        self.last_message = m
+        self.last_message_preview = message_preview(m.body) if m else ""
+        self.last_sender_id = m.sender_id if m else None
+        self.last_message_at = m.created_at if m else None
+        if save:
+            Conversation.objects.filter(pk=self.pk).update(
+                last_message=self.last_message,
+                last_message_preview=self.last_message_preview,
+                last_sender_id=self.last_sender_id,
+                last_message_at=self.last_message_at,
+            )
+
 
 class Message(models.Model):
     conversation = models.ForeignKey(
@@ -61,3 +126,36 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # Keyset paging of one thread (messaging.history).
+            models.Index(fields=["conversation", "created_at", "id"], name="msg_conv_created_id_idx"),
+        ]
+
+
+class ArchivedMessageChunk(models.Model):
+    """
+    Messages of an inactive conversation moved out of `Message` by `manage.py archive_history`:
+    up to one batch of consecutive messages as a zlib-compressed JSON list (messaging.archive).
+    Archived messages are always older than the conversation's remaining ones.
+    """
+
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        related_name="archived_chunks",
+    )
+    first_message_id = models.PositiveBigIntegerField()
+    last_message_id = models.PositiveBigIntegerField()
+    first_created_at = models.DateTimeField()
+    last_created_at = models.DateTimeField()
+    message_count = models.PositiveIntegerField()
+    payload = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["conversation", "-last_message_id"], name="msg_archive_conv_last_idx"),
+        ]
+
+    def __str__(self):
+        return f"Conversation {self.conversation_id}: messages {self.first_message_id}–{self.last_message_id}"
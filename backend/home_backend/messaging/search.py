@@ -0,0 +1,191 @@
+"""
+Full-text search over the messages of conversations a user takes part in.
+
+The index lives in the database and is maintained by it, so every insert is indexed in the same
+transaction:
+
+- SQLite: `messaging_message_fts`, an external-content FTS5 table (porter stemming) kept in step
+  with `messaging_message` by triggers.
+- PostgreSQL: `messaging_message.body_tsv`, a stored generated `tsvector` column with a GIN index.
+
+Both are created by migration 0005. Other databases fall back to `icontains` (no index).
+Results are newest first with a keyset cursor on (created_at, id); snippets are HTML-escaped
+with matches wrapped in <mark>…</mark>.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import html
+import re
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+
+from .history import _positive_int
+from .models import Message
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_TERMS = 8
+SNIPPET_WORDS = 12
+FALLBACK_SNIPPET_CHARS = 300
+FTS_TABLE = "messaging_message_fts"
+TSVECTOR_COLUMN = "body_tsv"
+TS_CONFIG = "english"
+
+# Control characters never typed into a message; swapped for <mark> tags after escaping.
+_MARK_START, _MARK_END = "\x02", "\x03"
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(q: str) -> list[str]:
+    """Words of the query; punctuation and search-syntax characters are dropped, not interpreted."""
+    return _TERM.findall(q.lower())[:SEARCH_MAX_TERMS]
+
+
+def encode_search_cursor(created_at: datetime, message_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{message_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        at_s, id_s = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(at_s), int(id_s)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ParseError('Invalid "cursor".')
+
+
+def parse_search_params(query_params) -> dict:
+    """Validate `q` / `conversation` / `cursor` / `limit`; raises ParseError (400 with `detail`)."""
+    terms = search_terms(query_params.get("q") or "")
+    if not terms:
+        raise ParseError('Query param "q" must contain at least one word.')
+    limit = _positive_int(query_params, "limit") or SEARCH_DEFAULT_LIMIT
+    cursor = query_params.get("cursor")
+    return {
+        "terms": terms,
+        "limit": min(limit, SEARCH_MAX_LIMIT),
+        "conversation_id": _positive_int(query_params, "conversation"),
+        "cursor": decode_search_cursor(cursor) if cursor else None,
+    }
+
+
+def render_snippet(marked: str) -> str:
+    return html.escape(marked).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _scope_sql(user_id: int, params: dict, args: list) -> str:
+    """WHERE fragment (on alias m) for the user's conversations and the keyset cursor."""
+    sql = (
+        " AND m.conversation_id IN (SELECT id FROM messaging_conversation"
+        " WHERE user_a_id = %s OR user_b_id = %s)"
+    )
+    args += [user_id, user_id]
+    if params["conversation_id"]:
+        sql += " AND m.conversation_id = %s"
+        args.append(params["conversation_id"])
+    if params["cursor"]:
+        at, mid = params["cursor"]
+        at = connection.ops.adapt_datetimefield_value(at)
+        sql += " AND (m.created_at < %s OR (m.created_at = %s AND m.id < %s))"
+        args += [at, at, mid]
+    return sql
+
+
+def _sqlite_hits(user_id: int, params: dict) -> list[tuple[int, str]]:
+    # Each term quoted (no FTS syntax from users); the last one as a prefix for type-ahead.
+    terms = params["terms"]
+    match = " ".join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+    args: list = [_MARK_START, _MARK_END, match.strip()]
+    sql = (
+        f"SELECT m.id, snippet({FTS_TABLE}, 0, %s, %s, '…', {SNIPPET_WORDS})"
+        f" FROM {FTS_TABLE} JOIN messaging_message m ON m.id = {FTS_TABLE}.rowid"
+        f" WHERE {FTS_TABLE} MATCH %s"
+    )
+    sql += _scope_sql(user_id, params, args)
+    sql += " ORDER BY m.created_at DESC, m.id DESC LIMIT %s"
+    args.append(params["limit"] + 1)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, args)
+        return list(cursor.fetchall())
+
+
+def _postgres_hits(user_id: int, params: dict) -> list[tuple[int, str]]:
+    # Terms are \w+ only, so quoting them is enough to keep tsquery operators out.
+    tsquery = " & ".join(f"'{t}'" for t in params["terms"]) + ":*"
+    args: list = [TS_CONFIG, tsquery]
+    inner = (
+        "SELECT m.id, m.body, m.created_at, q.query FROM messaging_message m,"
+        " to_tsquery(%s::regconfig, %s) AS q(query)"
+        f" WHERE m.{TSVECTOR_COLUMN} @@ q.query"
+    )
+    inner += _scope_sql(user_id, params, args)
+    inner += " ORDER BY m.created_at DESC, m.id DESC LIMIT %s"
+    args.append(params["limit"] + 1)
+    # ts_headline re-parses the body, so it runs on the page only.
+    sql = (
+        "SELECT hit.id, ts_headline(%s::regconfig, hit.body, hit.query,"
+        f" %s) FROM ({inner}) AS hit ORDER BY hit.created_at DESC, hit.id DESC"
+    )
+    options = (
+        f'StartSel="{_MARK_START}", StopSel="{_MARK_END}", MaxWords={SNIPPET_WORDS * 2},'
+        f' MinWords={SNIPPET_WORDS // 2}, MaxFragments=2, FragmentDelimiter="…"'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [TS_CONFIG, options, *args])
+        return list(cursor.fetchall())
+
+
+def _fallback_hits(user_id: int, params: dict) -> list[tuple[int, str]]:
+    qs = Message.objects.filter(
+        Q(conversation__user_a_id=user_id) | Q(conversation__user_b_id=user_id),
+    )
+    for term in params["terms"]:
+        qs = qs.filter(body__icontains=term)
+    if params["conversation_id"]:
+        qs = qs.filter(conversation_id=params["conversation_id"])
+    if params["cursor"]:
+        at, mid = params["cursor"]
+        qs = qs.filter(Q(created_at__lt=at) | Q(created_at=at, id__lt=mid))
+    rows = qs.order_by("-created_at", "-id").values_list("id", "body")[: params["limit"] + 1]
+    pattern = re.compile("|".join(re.escape(t) for t in params["terms"]), re.IGNORECASE)
+
+    def mark(body):
+        return pattern.sub(lambda m: f"{_MARK_START}{m.group(0)}{_MARK_END}", body[:FALLBACK_SNIPPET_CHARS])
+
+    return [(mid, mark(body)) for mid, body in rows]
+
+
+def search_messages(user, params: dict):
+    """
+    One page of matches as (messages newest first, snippets by message id, next_cursor).
+    Messages come with sender and conversation participants loaded.
+    """
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        hits = _sqlite_hits(user.pk, params)
+    elif vendor == "postgresql":
+        hits = _postgres_hits(user.pk, params)
+    else:
+        hits = _fallback_hits(user.pk, params)
+
+    limit = params["limit"]
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+    snippets = {mid: render_snippet(marked or "") for mid, marked in hits}
+    by_id = Message.objects.select_related(
+        "sender", "conversation__user_a", "conversation__user_b"
+    ).in_bulk(list(snippets))
+    messages = [by_id[mid] for mid, _ in hits if mid in by_id]
+    next_cursor = None
+    if has_more and messages:
+        last = messages[-1]
+        next_cursor = encode_search_cursor(last.created_at, last.pk)
+    return messages, snippets, next_cursor
+
@@ -22,13 +22,33 @@ class OtherUserSerializer(serializers.ModelSerializer):
         fields = ("id", "username", "email", "phone")
 
 
+class MessageSearchHitSerializer(MessageSerializer):
+    """A search match: the message plus its highlighted `snippet` and the other participant."""
+
+    snippet = serializers.SerializerMethodField()
+    other_user = serializers.SerializerMethodField()
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ("snippet", "other_user")
+
+    def get_snippet(self, obj) -> str:
+        # HTML-escaped body excerpt; only the <mark> tags around matches are markup.
+        return self.context["snippets"].get(obj.pk, "")
+
+    def get_other_user(self, obj):
+        other = obj.conversation.other_user(self.context["request"].user)
+        return {"id": other.pk, "username": other.username} if other else None
+
+
 class ConversationListSerializer(serializers.ModelSerializer):
     other_user = serializers.SerializerMethodField()
     last_message = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+    read_up_to = serializers.SerializerMethodField()
 
     class Meta:
         model = Conversation
-        fields = ("id", "other_user", "last_message", "updated_at")
+        fields = ("id", "other_user", "last_message", "unread_count", "read_up_to", "updated_at")
 
     def get_other_user(self, obj):
         user = self.context["request"].user
@@ -37,14 +57,22 @@ class ConversationListSerializer(serializers.ModelSerializer):
             return None
         return OtherUserSerializer(other).data
 
+    def get_unread_count(self, obj) -> int:
+        return obj.unread_count_for(self.context["request"].user)
+
+    def get_read_up_to(self, obj) -> int | None:
+        """Id of the newest message the current user has seen (their read cursor)."""
+        return obj.read_up_to_for(self.context["request"].user)
+
     def get_last_message(self, obj):
-        m = obj.messages.order_by("-created_at").first()
-        if not m:
+        # Denormalized on the conversation (messaging.services.send_message); no query per row.
+        if obj.last_message_at is None:
             return None
         return {
-            "body": m.body[:200] + ("…" if len(m.body) > 200 else ""),
-            "created_at": m.created_at.isoformat(),
-            "sender_id": m.sender_id,
+            "id": obj.last_message_id,
+            "body": obj.last_message_preview,
+            "created_at": obj.last_message_at.isoformat(),
+            "sender_id": obj.last_sender_id,
         }
 
 
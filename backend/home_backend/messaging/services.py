@@ -0,0 +1,76 @@
+"""Write paths for conversations, shared by the API views and other apps."""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Conversation, Message, message_preview
+
+
+def send_message(conversation: Conversation, sender, body: str) -> Message:
+    """
+    Insert a message and update the conversation in the same transaction: the denormalized
+    last-message fields and `updated_at`, the recipient's unread counter (+1) and the sender's read
+    cursor (sending implies having read the thread). The inbox never shows a thread without its
+    newest message, or a count that disagrees with it.
+    """
+    sender_side = conversation.side_of(sender.pk)
+    recipient_side = "user_b" if sender_side == "user_a" else "user_a"
+    with transaction.atomic():
+        msg = Message.objects.create(conversation=conversation, sender=sender, body=body)
+        now = timezone.now()
+        Conversation.objects.filter(pk=conversation.pk).update(
+            last_message=msg,
+            last_message_preview=message_preview(body),
+            last_sender_id=msg.sender_id,
+            last_message_at=msg.created_at,
+            updated_at=now,
+            **{
+                f"{recipient_side}_unread_count": F(f"{recipient_side}_unread_count") + 1,
+                f"{sender_side}_unread_count": 0,
+                f"{sender_side}_read_up_to": msg.pk,
+            },
+        )
+    conversation.last_message = msg
+    conversation.last_message_preview = message_preview(body)
+    conversation.last_sender_id = msg.sender_id
+    conversation.last_message_at = msg.created_at
+    conversation.updated_at = now
+    setattr(conversation, f"{recipient_side}_unread_count", getattr(conversation, f"{recipient_side}_unread_count") + 1)
+    setattr(conversation, f"{sender_side}_unread_count", 0)
+    setattr(conversation, f"{sender_side}_read_up_to", msg.pk)
+    return msg
+
+
+def mark_conversation_read(conversation: Conversation, user) -> bool:
+    """
+    Move `user`'s read cursor to the newest message and zero their unread counter. No write when
+    nothing changed (most polls). Returns True when the conversation row was updated.
+    """
+    side = conversation.side_of(user.pk)
+    newest = conversation.last_message_id
+    if side is None or newest is None:
+        return False
+    if getattr(conversation, f"{side}_read_up_to") == newest and not getattr(conversation, f"{side}_unread_count"):
+        return False
+    # Only valid while no newer message arrived since `conversation` was loaded; otherwise the
+    # counter must keep the messages sent after `newest`.
+    updated = Conversation.objects.filter(pk=conversation.pk, last_message_id=newest).update(
+        **{f"{side}_read_up_to": newest, f"{side}_unread_count": 0}
+    )
+    if not updated:
+        still_unread = (
+            Message.objects.filter(conversation=conversation, pk__gt=newest)
+            .exclude(sender_id=user.pk)
+            .count()
+        )
+        Conversation.objects.filter(pk=conversation.pk).update(
+            **{f"{side}_read_up_to": newest, f"{side}_unread_count": still_unread}
+        )
+        setattr(conversation, f"{side}_unread_count", still_unread)
+    else:
+        setattr(conversation, f"{side}_unread_count", 0)
+    setattr(conversation, f"{side}_read_up_to", newest)
+    return True
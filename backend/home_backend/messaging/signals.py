@@ -0,0 +1,36 @@
+"""Realtime delivery of new messages; keep Conversation's last-message fields right on deletes."""
+
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from realtime.events import publish_to_users
+
+from .models import Conversation, Message
+
+
+@receiver(post_save, sender=Message)
+def message_created_publish(sender, instance: Message, created, **kwargs):
+    """Push the message to both participants' open streams (the sender's other tabs too) on commit."""
+    if not created:
+        return
+    from .serializers import MessageSerializer
+
+    conv = instance.conversation
+    publish_to_users((conv.user_a_id, conv.user_b_id), "message", MessageSerializer(instance).data)
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted_refresh_conversation(sender, instance: Message, origin=None, **kwargs):
+    """Deleting the newest message (admin, user deletion) falls back to the one before it."""
+    if isinstance(origin, Conversation):
+        return  # the whole thread is going away
+    # SET_NULL has already cleared last_message when it pointed at this row.
+    conv = Conversation.objects.filter(
+        pk=instance.conversation_id,
+        last_message__isnull=True,
+        last_message_at__isnull=False,
+    ).first()
+    if conv:
+        conv.refresh_last_message()
@@ -10,4 +10,5 @@ urlpatterns = [
         views.ConversationMessagesView.as_view(),
         name="message-conversation-messages",
     ),
+    path("search/", views.MessageSearchView.as_view(), name="message-search"),
 ]
@@ -1,33 +1,51 @@
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from rest_framework import generics, permissions, status
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from notifications.models import Notification
-from notifications.services import create_notification
+from notifications.services import create_message_notification, mark_conversation_alerts_read
 
-from .models import Conversation, Message
+from .history import message_page, parse_message_page_params
+from .models import Conversation
+from .search import parse_search_params, search_messages
 from .serializers import (
     ConversationListSerializer,
+    MessageSearchHitSerializer,
     MessageSerializer,
     OpenConversationSerializer,
 )
+from .services import mark_conversation_read, send_message
 
 User = get_user_model()
 
 
+class ConversationCursorPagination(CursorPagination):
+    """Keyset pages on -updated_at: stable while new messages bump threads to the top."""
+
+    ordering = ("-updated_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
 class ConversationListView(generics.ListAPIView):
-    """List conversations for the current user (most recently updated first)."""
+    """List conversations for the current user (most recently updated first, cursor-paginated)."""
 
     serializer_class = ConversationListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ConversationCursorPagination
+    filter_backends = []
 
     def get_queryset(self):
         user = self.request.user
-        return Conversation.objects.filter(Q(user_a=user) | Q(user_b=user)).order_by("-updated_at")
+        return (
+            Conversation.objects.filter(Q(user_a=user) | Q(user_b=user))
+            .select_related("user_a", "user_b")
+            .order_by("-updated_at", "-id")
+        )
 
 
 class OpenConversationView(APIView):
@@ -57,7 +75,10 @@ class OpenConversationView(APIView):
 
 
 class ConversationMessagesView(APIView):
-    """GET list messages / POST new message in a conversation."""
+    """
+    GET one page of messages (oldest first): the latest `limit`, or `before_id` for older history,
+    or `after_id` for only what is new since the client's last message. POST sends a message.
+    """
 
     permission_classes = [permissions.IsAuthenticated]
 
@@ -71,14 +92,13 @@ class ConversationMessagesView(APIView):
         conv = self.get_conversation(conversation_id)
         if not conv:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        Notification.objects.filter(
-            user=request.user,
-            notification_type=Notification.NotificationType.MESSAGE,
-            related_conversation_id=conversation_id,
-            read_at__isnull=True,
-        ).update(read_at=timezone.now())
-        qs = conv.messages.select_related("sender").order_by("created_at")
-        return Response(MessageSerializer(qs, many=True).data)
+        params = parse_message_page_params(request.query_params)
+        if not params["before_id"]:
+            # Opening or polling the thread reads its alerts.
+            mark_conversation_alerts_read(request.user, conversation_id)
+            mark_conversation_read(conv, request.user)
+        messages, has_more = message_page(conv, params)
+        return Response({"results": MessageSerializer(messages, many=True).data, "has_more": has_more})
 
     def post(self, request, conversation_id):
         conv = self.get_conversation(conversation_id)
@@ -87,19 +107,17 @@ class ConversationMessagesView(APIView):
         body = (request.data.get("body") or "").strip()
         if not body:
             return Response({"detail": "Message body is required."}, status=status.HTTP_400_BAD_REQUEST)
-        msg = Message.objects.create(conversation=conv, sender=request.user, body=body)
-        conv.save(update_fields=["updated_at"])
+        msg = send_message(conv, request.user, body)
         recipient = conv.other_user(request.user)
         if recipient:
             preview = (body[:120] + "…") if len(body) > 120 else body
-            create_notification(
+            create_message_notification(
                 user=recipient,
-                notification_type=Notification.NotificationType.MESSAGE,
-                title=f"New message from {request.user.get_username()}",
+                related_conversation_id=conv.id,
+                sender_name=request.user.get_username(),
                 body=preview,
                 action_href=f"/dashboard/messages?conversationId={conv.id}",
                 action_label="Open chat",
-                related_conversation_id=conv.id,
             )
         return Response(
             {
@@ -108,3 +126,24 @@ class ConversationMessagesView(APIView):
             },
             status=status.HTTP_201_CREATED,
         )
+
+
+class MessageSearchView(APIView):
+    """
+    GET ?q=<words>[&conversation=<id>][&cursor=…][&limit=…] — full-text search over the messages of
+    the current user's conversations, newest first, with highlighted snippets (messaging.search).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = parse_search_params(request.query_params)
+        messages, snippets, next_cursor = search_messages(request.user, params)
+        context = {"request": request, "snippets": snippets}
+        return Response(
+            {
+                "results": MessageSearchHitSerializer(messages, many=True, context=context).data,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+            }
+        )
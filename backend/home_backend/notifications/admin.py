@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Notification, NotificationPreferences
+from .models import ArchivedNotificationChunk, Notification, NotificationPreferences, UnreadNotificationCounter
+from .services import recount_unread
 
 
 @admin.register(NotificationPreferences)
@@ -29,3 +30,40 @@ class NotificationAdmin(admin.ModelAdmin):
     raw_id_fields = ("user",)
     readonly_fields = ("created_at",)
     date_hierarchy = "created_at"
+
+    # Admin edits bypass notifications.services; recount the affected badges afterwards.
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        recount_unread(obj.user_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recount_unread(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list("user_id", flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            recount_unread(user_id)
+
+
+@admin.register(ArchivedNotificationChunk)
+class ArchivedNotificationChunkAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "notification_count", "first_notification_id", "last_notification_id", "archived_at")
+    raw_id_fields = ("user",)
+    exclude = ("payload",)
+    readonly_fields = ("first_notification_id", "last_notification_id", "notification_count", "archived_at")
+    search_fields = ("user__username", "user__email")
+
+
+@admin.register(UnreadNotificationCounter)
+class UnreadNotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ("user", "unread_count", "message_unread_count")
+    raw_id_fields = ("user",)
+    search_fields = ("user__username", "user__email")
+    actions = ["recount"]
+
+    @admin.action(description="Recount from notifications")
+    def recount(self, request, queryset):
+        for user_id in queryset.values_list("user_id", flat=True):
+            recount_unread(user_id)
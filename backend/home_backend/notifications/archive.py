@@ -0,0 +1,138 @@
+"""
+Cold storage for old read notifications (and the chunk format messaging.archive shares).
+
+`archive_notifications` moves read notifications created before a cutoff into
+ArchivedNotificationChunk rows: one user and at most `batch_size` notifications per chunk, each
+batch in its own short transaction. Unread rows are never archived, so badge counts never touch
+the archive. `archived_notification_page` reads chunks back newest first (by id) for
+GET /api/notifications/archived/, decompressing only the chunks a page needs.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedNotificationChunk, Notification
+
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_COMPRESSION_LEVEL = 6  # zlib; 9 gains little on short text for a lot more CPU
+_USER_BATCH = 1000
+_FIELDS = (
+    "id",
+    "notification_type",
+    "title",
+    "body",
+    "count",
+    "read_at",
+    "created_at",
+    "action_href",
+    "action_label",
+    "related_conversation_id",
+)
+
+
+def pack_rows(rows: list[dict]) -> bytes:
+    raw = json.dumps(rows, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+    return zlib.compress(raw, ARCHIVE_COMPRESSION_LEVEL)
+
+
+def unpack_rows(payload) -> list[dict]:
+    # BinaryField comes back as memoryview on PostgreSQL.
+    return json.loads(zlib.decompress(bytes(payload)))
+
+
+def rows_before(chunks, *, first_id_field: str, last_id_field: str, before_id: int | None, limit: int):
+    """
+    Newest-first rows with id < `before_id` from `chunks`, as (up to `limit` rows, has_more).
+    Chunks may overlap in id range, so reading stops only once the next chunk (by -last id) cannot
+    hold anything newer than what is already collected.
+    """
+    if before_id:
+        chunks = chunks.filter(**{f"{first_id_field}__lt": before_id})
+    collected: list[dict] = []
+    for chunk in chunks.order_by(f"-{last_id_field}").iterator(chunk_size=2):
+        if len(collected) > limit and getattr(chunk, last_id_field) < collected[limit]["id"]:
+            break
+        collected.extend(r for r in unpack_rows(chunk.payload) if not before_id or r["id"] < before_id)
+        collected.sort(key=lambda r: r["id"], reverse=True)
+    return collected[:limit], len(collected) > limit
+
+
+def _parse_dt(value) -> datetime | None:
+    return parse_datetime(value) if value else None
+
+
+def archive_notifications(
+    *, older_than: datetime, batch_size: int = ARCHIVE_BATCH_SIZE, dry_run: bool = False
+) -> dict:
+    """Move read notifications created before `older_than` into archive chunks."""
+    candidates = Notification.objects.filter(read_at__isnull=False, created_at__lt=older_than)
+    if dry_run:
+        return {"notifications": candidates.count(), "chunks": 0, "stored_bytes": 0}
+
+    stats = {"notifications": 0, "chunks": 0, "stored_bytes": 0}
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            candidates.filter(user_id__gt=last_user_id)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()[:_USER_BATCH]
+        )
+        if not user_ids:
+            return stats
+        last_user_id = user_ids[-1]
+        for user_id in user_ids:
+            last_id = 0
+            while True:
+                with transaction.atomic():
+                    rows = list(
+                        candidates.select_for_update()
+                        .filter(user_id=user_id, pk__gt=last_id)
+                        .order_by("pk")
+                        .values(*_FIELDS)[:batch_size]
+                    )
+                    if not rows:
+                        break
+                    last_id = rows[-1]["id"]
+                    payload = pack_rows(rows)
+                    ArchivedNotificationChunk.objects.create(
+                        user_id=user_id,
+                        first_notification_id=rows[0]["id"],
+                        last_notification_id=last_id,
+                        notification_count=len(rows),
+                        payload=payload,
+                    )
+                    Notification.objects.filter(pk__in=[r["id"] for r in rows]).delete()
+                stats["notifications"] += len(rows)
+                stats["chunks"] += 1
+                stats["stored_bytes"] += len(payload)
+
+
+def archived_notification_page(user, *, before_id: int | None, limit: int):
+    """(unsaved Notification instances newest first, has_more) from `user`'s archive."""
+    rows, has_more = rows_before(
+        ArchivedNotificationChunk.objects.filter(user=user),
+        first_id_field="first_notification_id",
+        last_id_field="last_notification_id",
+        before_id=before_id,
+        limit=limit,
+    )
+    notifications = [
+        Notification(
+            user=user,
+            **{
+                **row,
+                "read_at": _parse_dt(row["read_at"]),
+                "created_at": _parse_dt(row["created_at"]),
+            },
+        )
+        for row in rows
+    ]
+    return notifications, has_more
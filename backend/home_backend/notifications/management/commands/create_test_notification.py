@@ -9,6 +9,7 @@ from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 
 from notifications.models import Notification
+from notifications.services import create_notification
 
 
 class Command(BaseCommand):
@@ -30,7 +31,7 @@ class Command(BaseCommand):
         except User.DoesNotExist as exc:
             raise CommandError(f"No user with username={username!r}") from exc
 
-        n = Notification.objects.create(
+        n = create_notification(
             user=user,
             notification_type=Notification.NotificationType.AGENT,
             title="Test notification",
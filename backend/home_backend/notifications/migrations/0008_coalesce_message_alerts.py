@@ -0,0 +1,52 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:53
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+SINGLE_TITLE_PREFIX = "New message from "
+
+
+def compact_unread_message_alerts(apps, schema_editor):
+    """Merge every (user, conversation) group of unread MESSAGE alerts into its newest row."""
+    Notification = apps.get_model("notifications", "Notification")
+    unread = Notification.objects.filter(
+        notification_type="message",
+        read_at__isnull=True,
+        related_conversation_id__isnull=False,
+    )
+    groups = (
+        unread.values("user_id", "related_conversation_id")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("user_id", "related_conversation_id", "n")
+    )
+    for user_id, conversation_id, n in groups.iterator():
+        rows = unread.filter(user_id=user_id, related_conversation_id=conversation_id).order_by("-created_at", "-id")
+        keep = rows.first()
+        title = keep.title
+        if title.startswith(SINGLE_TITLE_PREFIX):
+            title = f"{n} new messages from {title[len(SINGLE_TITLE_PREFIX):]}"
+        rows.exclude(pk=keep.pk).delete()
+        Notification.objects.filter(pk=keep.pk).update(count=n, title=title[:255])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0007_alter_notification_notification_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(compact_unread_message_alerts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('notification_type', 'message'), ('read_at__isnull', True)), fields=('user', 'related_conversation_id'), name='one_unread_message_alert_per_conversation'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0008_coalesce_message_alerts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotificationChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_notification_id', models.PositiveBigIntegerField()),
+                ('last_notification_id', models.PositiveBigIntegerField()),
+                ('notification_count', models.PositiveIntegerField()),
+                ('payload', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notification_chunks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-last_notification_id'], name='notif_archive_user_last_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_unread(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    UnreadNotificationCounter = apps.get_model("notifications", "UnreadNotificationCounter")
+    rows = (
+        Notification.objects.filter(read_at__isnull=True)
+        .order_by()
+        .values("user_id")
+        .annotate(
+            unread_count=Count("pk"),
+            message_unread_count=Count("pk", filter=Q(notification_type="message")),
+        )
+    )
+    UnreadNotificationCounter.objects.bulk_create(
+        (UnreadNotificationCounter(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0009_archivednotificationchunk'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('message_unread_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
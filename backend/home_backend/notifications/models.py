@@ -57,6 +57,10 @@ class Notification(models.Model):
     read_at = models.DateTimeField(null=True, blank=True, db_index=True)
     action_href = models.CharField(max_length=500, blank=True)
     action_label = models.CharField(max_length=128, blank=True)
+    # Unread MESSAGE alerts of one conversation are coalesced into a single row
+    # (services.create_message_notification): `count` messages, the newest one's preview in
+    # `body`, and `created_at` moved to the newest message so the row sorts with recent alerts.
+    count = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
@@ -65,6 +69,60 @@ class Notification(models.Model):
             models.Index(fields=["user", "-created_at"]),
             models.Index(fields=["user", "read_at"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "related_conversation_id"],
+                condition=models.Q(notification_type="message", read_at__isnull=True),
+                name="one_unread_message_alert_per_conversation",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.user_id})"
+
+
+class UnreadNotificationCounter(models.Model):
+    """
+    Per-user unread badge counts, kept in step by notifications.services (every create / read /
+    delete path) so the badge poll is a primary-key lookup. Counts rows, like the list's unread
+    flags: a coalesced message alert is one. Created on first read from a COUNT
+    (services.recount_unread).
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_notification_counter",
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    message_unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count} unread ({self.message_unread_count} messages)"
+
+
+class ArchivedNotificationChunk(models.Model):
+    """
+    Old read notifications of one user moved out of `Notification` by `manage.py archive_history`,
+    as a zlib-compressed JSON list (notifications.archive).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notification_chunks",
+    )
+    first_notification_id = models.PositiveBigIntegerField()
+    last_notification_id = models.PositiveBigIntegerField()
+    notification_count = models.PositiveIntegerField()
+    payload = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-last_notification_id"], name="notif_archive_user_last_idx"),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id}: notifications {self.first_notification_id}–{self.last_notification_id}"
@@ -17,6 +17,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             "type",
             "title",
             "body",
+            "count",
             "unread",
             "time",
             "created_at",
@@ -1,11 +1,24 @@
-"""Create in-app notifications for use from signals or other apps."""
+"""
+Create in-app notifications for use from signals or other apps.
+
+Every path that creates, reads or deletes notifications goes through here so the per-user
+UnreadNotificationCounter changes in the same transaction as the rows.
+"""
 
 from __future__ import annotations
 
+from collections import Counter
+
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import CharField, Count, F, Q, Value
+from django.db.models.functions import Cast, Concat, Greatest
 from django.utils import timezone
 
-from .models import Notification, NotificationPreferences
+from realtime.events import publish_to_users
+
+from .models import Notification, NotificationPreferences, UnreadNotificationCounter
+from .serializers import NotificationSerializer
 
 User = get_user_model()
 
@@ -28,6 +41,43 @@ def get_or_create_notification_preferences(user: User) -> NotificationPreference
     return obj
 
 
+def _is_message(notification_type) -> int:
+    return int(notification_type == Notification.NotificationType.MESSAGE)
+
+
+def adjust_unread(user_ids, unread: int, message_unread: int = 0) -> None:
+    """
+    Add to the unread counters of `user_ids` in one UPDATE (negative to subtract; never below 0).
+    Users without a counter row are skipped: theirs is counted from scratch on first read.
+    """
+    if not unread and not message_unread:
+        return
+    UnreadNotificationCounter.objects.filter(user_id__in=list(user_ids)).update(
+        unread_count=Greatest(F("unread_count") + unread, 0),
+        message_unread_count=Greatest(F("message_unread_count") + message_unread, 0),
+    )
+
+
+def recount_unread(user_id: int) -> dict:
+    """Both unread counts in one conditional aggregate, stored as the user's counter row."""
+    counts = Notification.objects.filter(user_id=user_id, read_at__isnull=True).aggregate(
+        unread_count=Count("pk"),
+        message_unread_count=Count("pk", filter=Q(notification_type=Notification.NotificationType.MESSAGE)),
+    )
+    UnreadNotificationCounter.objects.update_or_create(user_id=user_id, defaults=counts)
+    return counts
+
+
+def unread_counts(user: User) -> dict:
+    """`{"unread_count", "message_unread_count"}` for badges: a primary-key lookup."""
+    row = (
+        UnreadNotificationCounter.objects.filter(pk=user.pk)
+        .values("unread_count", "message_unread_count")
+        .first()
+    )
+    return row if row is not None else recount_unread(user.pk)
+
+
 def create_notification(
     *,
     user: User,
@@ -38,26 +88,172 @@ def create_notification(
     action_label: str = "",
     related_conversation_id: int | None = None,
 ) -> Notification:
-    return Notification.objects.create(
+    with transaction.atomic():
+        n = Notification.objects.create(
+            user=user,
+            notification_type=notification_type,
+            title=title,
+            body=body,
+            action_href=action_href or "",
+            action_label=action_label or "",
+            related_conversation_id=related_conversation_id,
+        )
+        adjust_unread([n.user_id], 1, _is_message(notification_type))
+    publish_notification(n)
+    return n
+
+
+def create_message_notification(
+    *,
+    user: User,
+    related_conversation_id: int,
+    sender_name: str,
+    body: str,
+    action_href: str = "",
+    action_label: str = "",
+) -> Notification:
+    """
+    Alert `user` to a new message, coalescing a burst into one row per conversation: while an
+    unread MESSAGE notification for (user, conversation) exists it is updated in place with a
+    single UPDATE (count + 1, newest preview, timestamp, "3 new messages from …" title) instead of
+    inserting another row. A partial unique constraint keeps concurrent senders from creating two.
+    """
+    unread = Notification.objects.filter(
         user=user,
-        notification_type=notification_type,
-        title=title,
-        body=body,
-        action_href=action_href or "",
-        action_label=action_label or "",
+        notification_type=Notification.NotificationType.MESSAGE,
         related_conversation_id=related_conversation_id,
+        read_at__isnull=True,
     )
+    for _attempt in range(2):
+        updated = unread.update(
+            count=F("count") + 1,
+            title=Concat(
+                Cast(F("count") + 1, output_field=CharField()),
+                Value(f" new messages from {sender_name}"),
+                output_field=CharField(),
+            ),
+            body=body,
+            created_at=timezone.now(),
+        )
+        if updated:
+            # Re-read for the push payload; fall back to the newest row if it was read meanwhile.
+            n = unread.first() or Notification.objects.filter(
+                user=user,
+                notification_type=Notification.NotificationType.MESSAGE,
+                related_conversation_id=related_conversation_id,
+            ).first()
+            publish_notification(n, coalesced=True)
+            return n
+        try:
+            with transaction.atomic():
+                return create_notification(
+                    user=user,
+                    notification_type=Notification.NotificationType.MESSAGE,
+                    title=f"New message from {sender_name}",
+                    body=body,
+                    action_href=action_href,
+                    action_label=action_label,
+                    related_conversation_id=related_conversation_id,
+                )
+        except IntegrityError:
+            continue  # another request inserted the row first; coalesce into it
+    raise RuntimeError("Could not create or coalesce the message notification.")
+
+
+def publish_notification(n: Notification, *, coalesced: bool = False) -> None:
+    """Push a new notification to the user's open realtime streams once the transaction commits."""
+    data = NotificationSerializer(n).data
+    data["related_conversation_id"] = n.related_conversation_id
+    # Coalesced: an existing unread row changed, so unread counts did not grow.
+    data["coalesced"] = coalesced
+    publish_to_users([n.user_id], "notification", data)
+
+
+def bulk_create_notifications(rows, *, batch_size: int = 500) -> int:
+    """
+    Insert many notifications at once (sweepers, fan-outs). `rows` is an iterable of dicts with
+    the create_notification fields, using `user_id` instead of `user`. Returns rows created.
+    """
+    objs = [
+        Notification(
+            user_id=row["user_id"],
+            notification_type=row["notification_type"],
+            title=row["title"],
+            body=row["body"],
+            action_href=row.get("action_href") or "",
+            action_label=row.get("action_label") or "",
+            related_conversation_id=row.get("related_conversation_id"),
+        )
+        for row in rows
+    ]
+    deltas = Counter((n.user_id, _is_message(n.notification_type)) for n in objs)
+    with transaction.atomic():
+        Notification.objects.bulk_create(objs, batch_size=batch_size)
+        # One UPDATE per distinct delta (usually one or two), not per user.
+        by_delta: dict[tuple[int, int], list[int]] = {}
+        for (user_id, is_message), n in deltas.items():
+            by_delta.setdefault((n, n * is_message), []).append(user_id)
+        for (unread, message_unread), user_ids in by_delta.items():
+            for i in range(0, len(user_ids), batch_size):
+                adjust_unread(user_ids[i : i + batch_size], unread, message_unread)
+    for n in objs:
+        publish_notification(n)
+    return len(objs)
+
+
+def _reset_unread(user: User):
+    """
+    Lock the user's counter row, so a concurrent create waits and adds to the reset value instead
+    of being wiped by it. Returns a queryset for the reset UPDATE.
+    """
+    counter = UnreadNotificationCounter.objects.filter(user=user)
+    counter.select_for_update().values_list("pk", flat=True).first()
+    return counter
 
 
 def delete_all_for_user(user: User) -> int:
     """Delete all in-app notifications for this user. Returns rows deleted."""
-    deleted, _ = Notification.objects.filter(user=user).delete()
+    with transaction.atomic():
+        counter = _reset_unread(user)
+        deleted, _ = Notification.objects.filter(user=user).delete()
+        counter.update(unread_count=0, message_unread_count=0)
     return deleted
 
 
 def mark_all_read_for_user(user: User) -> int:
     """Set read_at for all unread notifications. Returns number updated."""
-    qs = Notification.objects.filter(user=user, read_at__isnull=True)
+    with transaction.atomic():
+        counter = _reset_unread(user)
+        count = Notification.objects.filter(user=user, read_at__isnull=True).update(read_at=timezone.now())
+        counter.update(unread_count=0, message_unread_count=0)
+    return count
+
+
+def mark_notification_read(n: Notification) -> bool:
+    """Mark one notification read; False if it already was (the counters only move once)."""
     now = timezone.now()
-    count = qs.update(read_at=now)
+    with transaction.atomic():
+        if not Notification.objects.filter(pk=n.pk, read_at__isnull=True).update(read_at=now):
+            return False
+        is_message = _is_message(n.notification_type)
+        adjust_unread([n.user_id], -1, -is_message)
+    n.read_at = now
+    return True
+
+
+def mark_conversation_alerts_read(user: User, conversation_id: int) -> int:
+    """Read the MESSAGE alerts of one conversation (opening or polling the thread)."""
+    unread = Notification.objects.filter(
+        user=user,
+        notification_type=Notification.NotificationType.MESSAGE,
+        related_conversation_id=conversation_id,
+        read_at__isnull=True,
+    )
+    # Check first: nearly every poll finds nothing unread, and a read is far cheaper than an
+    # UPDATE that matches no rows.
+    if not unread.exists():
+        return 0
+    with transaction.atomic():
+        count = unread.update(read_at=timezone.now())
+        adjust_unread([user.pk], -count, -count)
     return count
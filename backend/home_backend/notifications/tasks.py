@@ -0,0 +1,63 @@
+"""Background jobs for outbound email and in-app notifications (see jobs.queue)."""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+
+from jobs.queue import task
+
+from .services import create_notification
+
+User = get_user_model()
+
+
+@task("notifications.send_email", max_attempts=5, backoff_seconds=30)
+def send_email(*, subject: str, message: str, recipient_list: list[str]) -> None:
+    # Raise on SMTP errors so the worker retries with backoff.
+    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient_list, fail_silently=False)
+
+
+@task("notifications.create", max_attempts=3, backoff_seconds=10)
+def deliver_notification(*, user_id: int, **fields) -> None:
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return  # account deleted since the job was queued
+    create_notification(user=user, **fields)
+
+
+def enqueue_email(subject: str, message: str, recipients, *, dedupe_key: str | None = None) -> None:
+    """Queue a plain-text email; blank addresses are dropped."""
+    recipient_list = [r for r in recipients if r]
+    if recipient_list:
+        send_email.enqueue(
+            subject=subject,
+            message=message,
+            recipient_list=recipient_list,
+            dedupe_key=dedupe_key,
+        )
+
+
+def enqueue_notification(
+    *,
+    user,
+    notification_type: str,
+    title: str,
+    body: str,
+    action_href: str = "",
+    action_label: str = "",
+    related_conversation_id: int | None = None,
+    dedupe_key: str | None = None,
+) -> None:
+    """Same arguments as services.create_notification; the row is written by the worker."""
+    deliver_notification.enqueue(
+        user_id=getattr(user, "pk", user),
+        notification_type=str(notification_type),
+        title=title,
+        body=body,
+        action_href=action_href,
+        action_label=action_label,
+        related_conversation_id=related_conversation_id,
+        dedupe_key=dedupe_key,
+    )
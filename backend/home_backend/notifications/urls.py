@@ -19,6 +19,11 @@ urlpatterns = [
         views.NotificationMarkAllReadView.as_view(),
         name="notification-mark-all-read",
     ),
+    path(
+        "archived/",
+        views.ArchivedNotificationListView.as_view(),
+        name="notification-archived",
+    ),
     path(
         "clear-all/",
         views.NotificationClearAllView.as_view(),
@@ -1,12 +1,15 @@
-from django.utils import timezone
+from django.db.models import Sum
+from django.urls import reverse
 from drf_spectacular.utils import OpenApiResponse, extend_schema, extend_schema_view
 from rest_framework import generics, status
+from rest_framework.exceptions import ParseError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Notification
+from .archive import archived_notification_page
+from .models import ArchivedNotificationChunk, Notification
 from .serializers import (
     ClearAllOutSerializer,
     MarkAllReadOutSerializer,
@@ -14,7 +17,13 @@ from .serializers import (
     NotificationSerializer,
     UnreadCountSerializer,
 )
-from .services import get_or_create_notification_preferences, mark_all_read_for_user
+from .services import (
+    delete_all_for_user,
+    get_or_create_notification_preferences,
+    mark_all_read_for_user,
+    mark_notification_read,
+    unread_counts,
+)
 
 
 @extend_schema_view(
@@ -56,7 +65,8 @@ class NotificationPagination(PageNumberPagination):
     summary="List notifications",
     description=(
         "Paginated notifications for the authenticated user. Response includes "
-        "`unread_count` (total unread, not just this page)."
+        "`unread_count` (total unread, not just this page). On the last page, `next` points to "
+        "the archived notifications when there are any."
     ),
     responses={200: NotificationSerializer(many=True)},
 )
@@ -71,48 +81,65 @@ class NotificationListView(generics.ListAPIView):
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         user = request.user
-        unread_count = Notification.objects.filter(user=user, read_at__isnull=True).count()
-        message_unread_count = Notification.objects.filter(
-            user=user,
-            notification_type=Notification.NotificationType.MESSAGE,
-            read_at__isnull=True,
-        ).count()
+        counts = unread_counts(user)
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             response = self.get_paginated_response(serializer.data)
-            response.data["unread_count"] = unread_count
-            response.data["message_unread_count"] = message_unread_count
+            if response.data["next"] is None and ArchivedNotificationChunk.objects.filter(user=user).exists():
+                # Past the live rows, paging continues into the archive.
+                response.data["next"] = request.build_absolute_uri(reverse("notification-archived"))
+            response.data.update(counts)
             return response
         serializer = self.get_serializer(queryset, many=True)
         return Response(
             {
                 "count": queryset.count(),
-                "unread_count": unread_count,
-                "message_unread_count": message_unread_count,
+                **counts,
                 "results": serializer.data,
             }
         )
 
 
+@extend_schema(
+    tags=["Notifications"],
+    summary="Archived notifications",
+    description=(
+        "Old read notifications moved to cold storage by `manage.py archive_history`, newest "
+        "first. Follow `next` (`?before_id=`) for older pages."
+    ),
+    responses={200: NotificationSerializer(many=True)},
+)
+class ArchivedNotificationListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            before_id = int(request.query_params.get("before_id") or 0) or None
+            page_size = int(request.query_params.get("page_size") or NotificationPagination.page_size)
+        except ValueError:
+            raise ParseError('"before_id" and "page_size" must be integers.')
+        page_size = max(1, min(page_size, NotificationPagination.max_page_size))
+        rows, has_more = archived_notification_page(request.user, before_id=before_id, limit=page_size)
+        next_url = None
+        if has_more:
+            next_url = request.build_absolute_uri(
+                f"{reverse('notification-archived')}?before_id={rows[-1].pk}&page_size={page_size}"
+            )
+        return Response({"next": next_url, "results": NotificationSerializer(rows, many=True).data})
+
+
 @extend_schema(
     tags=["Notifications"],
     summary="Unread notification count",
-    description="Lightweight poll endpoint for badge counts.",
+    description="Lightweight poll endpoint for badge counts (one primary-key lookup).",
     responses={200: UnreadCountSerializer},
 )
 class UnreadCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        n = Notification.objects.filter(user=user, read_at__isnull=True).count()
-        msg_n = Notification.objects.filter(
-            user=user,
-            notification_type=Notification.NotificationType.MESSAGE,
-            read_at__isnull=True,
-        ).count()
-        return Response({"unread_count": n, "message_unread_count": msg_n})
+        return Response(unread_counts(request.user))
 
 
 @extend_schema(
@@ -143,8 +170,7 @@ class NotificationMarkReadView(APIView):
         except Notification.DoesNotExist:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
         if n.read_at is None:
-            n.read_at = timezone.now()
-            n.save(update_fields=["read_at"])
+            mark_notification_read(n)
         serializer = NotificationSerializer(n)
         return Response(serializer.data)
 
@@ -160,10 +186,7 @@ class NotificationMarkAllReadView(APIView):
 
     def post(self, request):
         updated = mark_all_read_for_user(request.user)
-        unread = Notification.objects.filter(
-            user=request.user, read_at__isnull=True
-        ).count()
-        return Response({"updated": updated, "unread_count": unread})
+        return Response({"updated": updated, "unread_count": unread_counts(request.user)["unread_count"]})
 
 
 @extend_schema(
@@ -176,5 +199,8 @@ class NotificationClearAllView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        deleted, _ = Notification.objects.filter(user=request.user).delete()
+        deleted = delete_all_for_user(request.user)
+        archived = ArchivedNotificationChunk.objects.filter(user=request.user)
+        deleted += archived.aggregate(n=Sum("notification_count"))["n"] or 0
+        archived.delete()
         return Response({"deleted": deleted, "unread_count": 0})
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import (
+    ImageBlob,
     Property,
     PropertyImage,
     PropertyWishlist,
@@ -60,6 +61,14 @@ class PropertyImageAdmin(admin.ModelAdmin):
     raw_id_fields = ('property',)
 
 
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'ref_count', 'size', 'updated_at')
+    list_filter = ('ref_count',)
+    search_fields = ('name',)
+    readonly_fields = ('name', 'size', 'ref_count', 'created_at', 'updated_at')
+
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = (
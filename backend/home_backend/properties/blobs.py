@@ -0,0 +1,142 @@
+"""
+Reference counting for content-addressed image files (properties.storage).
+
+A PropertyImage row references its `image` and each variant name; every distinct name counts once
+per row. Row saves and deletes are handled by signals; code that changes `image` / `variants`
+with `.update()` or `bulk_update()` must call `acquire` / `release` itself. Both run in the
+caller's transaction, so a rollback leaves the counts as they were.
+"""
+
+from __future__ import annotations
+
+import posixpath
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ImageBlob
+
+
+def image_refs(image_name: str | None, variants: dict | None) -> set[str]:
+    """Distinct storage names one PropertyImage row holds on to."""
+    return {n for n in (image_name, *(variants or {}).values()) if n}
+
+
+def _size(storage, name):
+    if storage is None:
+        return None
+    try:
+        return storage.size(name)
+    except (OSError, NotImplementedError):
+        return None
+
+
+def acquire(names, storage=None) -> None:
+    """Add one reference per occurrence in `names`, creating ImageBlob rows as needed."""
+    for name, n in Counter(n for n in names if n).items():
+        bumped = ImageBlob.objects.filter(name=name).update(
+            ref_count=F('ref_count') + n,
+            updated_at=timezone.now(),
+        )
+        if bumped:
+            continue
+        try:
+            with transaction.atomic():
+                ImageBlob.objects.create(name=name, size=_size(storage, name), ref_count=n)
+        except IntegrityError:
+            # Created concurrently by another acquire.
+            ImageBlob.objects.filter(name=name).update(ref_count=F('ref_count') + n, updated_at=timezone.now())
+
+
+def release(names) -> None:
+    """Drop one reference per occurrence in `names`; the files stay until the sweep runs."""
+    for name, n in Counter(n for n in names if n).items():
+        ImageBlob.objects.filter(name=name).update(
+            ref_count=Greatest(F('ref_count') - n, 0),
+            updated_at=timezone.now(),
+        )
+
+
+def register(names, storage=None) -> None:
+    """Track stored files nothing references yet, so the sweep can remove them after the grace period."""
+    rows = [ImageBlob(name=name, size=_size(storage, name), ref_count=0) for name in {n for n in names if n}]
+    ImageBlob.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def _modified_after(storage, name, cutoff) -> bool:
+    try:
+        return storage.get_modified_time(name) >= cutoff
+    except (OSError, NotImplementedError):
+        return False
+
+
+def sweep_unreferenced(storage, *, grace: timedelta, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """
+    Delete blobs unreferenced for longer than `grace`, plus their files. A blob that a save reused
+    in the meantime (fresh mtime, see ContentAddressedMixin) or that regained a reference is kept.
+    """
+    cutoff = timezone.now() - grace
+    stats = {"deleted": 0, "bytes": 0, "kept": 0}
+    last_id = 0
+    while True:
+        batch = list(
+            ImageBlob.objects.filter(ref_count=0, updated_at__lt=cutoff, pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", "name", "size")[:batch_size]
+        )
+        if not batch:
+            return stats
+        last_id = batch[-1][0]
+        for pk, name, size in batch:
+            if _modified_after(storage, name, cutoff):
+                stats["kept"] += 1
+                continue
+            if size is None:
+                size = _size(storage, name)
+            if not dry_run:
+                deleted, _ = ImageBlob.objects.filter(pk=pk, ref_count=0, updated_at__lt=cutoff).delete()
+                if not deleted:
+                    stats["kept"] += 1
+                    continue
+                storage.delete(name)
+            stats["deleted"] += 1
+            stats["bytes"] += size or 0
+
+
+def _walk(storage, directory):
+    dirs, files = storage.listdir(directory)
+    for f in files:
+        yield posixpath.join(directory, f)
+    for d in dirs:
+        yield from _walk(storage, posixpath.join(directory, d))
+
+
+def sweep_orphan_files(storage, directory: str, *, grace: timedelta, dry_run: bool = False) -> dict:
+    """
+    Delete files under `directory` that no ImageBlob tracks and no PropertyImage references, e.g.
+    duplicates left behind by uploads made before content addressing.
+    """
+    from .models import PropertyImage
+
+    cutoff = timezone.now() - grace
+    known = set(ImageBlob.objects.values_list("name", flat=True).iterator())
+    for image_name, variants in PropertyImage.objects.values_list("image", "variants").iterator():
+        known |= image_refs(image_name, variants)
+    stats = {"deleted": 0, "bytes": 0}
+    try:
+        names = list(_walk(storage, directory))
+    except FileNotFoundError:
+        return stats
+    for name in names:
+        if name in known or _modified_after(storage, name, cutoff):
+            continue
+        size = _size(storage, name) or 0
+        if not dry_run:
+            storage.delete(name)
+        stats["deleted"] += 1
+        stats["bytes"] += size
+    return stats
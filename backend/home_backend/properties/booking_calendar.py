@@ -0,0 +1,224 @@
+"""
+Booking calendar feed shared by the host and admin calendar endpoints.
+
+Callers pass an already-scoped Booking queryset (host-owned or platform-wide); this module
+handles range/property filtering, keyset pagination on (check_in, id), optional grouping by
+property, and a compact wire format with interned property/tenant tables.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+
+CALENDAR_BOOKING_STATUSES = ('pending', 'confirmed', 'active', 'completed')
+CALENDAR_DEFAULT_LIMIT = 500
+CALENDAR_MAX_LIMIT = 2000
+
+# Column order for compact event tuples (property / tenant are indexes into the interned tables).
+COMPACT_EVENT_FIELDS = ('booking_id', 'property', 'tenant', 'check_in', 'check_out', 'status', 'guests')
+
+_ROW_FIELDS = (
+    'id',
+    'rented_property_id',
+    'rented_property__title',
+    'user_id',
+    'user__first_name',
+    'user__last_name',
+    'user__username',
+    'check_in',
+    'check_out',
+    'status',
+    'guests',
+)
+
+
+def _truthy(raw) -> bool:
+    return str(raw or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _parse_day(raw: str) -> date:
+    return datetime.strptime(raw, '%Y-%m-%d').date()
+
+
+def encode_calendar_cursor(check_in: date, booking_id: int) -> str:
+    raw = f'{check_in.isoformat()}|{booking_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_calendar_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        day_s, id_s = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        return _parse_day(day_s), int(id_s)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ParseError('Invalid "cursor".')
+
+
+def parse_property_ids(raw) -> list[int] | None:
+    """Comma-separated property ids (`property_ids=3,7`); None when not supplied."""
+    if raw is None or not str(raw).strip():
+        return None
+    try:
+        ids = [int(p) for p in str(raw).split(',') if p.strip()]
+    except ValueError:
+        raise ParseError('"property_ids" must be a comma-separated list of integers.')
+    return ids or None
+
+
+def parse_calendar_params(query_params) -> dict:
+    """
+    Validate calendar query params. Raises ParseError (400 with a `detail` string, same shape
+    the calendar endpoints have always returned).
+    """
+    start_s = query_params.get('start')
+    end_s = query_params.get('end')
+    if not start_s or not end_s:
+        raise ParseError('Query params "start" and "end" are required (YYYY-MM-DD).')
+    try:
+        start_date = _parse_day(start_s)
+        end_date = _parse_day(end_s)
+    except ValueError:
+        raise ParseError('Invalid date format. Use YYYY-MM-DD.')
+    if end_date < start_date:
+        raise ParseError('"end" must be >= "start".')
+
+    # `property` (single id) is kept for parity with /host/bookings/?property=
+    property_ids = parse_property_ids(query_params.get('property_ids') or query_params.get('property'))
+
+    try:
+        limit = int(query_params.get('limit', CALENDAR_DEFAULT_LIMIT))
+    except ValueError:
+        limit = CALENDAR_DEFAULT_LIMIT
+    limit = max(1, min(limit, CALENDAR_MAX_LIMIT))
+
+    group = (query_params.get('group') or '').strip().lower()
+    if group not in ('', 'property'):
+        raise ParseError('"group" must be "property" when provided.')
+
+    cursor = query_params.get('cursor')
+    return {
+        'start': start_date,
+        'end': end_date,
+        'property_ids': property_ids,
+        'limit': limit,
+        'cursor': decode_calendar_cursor(cursor) if cursor else None,
+        'group_by_property': group == 'property',
+        'compact': _truthy(query_params.get('compact')),
+    }
+
+
+def calendar_bookings_page(bookings_qs, params: dict):
+    """
+    One keyset page of booking rows overlapping [start, end] as value tuples (see _ROW_FIELDS).
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    qs = bookings_qs.filter(
+        status__in=CALENDAR_BOOKING_STATUSES,
+        check_in__lte=params['end'],
+        check_out__gt=params['start'],
+    )
+    if params['property_ids']:
+        qs = qs.filter(rented_property_id__in=params['property_ids'])
+    if params['cursor']:
+        c_day, c_id = params['cursor']
+        qs = qs.filter(Q(check_in__gt=c_day) | Q(check_in=c_day, id__gt=c_id))
+
+    limit = params['limit']
+    rows = list(qs.order_by('check_in', 'id').values_list(*_ROW_FIELDS)[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_calendar_cursor(last[7], last[0])
+    return rows, next_cursor
+
+
+def _tenant_label(first_name: str, last_name: str, username: str) -> str:
+    # Mirrors AbstractUser.get_full_name() with username fallback.
+    return f'{first_name} {last_name}'.strip() or username
+
+
+def _event_dict(row) -> dict:
+    (b_id, prop_id, prop_title, _user_id, first, last, username,
+     check_in, check_out, status, guests) = row
+    check_in_s = check_in.isoformat()
+    check_out_s = check_out.isoformat()
+    return {
+        'id': str(b_id),
+        'booking_id': b_id,
+        'title': f'{prop_title} · {_tenant_label(first, last, username)}',
+        'start': check_in_s,
+        'end': check_out_s,
+        'status': status,
+        'property_id': prop_id,
+        'property_title': prop_title,
+        'all_day': True,
+        'check_in': check_in_s,
+        'check_out': check_out_s,
+        'guests': guests,
+    }
+
+
+def _compact_payload(rows, group_by_property: bool) -> dict:
+    properties: list[dict] = []
+    tenants: list[dict] = []
+    prop_index: dict[int, int] = {}
+    tenant_index: dict[int, int] = {}
+    events = []
+    for (b_id, prop_id, prop_title, user_id, first, last, username,
+         check_in, check_out, status, guests) in rows:
+        p_idx = prop_index.get(prop_id)
+        if p_idx is None:
+            p_idx = prop_index[prop_id] = len(properties)
+            properties.append({'id': prop_id, 'title': prop_title})
+        t_idx = tenant_index.get(user_id)
+        if t_idx is None:
+            t_idx = tenant_index[user_id] = len(tenants)
+            tenants.append({'id': user_id, 'name': _tenant_label(first, last, username)})
+        events.append([b_id, p_idx, t_idx, check_in.isoformat(), check_out.isoformat(), status, guests])
+
+    payload = {'properties': properties, 'tenants': tenants, 'fields': list(COMPACT_EVENT_FIELDS)}
+    if group_by_property:
+        grouped: dict[int, list] = {}
+        for ev in events:
+            grouped.setdefault(ev[1], []).append(ev)
+        payload['groups'] = [{'property': idx, 'events': evs} for idx, evs in grouped.items()]
+    else:
+        payload['events'] = events
+    return payload
+
+
+def build_calendar_feed(bookings_qs, params: dict) -> dict:
+    """
+    Response body for the host/admin calendar. Default shape is `{"events": [...]}` (unchanged
+    event dicts) plus `next_cursor`; `group=property` nests events per listing; `compact=1`
+    returns interned `properties` / `tenants` tables and positional event tuples.
+    """
+    rows, next_cursor = calendar_bookings_page(bookings_qs, params)
+
+    if params['compact']:
+        payload = _compact_payload(rows, params['group_by_property'])
+    elif params['group_by_property']:
+        groups: dict[int, dict] = {}
+        for row in rows:
+            ev = _event_dict(row)
+            group = groups.get(ev['property_id'])
+            if group is None:
+                group = groups[ev['property_id']] = {
+                    'property_id': ev['property_id'],
+                    'property_title': ev['property_title'],
+                    'events': [],
+                }
+            group['events'].append(ev)
+        payload = {'groups': list(groups.values())}
+    else:
+        payload = {'events': [_event_dict(row) for row in rows]}
+
+    payload['next_cursor'] = next_cursor
+    payload['has_more'] = next_cursor is not None
+    return payload
@@ -0,0 +1,148 @@
+"""
+Forward cash-flow projection from the payment schedule.
+
+Outstanding (pending / overdue) BookingPayment rows are summed per (due month, listing currency)
+in a single grouped query. Optionally each amount is weighted by how likely its booking is to
+pay, based on the booking status. Installments already past due are reported in an `overdue`
+bucket rather than in the monthly series.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.db import models
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from . import dashboard_cache
+
+CASHFLOW_PAYMENT_STATUSES = ('pending', 'overdue')
+CASHFLOW_DEFAULT_MONTHS = 12
+CASHFLOW_MIN_MONTHS = 3
+CASHFLOW_MAX_MONTHS = 24
+
+# Chance an outstanding installment is collected, by booking status. Cancelled / rejected
+# bookings are excluded from the projection altogether.
+CASHFLOW_STATUS_PROBABILITY = {
+    'active': Decimal('0.95'),
+    'confirmed': Decimal('0.85'),
+    'completed': Decimal('0.60'),
+    'pending': Decimal('0.40'),
+}
+
+_CENT = Decimal('0.01')
+
+
+def _add_months(day: date, months: int) -> date:
+    y, m = divmod(day.month - 1 + months, 12)
+    return date(day.year + y, m + 1, 1)
+
+
+def _month_label(day) -> str:
+    return f'{day.year:04d}-{day.month:02d}'
+
+
+def parse_cashflow_params(query_params) -> dict:
+    try:
+        months = int(query_params.get('months', CASHFLOW_DEFAULT_MONTHS))
+    except ValueError:
+        months = CASHFLOW_DEFAULT_MONTHS
+    weighted = str(query_params.get('weighted') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+    return {
+        'months': max(CASHFLOW_MIN_MONTHS, min(months, CASHFLOW_MAX_MONTHS)),
+        'weighted': weighted,
+    }
+
+
+def _expected_amount():
+    return models.Sum(
+        models.Case(
+            *[
+                models.When(booking__status=status, then=models.F('amount') * models.Value(p))
+                for status, p in CASHFLOW_STATUS_PROBABILITY.items()
+            ],
+            default=models.Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=14, decimal_places=4),
+        )
+    )
+
+
+def build_cashflow_projection(payments_qs, *, months: int = CASHFLOW_DEFAULT_MONTHS,
+                              weighted: bool = False) -> dict:
+    """
+    `payments_qs` is an already-scoped BookingPayment queryset (one host, or the platform).
+    Series are aligned to `labels` (YYYY-MM, current month first); amounts are decimal strings.
+    """
+    first_month = timezone.now().date().replace(day=1)
+    horizon = _add_months(first_month, months)
+    labels = [_month_label(_add_months(first_month, i)) for i in range(months)]
+    # Aliases must not shadow the `amount` column the weighted Case reads.
+    aggregates = {'amount_sum': models.Sum('amount')}
+    if weighted:
+        aggregates['expected_sum'] = _expected_amount()
+
+    rows = (
+        payments_qs.filter(
+            status__in=CASHFLOW_PAYMENT_STATUSES,
+            due_date__lt=horizon,
+            booking__status__in=tuple(CASHFLOW_STATUS_PROBABILITY),
+        )
+        .annotate(month=TruncMonth('due_date'), currency=models.F('booking__rented_property__currency'))
+        .values('month', 'currency')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+    keys = ('amount', 'expected') if weighted else ('amount',)
+    index = {label: i for i, label in enumerate(labels)}
+    series: dict[str, dict[str, list[Decimal]]] = {}
+    overdue: dict[str, dict[str, Decimal]] = {}
+    for row in rows:
+        cur = row['currency']
+        month = row['month']
+        if month < first_month:
+            bucket = overdue.setdefault(cur, {k: Decimal('0') for k in keys})
+            for k in keys:
+                bucket[k] += row[f'{k}_sum'] or Decimal('0')
+            continue
+        per_cur = series.setdefault(cur, {k: [Decimal('0')] * months for k in keys})
+        i = index[_month_label(month)]
+        for k in keys:
+            per_cur[k][i] += row[f'{k}_sum'] or Decimal('0')
+
+    currencies = sorted(set(series) | set(overdue))
+    out_series = {}
+    totals = {}
+    for cur in currencies:
+        per_cur = series.get(cur) or {k: [Decimal('0')] * months for k in keys}
+        late = overdue.get(cur) or {k: Decimal('0') for k in keys}
+        out_series[cur] = {k: [str(v.quantize(_CENT)) for v in per_cur[k]] for k in keys}
+        totals[cur] = {}
+        for k in keys:
+            totals[cur][k] = str(sum(per_cur[k], Decimal('0')).quantize(_CENT))
+            totals[cur][f'overdue_{k}'] = str(late[k].quantize(_CENT))
+
+    payload = {
+        'months': months,
+        'weighted': weighted,
+        'labels': labels,
+        'currencies': currencies,
+        'series': out_series,
+        'totals': totals,
+    }
+    if weighted:
+        payload['probabilities'] = {k: float(v) for k, v in CASHFLOW_STATUS_PROBABILITY.items()}
+    return payload
+
+
+def cached_cashflow_projection(scope, payments_qs, *, months: int, weighted: bool) -> dict:
+    """Projection through the dashboard cache; `scope` is a host id or dashboard_cache.PLATFORM_SCOPE."""
+    first_month = _month_label(timezone.now().date())
+    return dashboard_cache.get_or_build(
+        scope,
+        'cashflow',
+        (first_month, months, int(weighted)),
+        lambda: build_cashflow_projection(payments_qs, months=months, weighted=weighted),
+    )
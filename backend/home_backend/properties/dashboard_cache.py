@@ -0,0 +1,62 @@
+"""
+Cache for host/admin dashboard aggregates.
+
+Keys are namespaced by a per-host version counter (plus one platform-wide counter for admin
+views). Writes that change what a dashboard shows bump the version instead of deleting keys,
+so every cached aggregate for that host goes stale at once and old entries simply expire.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+
+PLATFORM_SCOPE = 'platform'
+
+
+def _timeout() -> int:
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def _version_key(scope) -> str:
+    return f'dash:v:{scope}'
+
+
+def _version(scope) -> int:
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key) or 1
+    return version
+
+
+def bump(scope) -> None:
+    """Invalidate every cached aggregate for `scope` (a host id or PLATFORM_SCOPE)."""
+    key = _version_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def bump_host(host_id) -> None:
+    """Host aggregates changed; the platform-wide admin views include them too."""
+    if host_id is not None:
+        bump(host_id)
+    bump(PLATFORM_SCOPE)
+
+
+def cache_key(scope, name: str, *parts) -> str:
+    suffix = ':'.join(str(p) for p in parts)
+    return f'dash:{scope}:{_version(scope)}:{name}:{suffix}'
+
+
+def get_or_build(scope, name: str, parts: tuple, builder):
+    """Return the cached value for (scope, name, parts), computing it with `builder()` on a miss."""
+    key = cache_key(scope, name, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, _timeout())
+    return value
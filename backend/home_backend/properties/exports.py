@@ -0,0 +1,234 @@
+"""
+Streaming CSV / NDJSON exports of booking payments and bookings (accounting downloads).
+
+Rows are read as value tuples from `.iterator(chunk_size=EXPORT_CHUNK_SIZE)` and written one at a
+time into a StreamingHttpResponse (through properties.streaming, which keeps ASGI from buffering
+the body), so memory stays flat regardless of row count. Each dataset
+declares its columns once; `compile_columns` turns that into the values_list lookups plus a
+positional mapper, so per-row work is a list comprehension over precomputed (indexes, formatter)
+pairs.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import re
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import models
+from rest_framework.exceptions import ParseError
+
+from .booking_calendar import parse_property_ids
+from .models import Booking, BookingPayment
+
+EXPORT_CHUNK_SIZE = 2000
+_CENT = Decimal('0.01')
+# Leading characters that make spreadsheet apps evaluate a cell; plain negative numbers stay as is.
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+_NUMBER = re.compile(r'-?\d+(\.\d+)?')
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def _text(value):
+    """CSV cell: text a spreadsheet would run as a formula (=, +, -, @, tab, CR) gets a leading '."""
+    if value is None:
+        return ''
+    if isinstance(value, str) and value[:1] in _FORMULA_PREFIXES and not _NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _decimal(value):
+    return str(value) if value is not None else None
+
+
+def _money(value):
+    # Subquery sums come back unscaled on some backends (SQLite: 300 instead of 300.00).
+    return str(Decimal(value).quantize(_CENT)) if value is not None else None
+
+
+def _full_name(first, last, username):
+    # Mirrors AbstractUser.get_full_name() with username fallback.
+    return f'{first} {last}'.strip() or username
+
+
+# (column name, lookup or tuple of lookups, formatter taking one value per lookup)
+PAYMENT_COLUMNS = (
+    ('id', 'id', None),
+    ('booking_id', 'booking_id', None),
+    ('property_id', 'booking__rented_property_id', None),
+    ('property_title', 'booking__rented_property__title', None),
+    ('currency', 'booking__rented_property__currency', None),
+    ('customer', ('booking__user__first_name', 'booking__user__last_name', 'booking__user__username'), _full_name),
+    ('customer_email', 'booking__user__email', None),
+    ('payment_type', 'payment_type', None),
+    ('month_number', 'month_number', None),
+    ('amount', 'amount', _decimal),
+    ('due_date', 'due_date', _iso),
+    ('status', 'status', None),
+    ('paid_date', 'paid_date', _iso),
+    ('payment_method', 'payment_method', None),
+    ('transaction_id', 'transaction_id', None),
+)
+
+BOOKING_COLUMNS = (
+    ('id', 'id', None),
+    ('property_id', 'rented_property_id', None),
+    ('property_title', 'rented_property__title', None),
+    ('currency', 'rented_property__currency', None),
+    ('tenant', ('user__first_name', 'user__last_name', 'user__username'), _full_name),
+    ('tenant_email', 'user__email', None),
+    ('check_in', 'check_in', _iso),
+    ('check_out', 'check_out', _iso),
+    ('guests', 'guests', None),
+    ('booking_type', 'booking_type', None),
+    ('months_booked', 'months_booked', None),
+    ('agreed_monthly_rate', 'agreed_monthly_rate', _decimal),
+    ('total_price', 'total_price', _decimal),
+    ('security_deposit', 'security_deposit', _decimal),
+    ('discount_applied', 'discount_applied', _decimal),
+    ('tenant_payment_channel', 'tenant_payment_channel', None),
+    ('status', 'status', None),
+    ('deposit_paid', 'deposit_paid', None),
+    ('paid_amount', 'export_paid_amount', _money),
+    ('outstanding_amount', 'export_outstanding_amount', _money),
+    ('created_at', 'created_at', _iso),
+)
+
+
+def compile_columns(columns):
+    """
+    Returns (header, lookups, mapper). `lookups` feeds values_list(); `mapper(row)` returns the
+    output values in header order.
+    """
+    lookups: list[str] = []
+    position: dict[str, int] = {}
+    plan = []
+    for _name, lookup, fmt in columns:
+        parts = lookup if isinstance(lookup, tuple) else (lookup,)
+        idx = []
+        for part in parts:
+            if part not in position:
+                position[part] = len(lookups)
+                lookups.append(part)
+            idx.append(position[part])
+        plan.append((idx[0], None, fmt) if len(idx) == 1 else (None, tuple(idx), fmt))
+
+    def mapper(row):
+        return [
+            (row[i] if fmt is None else fmt(row[i])) if i is not None
+            else fmt(*[row[j] for j in many])
+            for i, many, fmt in plan
+        ]
+
+    return [c[0] for c in columns], lookups, mapper
+
+
+_COMPILED = {
+    'payments': compile_columns(PAYMENT_COLUMNS),
+    'bookings': compile_columns(BOOKING_COLUMNS),
+}
+
+_DATASETS = {
+    'payments': {
+        'date_field': 'due_date',
+        'statuses': frozenset(c[0] for c in BookingPayment.STATUS_CHOICES),
+        'property_lookup': 'booking__rented_property_id',
+        'order_by': ('due_date', 'id'),
+    },
+    'bookings': {
+        'date_field': 'check_in',
+        'statuses': frozenset(c[0] for c in Booking.STATUS_CHOICES),
+        'property_lookup': 'rented_property_id',
+        'order_by': ('check_in', 'id'),
+    },
+}
+
+
+def _payment_total_subquery(statuses):
+    return models.Subquery(
+        BookingPayment.objects.filter(booking_id=models.OuterRef('pk'), status__in=statuses)
+        .order_by()
+        .values('booking_id')
+        .annotate(t=models.Sum('amount'))
+        .values('t')[:1],
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def export_bookings_queryset(bookings_qs):
+    """Per-booking payment totals as correlated subqueries (no N+1, no GROUP BY on the row)."""
+    return bookings_qs.annotate(
+        export_paid_amount=_payment_total_subquery(('paid',)),
+        export_outstanding_amount=_payment_total_subquery(('pending', 'overdue')),
+    )
+
+
+def parse_export_params(dataset: str, query_params) -> dict:
+    """start/end (YYYY-MM-DD, inclusive, on due_date or check_in), status (comma-separated), property_ids."""
+    spec = _DATASETS[dataset]
+    try:
+        start = datetime.strptime(query_params['start'], '%Y-%m-%d').date() if query_params.get('start') else None
+        end = datetime.strptime(query_params['end'], '%Y-%m-%d').date() if query_params.get('end') else None
+    except ValueError:
+        raise ParseError('Invalid date format. Use YYYY-MM-DD.')
+    if start and end and end < start:
+        raise ParseError('"end" must be >= "start".')
+    statuses = [s.strip() for s in str(query_params.get('status') or '').split(',') if s.strip()]
+    invalid = [s for s in statuses if s not in spec['statuses']]
+    if invalid:
+        raise ParseError(
+            f'Invalid status value(s): {", ".join(invalid)}. '
+            f'Allowed: {", ".join(sorted(spec["statuses"]))}.'
+        )
+    return {
+        'start': start,
+        'end': end,
+        'statuses': statuses or None,
+        'property_ids': parse_property_ids(query_params.get('property_ids')),
+    }
+
+
+def filter_export_queryset(dataset: str, qs, params: dict):
+    spec = _DATASETS[dataset]
+    date_field = spec['date_field']
+    if params['start']:
+        qs = qs.filter(**{f'{date_field}__gte': params['start']})
+    if params['end']:
+        qs = qs.filter(**{f'{date_field}__lte': params['end']})
+    if params['statuses']:
+        qs = qs.filter(status__in=params['statuses'])
+    if params['property_ids']:
+        qs = qs.filter(**{f'{spec["property_lookup"]}__in': params['property_ids']})
+    return qs.order_by(*spec['order_by'])
+
+
+class _Echo:
+    """csv.writer target that hands each formatted line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(dataset: str, qs, fmt: str):
+    """Yield the export body line by line."""
+    header, lookups, mapper = _COMPILED[dataset]
+    rows = qs.values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([_text(v) for v in mapper(row)])
+    else:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        for row in rows:
+            yield dumps(dict(zip(header, mapper(row)))) + '\n'
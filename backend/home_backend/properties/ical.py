@@ -0,0 +1,174 @@
+"""
+iCalendar (.ics) booking feeds for external calendar apps.
+
+Feeds are addressed by an HMAC token (no login: calendar clients cannot send JWTs), streamed
+from an iterator queryset (through properties.streaming, so ASGI does not buffer the body) so
+memory stays flat for large portfolios, and carry a strong ETag derived from a single aggregate
+query so polling clients get cheap 304s.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+ICAL_FEED_VERSION = "1"
+ICAL_FEED_STATUSES = ("pending", "confirmed", "active", "completed")
+ICAL_HISTORY_DAYS = 365
+ICAL_CHUNK_SIZE = 500
+
+_ICAL_STATUS = {
+    "pending": "TENTATIVE",
+    "confirmed": "CONFIRMED",
+    "active": "CONFIRMED",
+    "completed": "CONFIRMED",
+}
+
+_ROW_FIELDS = (
+    "id",
+    "rented_property__title",
+    "rented_property__address",
+    "rented_property__city",
+    "user__first_name",
+    "user__last_name",
+    "user__username",
+    "check_in",
+    "check_out",
+    "status",
+    "guests",
+    "updated_at",
+)
+
+
+def _feed_digest(scope: str) -> str:
+    msg = f"ical:{ICAL_FEED_VERSION}:{scope}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()[:40]
+
+
+def host_feed_token(user_id: int) -> str:
+    return _feed_digest(f"host:{user_id}")
+
+
+def property_feed_token(property_id: int, owner_id: int) -> str:
+    # Bound to the owner so a transferred listing invalidates previously shared URLs.
+    return _feed_digest(f"property:{property_id}:{owner_id}")
+
+
+def token_matches(expected: str, supplied: str) -> bool:
+    return hmac.compare_digest(expected, supplied or "")
+
+
+def feed_queryset(bookings_qs):
+    """Bookings worth syncing: open/recent stays, newest history bounded to ICAL_HISTORY_DAYS."""
+    since = timezone.now().date() - timedelta(days=ICAL_HISTORY_DAYS)
+    return bookings_qs.filter(status__in=ICAL_FEED_STATUSES, check_out__gte=since)
+
+
+def feed_etag(qs, scope: str) -> str:
+    """
+    Strong ETag for a feed. Every field rendered into the body comes from a booking, its property
+    or its tenant, so (count, max updated_at of each) changes whenever the body would. Code that
+    changes bookings with QuerySet.update() must set updated_at too, or cached feeds go stale.
+    """
+    agg = qs.aggregate(
+        n=models.Count("id"),
+        max_id=models.Max("id"),
+        booking_ts=models.Max("updated_at"),
+        property_ts=models.Max("rented_property__updated_at"),
+        user_ts=models.Max("user__updated_at"),
+    )
+    fingerprint = "|".join(
+        str(v)
+        for v in (
+            ICAL_FEED_VERSION,
+            scope,
+            timezone.now().date() - timedelta(days=ICAL_HISTORY_DAYS),
+            agg["n"],
+            agg["max_id"],
+            agg["booking_ts"],
+            agg["property_ts"],
+            agg["user_ts"],
+        )
+    )
+    return '"%s"' % hashlib.sha256(fingerprint.encode()).hexdigest()
+
+
+def _escape(text: str) -> str:
+    return (
+        str(text)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """RFC 5545 §3.1: lines longer than 75 octets are folded with CRLF + space."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while raw:
+        cut = min(limit, len(raw))
+        # Never split inside a multi-byte UTF-8 sequence.
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(raw[:cut].decode("utf-8"))
+        raw = raw[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc_stamp(dt) -> str:
+    return dt.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _vevent(row, host: str) -> str:
+    (b_id, title, address, city, first, last, username,
+     check_in, check_out, status, guests, updated_at) = row
+    tenant = f"{first} {last}".strip() or username
+    stamp = _utc_stamp(updated_at)
+    location = ", ".join(x for x in (address, city) if x)
+    lines = (
+        "BEGIN:VEVENT",
+        f"UID:booking-{b_id}@{host}",
+        f"DTSTAMP:{stamp}",
+        f"LAST-MODIFIED:{stamp}",
+        f"DTSTART;VALUE=DATE:{check_in.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{check_out.strftime('%Y%m%d')}",
+        f"SUMMARY:{_escape(f'{title} · {tenant}')}",
+        f"LOCATION:{_escape(location)}",
+        f"DESCRIPTION:{_escape(f'Booking #{b_id} ({status}), guests: {guests}')}",
+        f"STATUS:{_ICAL_STATUS.get(status, 'CONFIRMED')}",
+        "TRANSP:OPAQUE",
+        "END:VEVENT",
+    )
+    return "".join(_fold(line) for line in lines)
+
+
+def iter_ical_feed(qs, *, calendar_name: str, host: str):
+    """Yield the calendar as text chunks (header, one chunk per event, footer)."""
+    yield "".join(
+        _fold(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//Estatery//Bookings//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_escape(calendar_name)}",
+            "X-PUBLISHED-TTL:PT15M",
+        )
+    )
+    rows = qs.order_by("check_in", "id").values_list(*_ROW_FIELDS).iterator(chunk_size=ICAL_CHUNK_SIZE)
+    for row in rows:
+        yield _vevent(row, host)
+    yield "END:VCALENDAR\r\n"
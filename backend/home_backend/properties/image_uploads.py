@@ -0,0 +1,167 @@
+"""
+Adding several images to a listing in one request (bulk upload, or one zip archive).
+
+Files are checked and written to storage concurrently in a thread pool (hashing, disk writes and
+Pillow's header parsing all release the GIL). The 5-image cap is checked once under a lock on the
+property row, all rows are inserted with one bulk_create, and `is_primary` is settled with at most
+one UPDATE. WebP variants are rendered afterwards by the image job, one job per row, like
+single uploads.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from . import blobs
+from .images import ImageDecodeError, ImageTooLarge, discard_files, open_bounded
+from .models import Property, PropertyImage
+from .tasks import process_property_image
+
+MAX_IMAGES_PER_PROPERTY = 5
+ARCHIVE_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+_COPY_CHUNK = 1024 * 1024
+
+
+class ImageUploadError(Exception):
+    """Rejected bulk upload; the message is returned to the client as `detail`."""
+
+
+def max_upload_bytes() -> int:
+    return getattr(settings, 'PROPERTY_IMAGE_MAX_BYTES', 20 * 1024 * 1024)
+
+
+def files_from_archive(upload) -> list[File]:
+    """
+    Extract image entries of a zip upload into temp files (streamed, never all in memory).
+    Folders, hidden files and non-image extensions are skipped. The caller closes the files.
+    """
+    try:
+        archive = zipfile.ZipFile(upload)
+    except zipfile.BadZipFile as e:
+        raise ImageUploadError('"archive" is not a valid zip file.') from e
+    files = []
+    try:
+        with archive:
+            entries = [
+                info for info in archive.infolist()
+                if not info.is_dir()
+                and not any(part.startswith(('.', '__MACOSX')) for part in info.filename.split('/'))
+                and os.path.splitext(info.filename)[1].lower() in ARCHIVE_IMAGE_EXTENSIONS
+            ]
+            if len(entries) > MAX_IMAGES_PER_PROPERTY:
+                raise ImageUploadError(
+                    f"The archive holds {len(entries)} images; at most {MAX_IMAGES_PER_PROPERTY} are allowed."
+                )
+            for info in entries:
+                files.append(_extract(archive, info))
+    except BaseException:
+        close_files(files)
+        raise
+    return files
+
+
+def _extract(archive, info) -> File:
+    limit = max_upload_bytes()
+    if info.file_size > limit:
+        raise ImageUploadError(f'"{info.filename}" is larger than {limit // (1024 * 1024)} MB.')
+    tmp = tempfile.NamedTemporaryFile(suffix=os.path.splitext(info.filename)[1].lower())
+    try:
+        with archive.open(info) as src:
+            # The header size can lie (zip bombs); count what is actually inflated.
+            copied = 0
+            while chunk := src.read(_COPY_CHUNK):
+                copied += len(chunk)
+                if copied > limit:
+                    raise ImageUploadError(f'"{info.filename}" is larger than {limit // (1024 * 1024)} MB.')
+                tmp.write(chunk)
+        tmp.seek(0)
+    except BaseException:
+        tmp.close()
+        raise
+    return File(tmp, name=os.path.basename(info.filename))
+
+
+def close_files(files) -> None:
+    for f in files:
+        f.close()
+
+
+def _check_and_store(storage, field, instance, upload) -> str:
+    try:
+        open_bounded(upload)  # header only
+    except ImageTooLarge as e:
+        raise ImageUploadError(f'"{upload.name}" is too large: {e}') from e
+    except ImageDecodeError:
+        pass  # stored as uploaded, like single uploads
+    finally:
+        upload.seek(0)
+    name = field.generate_filename(instance, os.path.basename(upload.name or 'image'))
+    return storage.save(name, upload, max_length=field.max_length)
+
+
+def add_property_images(prop: Property, uploads, *, primary_index: int | None = None) -> list[PropertyImage]:
+    """
+    Store `uploads` as new images of `prop` in one transaction. `primary_index` picks the new
+    primary image (it replaces the current one); without it the first upload becomes primary only
+    when the listing has no images yet. Raises ImageUploadError.
+    """
+    uploads = list(uploads)
+    if not uploads:
+        raise ImageUploadError('Send image files in "images" or one zip file in "archive".')
+    if primary_index is not None and not 0 <= primary_index < len(uploads):
+        raise ImageUploadError(f'"primary_index" must be between 0 and {len(uploads) - 1}.')
+
+    field = PropertyImage._meta.get_field('image')
+    storage = field.storage
+    stored: list[str] = []
+    try:
+        with transaction.atomic():
+            # Serialises concurrent uploads to the same listing so the cap holds (no-op on SQLite,
+            # which serialises writers anyway).
+            Property.objects.select_for_update().filter(pk=prop.pk).values_list('pk', flat=True).first()
+            existing = PropertyImage.objects.filter(property=prop).count()
+            if existing + len(uploads) > MAX_IMAGES_PER_PROPERTY:
+                raise ImageUploadError(
+                    f"A maximum of {MAX_IMAGES_PER_PROPERTY} images is allowed per property "
+                    f"({existing} already, {len(uploads)} sent)."
+                )
+
+            instance = PropertyImage(property=prop)
+            workers = min(len(uploads), getattr(settings, 'PROPERTY_IMAGE_UPLOAD_THREADS', 4))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_check_and_store, storage, field, instance, u) for u in uploads]
+                # Collect every result first so files stored by other threads are known on error.
+                errors = []
+                for future in futures:
+                    try:
+                        stored.append(future.result())
+                    except Exception as e:  # noqa: BLE001 - re-raised below
+                        errors.append(e)
+                if errors:
+                    raise errors[0]
+
+            if primary_index is None and existing == 0:
+                primary_index = 0
+            if primary_index is not None and existing:
+                PropertyImage.objects.filter(property=prop, is_primary=True).update(is_primary=False)
+            rows = PropertyImage.objects.bulk_create(
+                [
+                    PropertyImage(property=prop, image=name, is_primary=(i == primary_index))
+                    for i, name in enumerate(stored)
+                ]
+            )
+            # bulk_create sends no post_save: count references and queue processing here.
+            blobs.acquire(stored, storage)
+            for row in rows:
+                process_property_image.enqueue(row.pk, dedupe_key=f"property-image:{row.pk}")
+    except BaseException:
+        discard_files(storage, stored)
+        raise
+    return rows
@@ -0,0 +1,221 @@
+"""
+Property image variants (thumb / card / full WebP), rendered off the request path.
+
+Uploads are stored as-is and a job (properties.tasks.process_property_image) renders the
+variants afterwards. Until it has run, `PropertyImage.processed_at` is null and the API reports
+`processing: true`, with every size falling back to the original upload. Once the variants exist,
+`image` points at the `full` variant and the original upload's reference is released. Files are
+content-addressed (properties.storage), so nothing here deletes a file directly: unused blobs are
+removed later by `manage.py sweep_image_blobs`.
+"""
+
+from __future__ import annotations
+
+import base64
+import posixpath
+from io import BytesIO
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from . import blobs
+from .blobs import image_refs
+from .models import PropertyImage
+
+# (name, longest edge in px, WebP quality), largest first: each size is resized from the previous.
+IMAGE_VARIANTS = (
+    ('full', 2048, 82),
+    ('card', 800, 80),
+    ('thumb', 320, 75),
+)
+IMAGE_VARIANT_NAMES = tuple(name for name, _edge, _q in IMAGE_VARIANTS)
+# 4 is within a few percent of method=6 on size at a fraction of the encode time.
+WEBP_METHOD = 4
+# First-paint placeholder stored on the row (a few hundred bytes as base64).
+PLACEHOLDER_EDGE = 20
+PLACEHOLDER_QUALITY = 40
+
+
+class ImageDecodeError(Exception):
+    """The upload is not an image Pillow can read; it is kept as uploaded."""
+
+
+class ImageTooLarge(ImageDecodeError):
+    """Decoding would need more than PROPERTY_IMAGE_MAX_PIXELS pixels."""
+
+
+# Modes Pillow resamples well; anything else (palette, 1-bit, 16-bit…) is converted before resizing.
+_RESIZABLE_MODES = {'RGB', 'RGBA', 'L', 'LA', 'CMYK', 'YCbCr'}
+
+
+def max_decode_pixels() -> int:
+    return getattr(settings, 'PROPERTY_IMAGE_MAX_PIXELS', 40_000_000)
+
+
+def open_bounded(fileobj, edge: int = IMAGE_VARIANTS[0][1]):
+    """
+    Open `fileobj` lazily (header only) and limit what decoding it will allocate. JPEGs are
+    switched to the smallest DCT scale (1/2, 1/4, 1/8) whose longest edge is still >= `edge`, so
+    a 48 MP photo decodes at 12 MP. Raises ImageTooLarge above PROPERTY_IMAGE_MAX_PIXELS
+    (counted after that reduction) and ImageDecodeError when the file is not an image.
+    Nothing is decoded until the caller loads the image; `fileobj` is left open.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        img = Image.open(fileobj)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e)) from e
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        raise ImageDecodeError(str(e)) from e
+    if img.format == 'JPEG':
+        width, height = img.size
+        scale = edge / max(width, height)
+        if scale < 1:
+            img.draft(None, (max(1, round(width * scale)), max(1, round(height * scale))))
+    width, height = img.size
+    if width * height > max_decode_pixels():
+        raise ImageTooLarge(
+            f'{width}x{height} is more than {max_decode_pixels() / 1_000_000:g} megapixels.'
+        )
+    return img
+
+
+class RenderedImage(NamedTuple):
+    variants: dict[str, bytes]  # {variant name: WebP bytes}
+    placeholder: str  # data: URI of a ~20 px WebP, shown blurred until the real image loads
+    dominant_color: str  # "#rrggbb"
+
+
+def render_variants(fileobj) -> RenderedImage:
+    """
+    Decode `fileobj` once and render every variant plus the first-paint placeholder. Never upscales.
+
+    Memory stays close to one bitmap of the `full` size: the decode is bounded by open_bounded,
+    the image is shrunk in place before any mode conversion or EXIF rotation, and each smaller
+    variant is resized from the previous one.
+    """
+    from PIL import Image, ImageOps
+
+    img = open_bounded(fileobj)
+    out = {}
+    with img:
+        try:
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            target_mode = 'RGBA' if has_alpha else 'RGB'
+            current = img if img.mode in _RESIZABLE_MODES else img.convert(target_mode)
+            full_edge = IMAGE_VARIANTS[0][1]
+            # Loads (at the draft scale) and shrinks in place; rotation and conversion then work
+            # on the small bitmap.
+            current.thumbnail((full_edge, full_edge), Image.Resampling.LANCZOS)
+            ImageOps.exif_transpose(current, in_place=True)
+            if current.mode != target_mode:
+                current = current.convert(target_mode)
+        except (OSError, ValueError) as e:
+            raise ImageDecodeError(str(e)) from e
+
+        for name, edge, quality in IMAGE_VARIANTS:
+            if max(current.size) > edge:
+                current = current.copy()
+                current.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            current.save(buffer, format='WEBP', quality=quality, method=WEBP_METHOD)
+            out[name] = buffer.getvalue()
+    return RenderedImage(out, *render_placeholder(current))
+
+
+def placeholder_from_file(fileobj) -> tuple[str, str]:
+    """render_placeholder for a stored file (e.g. an existing thumb variant), decoding as little as possible."""
+    from PIL import Image, ImageOps
+
+    img = open_bounded(fileobj, edge=PLACEHOLDER_EDGE * 4)
+    with img:
+        try:
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            small = img if img.mode in _RESIZABLE_MODES else img.convert('RGBA' if has_alpha else 'RGB')
+            small.thumbnail((PLACEHOLDER_EDGE * 4,) * 2, Image.Resampling.BOX)
+            ImageOps.exif_transpose(small, in_place=True)
+            return render_placeholder(small.convert('RGBA' if has_alpha else 'RGB'))
+        except (OSError, ValueError) as e:
+            raise ImageDecodeError(str(e)) from e
+
+
+def render_placeholder(img) -> tuple[str, str]:
+    """(data: URI of a PLACEHOLDER_EDGE px WebP, dominant "#rrggbb") from an already small image."""
+    from PIL import Image
+
+    tiny = img.copy()
+    tiny.thumbnail((PLACEHOLDER_EDGE, PLACEHOLDER_EDGE), Image.Resampling.BOX)
+    buffer = BytesIO()
+    tiny.save(buffer, format='WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+    data_uri = 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    # Most common colour after reducing to a few clusters; an average would turn into mud.
+    rgb = tiny.convert('RGB')
+    quantized = rgb.quantize(colors=4, method=Image.Quantize.MEDIANCUT)
+    _count, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    return data_uri, f'#{r:02x}{g:02x}{b:02x}'
+
+
+def variant_target(original: str, name: str) -> str:
+    """Name handed to storage for a variant; the storage replaces it with the content hash."""
+    return posixpath.join(posixpath.dirname(original), f'{name}.webp')
+
+
+def store_variants(storage, original: str, rendered: dict[str, bytes]) -> dict[str, str]:
+    """Save rendered variants next to `original`; returns {variant name: stored name}."""
+    # Content-addressed: re-rendering identical bytes, or another row's identical upload, reuses the file.
+    return {name: storage.save(variant_target(original, name), ContentFile(data)) for name, data in rendered.items()}
+
+
+def discard_files(storage, names) -> None:
+    """Stored files no row ended up using: leave them to sweep_image_blobs (they may be shared)."""
+    blobs.register(names, storage)
+
+
+def swap_refs(storage, old_refs, new_refs) -> None:
+    """Move one row's blob references from `old_refs` to `new_refs` (call inside its UPDATE's transaction)."""
+    old_refs, new_refs = set(old_refs), set(new_refs)
+    blobs.acquire(new_refs - old_refs, storage)
+    blobs.release(old_refs - new_refs)
+
+
+def process_property_image(image_id: int, *, force: bool = False) -> bool:
+    """
+    Render and store variants for one PropertyImage. Returns False when there was nothing to do
+    (row gone, already processed, or the upload is not a readable image).
+    """
+    row = PropertyImage.objects.filter(pk=image_id).only('id', 'image', 'variants', 'processed_at').first()
+    if row is None or not row.image or (row.processed_at and not force):
+        return False
+
+    original = row.image.name
+    try:
+        with row.image.open('rb') as fh:
+            rendered = render_variants(fh)
+    except (ImageDecodeError, FileNotFoundError):
+        # Matches the old inline conversion: unreadable (or missing) uploads stay as they are.
+        PropertyImage.objects.filter(pk=row.pk, image=original).update(processed_at=timezone.now())
+        return False
+
+    storage = row.image.storage
+    stored = store_variants(storage, original, rendered.variants)
+    with transaction.atomic():
+        updated = PropertyImage.objects.filter(pk=row.pk, image=original).update(
+            image=stored['full'],
+            variants=stored,
+            placeholder=rendered.placeholder,
+            dominant_color=rendered.dominant_color,
+            processed_at=timezone.now(),
+        )
+        if updated:
+            swap_refs(storage, image_refs(original, row.variants), stored.values())
+    if not updated:
+        # Row deleted or re-uploaded meanwhile; its new file gets its own job.
+        discard_files(storage, stored.values())
+        return False
+    return True
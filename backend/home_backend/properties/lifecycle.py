@@ -0,0 +1,235 @@
+"""
+Date-driven status transitions for bookings and payment installments.
+
+Nothing in the request path moves a booking from confirmed → active → completed or an
+installment from pending → overdue; `sweep_lifecycle` does it periodically so dashboards and
+filters can trust the stored status.
+
+Each transition walks its candidates in primary-key batches (keyset, so a dry run or skipped
+rows never loop) and flips a whole batch with one UPDATE ... WHERE id IN (...) guarded by the
+source status. Notifications for the rows the UPDATE actually moved are written with one bulk
+INSERT in the same transaction, and those hosts' dashboard caches are bumped on commit.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+from notifications.services import bulk_create_notifications
+
+from . import dashboard_cache
+from .models import Booking, BookingPayment
+
+LIFECYCLE_BATCH_SIZE = 1000
+
+# Installments on bookings that never went ahead are left alone.
+OVERDUE_BOOKING_STATUSES = ('confirmed', 'active', 'completed')
+
+_BOOKINGS_HREF = "/dashboard/bookings"
+
+
+def _to_activate(today):
+    return Booking.objects.filter(status='confirmed', check_in__lte=today, check_out__gt=today)
+
+
+def _to_complete(today):
+    return Booking.objects.filter(status__in=('confirmed', 'active'), check_out__lte=today)
+
+
+def _to_overdue(today):
+    return BookingPayment.objects.filter(
+        status='pending',
+        due_date__lt=today,
+        booking__status__in=OVERDUE_BOOKING_STATUSES,
+    )
+
+
+@dataclass(frozen=True)
+class Transition:
+    name: str
+    model: type
+    candidates: Callable  # today -> queryset of rows due for this transition
+    from_statuses: tuple
+    to_status: str
+    # Extra columns read per row; the row tuple is (pk, owner_id, *columns).
+    columns: tuple
+    notify: Callable  # row -> iterable of notification field dicts
+    stamp_field: str | None = None
+
+
+def _activated_notifications(row):
+    _pk, owner_id, user_id, username, title = row
+    return (
+        {
+            'user_id': user_id,
+            'title': "Your stay has started",
+            'body': f"Your booking for \"{title}\" is now active.",
+        },
+        {
+            'user_id': owner_id,
+            'title': "Booking now active",
+            'body': f"Booking for \"{title}\" (customer: {username}) is now active.",
+        },
+    )
+
+
+def _completed_notifications(row):
+    _pk, owner_id, user_id, username, title = row
+    return (
+        {
+            'user_id': user_id,
+            'title': "Booking completed",
+            'body': f"Your stay at \"{title}\" has ended. You can now leave a review.",
+        },
+        {
+            'user_id': owner_id,
+            'title': "Booking completed",
+            'body': f"Booking for \"{title}\" (customer: {username}) has been completed.",
+        },
+    )
+
+
+_PAYMENT_TYPE_LABELS = dict(BookingPayment.PAYMENT_TYPES)
+
+
+def _overdue_notifications(row):
+    _pk, owner_id, user_id, username, title, payment_type, amount, currency, due_date = row
+    label = _PAYMENT_TYPE_LABELS.get(payment_type, payment_type).lower()
+    due = due_date.isoformat()
+    return (
+        {
+            'user_id': user_id,
+            'title': "Payment overdue",
+            'body': f"Your {label} payment of {currency} {amount} for \"{title}\" was due on {due}.",
+        },
+        {
+            'user_id': owner_id,
+            'title': "Tenant payment overdue",
+            'body': (
+                f"{username}'s {label} payment of {currency} {amount} for \"{title}\" "
+                f"was due on {due}."
+            ),
+        },
+    )
+
+
+_BOOKING_COLUMNS = ('user_id', 'user__username', 'rented_property__title')
+
+TRANSITIONS = (
+    Transition(
+        name='activated',
+        model=Booking,
+        candidates=_to_activate,
+        from_statuses=('confirmed',),
+        to_status='active',
+        columns=_BOOKING_COLUMNS,
+        notify=_activated_notifications,
+    ),
+    # Runs after activation so a stay that already ended goes straight to completed.
+    Transition(
+        name='completed',
+        model=Booking,
+        candidates=_to_complete,
+        from_statuses=('confirmed', 'active'),
+        to_status='completed',
+        columns=_BOOKING_COLUMNS,
+        notify=_completed_notifications,
+        stamp_field='completed_at',
+    ),
+    Transition(
+        name='overdue',
+        model=BookingPayment,
+        candidates=_to_overdue,
+        from_statuses=('pending',),
+        to_status='overdue',
+        columns=(
+            'booking__user_id',
+            'booking__user__username',
+            'booking__rented_property__title',
+            'payment_type',
+            'amount',
+            'booking__rented_property__currency',
+            'due_date',
+        ),
+        notify=_overdue_notifications,
+    ),
+)
+
+_OWNER_LOOKUP = {
+    Booking: 'rented_property__owner_id',
+    BookingPayment: 'booking__rented_property__owner_id',
+}
+
+
+def _bump_hosts(owner_ids) -> None:
+    for owner_id in owner_ids:
+        dashboard_cache.bump_host(owner_id)
+
+
+def _run_transition(t: Transition, today, now, *, batch_size: int, notify: bool) -> int:
+    qs = t.candidates(today).order_by('pk')
+    fields = ('pk', _OWNER_LOOKUP[t.model], *t.columns)
+    changes = {'status': t.to_status, 'updated_at': now}
+    if t.stamp_field:
+        changes[t.stamp_field] = now
+    last_pk = 0
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                qs.filter(pk__gt=last_pk)
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list(*fields)[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            ids = [r[0] for r in rows]
+            updated = t.model.objects.filter(pk__in=ids, status__in=t.from_statuses).update(**changes)
+            total += updated
+            if updated < len(rows):
+                # Some rows changed status under us (no row locks on SQLite, or a concurrent edit):
+                # notify and bump only for the rows this UPDATE moved.
+                moved = set(
+                    t.model.objects.filter(pk__in=ids, status=t.to_status, updated_at=now)
+                    .values_list('pk', flat=True)
+                )
+                rows = [r for r in rows if r[0] in moved]
+            if notify:
+                bulk_create_notifications(
+                    dict(
+                        n,
+                        notification_type=Notification.NotificationType.PROPERTY_ALERT,
+                        action_href=_BOOKINGS_HREF,
+                        action_label="View booking",
+                    )
+                    for r in rows
+                    for n in t.notify(r)
+                )
+            owners = {r[1] for r in rows}
+            if owners:
+                transaction.on_commit(lambda owners=owners: _bump_hosts(owners))
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+def sweep_lifecycle(*, today=None, batch_size: int = LIFECYCLE_BATCH_SIZE, dry_run: bool = False,
+                    notify: bool = True) -> dict:
+    """
+    Apply every due transition. Returns {transition name: rows moved} (rows that would move on
+    a dry run).
+    """
+    now = timezone.now()
+    today = today or now.date()
+    if dry_run:
+        return {t.name: t.candidates(today).count() for t in TRANSITIONS}
+    return {
+        t.name: _run_transition(t, today, now, batch_size=batch_size, notify=notify)
+        for t in TRANSITIONS
+    }
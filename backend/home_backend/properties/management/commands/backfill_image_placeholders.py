@@ -0,0 +1,72 @@
+"""
+Fill `placeholder` / `dominant_color` for property images processed before placeholders existed.
+
+Reads the stored `thumb` variant (320 px) when there is one, otherwise the image itself with a
+bounded decode, so the run is cheap compared with backfill_property_images_webp.
+
+Usage (from backend/home_backend):
+  python manage.py backfill_image_placeholders
+  python manage.py backfill_image_placeholders --batch-size 500 --dry-run
+  python manage.py backfill_image_placeholders --all          # recompute existing placeholders too
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.images import ImageDecodeError, placeholder_from_file
+from properties.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = "Compute first-paint placeholders and dominant colours for existing PropertyImage rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Rows per bulk_update.")
+        parser.add_argument("--dry-run", action="store_true", help="Compute only; write nothing.")
+        parser.add_argument("--all", action="store_true", help="Include rows that already have a placeholder.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be >= 1.")
+
+        # Unprocessed rows get their placeholder from the image job.
+        qs = PropertyImage.objects.exclude(image="").filter(processed_at__isnull=False)
+        if not options["all"]:
+            qs = qs.filter(placeholder="")
+        total = qs.count()
+        self.stdout.write(f"{total} image(s) to {'check' if dry_run else 'update'}.")
+
+        storage = PropertyImage._meta.get_field("image").storage
+        updated = unreadable = 0
+        last_id = 0
+        started = time.monotonic()
+        while True:
+            batch = list(qs.filter(pk__gt=last_id).order_by("pk").values_list("pk", "image", "variants")[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            rows = []
+            for pk, name, variants in batch:
+                source = (variants or {}).get("thumb") or name
+                try:
+                    with storage.open(source, "rb") as fh:
+                        placeholder, color = placeholder_from_file(fh)
+                except (ImageDecodeError, FileNotFoundError):
+                    unreadable += 1
+                    continue
+                rows.append(PropertyImage(pk=pk, placeholder=placeholder, dominant_color=color))
+            if rows and not dry_run:
+                PropertyImage.objects.bulk_update(rows, ["placeholder", "dominant_color"])
+            updated += len(rows)
+            self.stdout.write(f"  {updated + unreadable}/{total}, last id {last_id}")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Placeholder backfill {'dry run ' if dry_run else ''}complete in {elapsed:.1f}s. "
+                f"Updated={updated}, Unreadable={unreadable}"
+            )
+        )
@@ -1,48 +1,220 @@
 """
-One-time conversion of existing property images to WebP.
+Render WebP variants (thumb / card / full) for existing property images, in parallel.
+
+Decoding and encoding run in a process pool; the main process writes results back with one
+bulk_update per batch, on rows it locks and re-checks first (a row re-uploaded meanwhile keeps its
+new file), and records the last fully written id in a checkpoint file, so an interrupted run
+continues where it stopped with --resume.
 
 Usage (from backend/home_backend):
   python manage.py backfill_property_images_webp
+  python manage.py backfill_property_images_webp --workers 8 --batch-size 500
+  python manage.py backfill_property_images_webp --dry-run          # decode + encode, write nothing
+  python manage.py backfill_property_images_webp --resume           # continue after an interruption
+  python manage.py backfill_property_images_webp --all              # re-render processed rows too
 """
 
-from django.core.management.base import BaseCommand
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
 
+from properties.blobs import image_refs
+from properties.images import (
+    ImageDecodeError,
+    discard_files,
+    render_variants,
+    store_variants,
+    swap_refs,
+)
 from properties.models import PropertyImage
 
+DEFAULT_CHECKPOINT = ".backfill_property_images_webp.json"
+
+
+def _init_worker():
+    # Spawned workers (non-fork platforms) need their own app registry for storage/settings.
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _image_storage():
+    return PropertyImage._meta.get_field("image").storage
+
+
+def _convert(task):
+    """
+    Runs in a worker: (image_id, name, dry_run) ->
+    (image_id, name, stored|None, error|None, bytes, placeholder fields).
+    """
+    image_id, name, dry_run = task
+    storage = _image_storage()
+    try:
+        with storage.open(name, "rb") as fh:
+            rendered = render_variants(fh)
+    except (ImageDecodeError, FileNotFoundError) as e:
+        return image_id, name, None, f"unreadable: {e}", 0, {}
+    except Exception as e:  # noqa: BLE001 - reported per row, the run continues
+        return image_id, name, None, f"error: {e}", 0, {}
+    size = sum(len(b) for b in rendered.variants.values())
+    fields = {"placeholder": rendered.placeholder, "dominant_color": rendered.dominant_color}
+    if dry_run:
+        return image_id, name, {}, None, size, fields
+    try:
+        return image_id, name, store_variants(storage, name, rendered.variants), None, size, fields
+    except Exception as e:  # noqa: BLE001
+        return image_id, name, None, f"error: {e}", 0, {}
+
 
 class Command(BaseCommand):
-    help = "Convert existing non-WebP PropertyImage files to WebP."
+    help = "Render WebP variants for existing PropertyImage rows (parallel, resumable)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Encoder processes.")
+        parser.add_argument("--batch-size", type=int, default=200, help="Rows per bulk_update / checkpoint.")
+        parser.add_argument("--dry-run", action="store_true", help="Decode and encode only; write nothing.")
+        parser.add_argument("--all", action="store_true", help="Include rows that already have variants.")
+        parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file path.")
+        parser.add_argument("--resume", action="store_true", help="Start after the id in the checkpoint file.")
 
     def handle(self, *args, **options):
-        total = 0
-        converted = 0
-        skipped = 0
-        failed = 0
-
-        rows = PropertyImage.objects.all().only("id", "image")
-        for row in rows.iterator():
-            total += 1
-            name = (row.image.name or "").lower()
-            if not name or name.endswith(".webp"):
-                skipped += 1
-                continue
-            before_name = row.image.name
+        workers = options["workers"]
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        if workers < 1 or batch_size < 1:
+            raise CommandError("--workers and --batch-size must be >= 1.")
+
+        start_after = 0
+        checkpoint = options["checkpoint"]
+        if options["resume"]:
             try:
-                row.save()
-                after_name = row.image.name
-                if after_name and after_name.lower().endswith(".webp") and after_name != before_name:
-                    converted += 1
+                with open(checkpoint, encoding="utf-8") as fh:
+                    start_after = int(json.load(fh)["last_id"])
+            except FileNotFoundError:
+                self.stdout.write(self.style.WARNING(f"No checkpoint at {checkpoint}; starting from the beginning."))
+            except (ValueError, KeyError, TypeError):
+                raise CommandError(f"Unreadable checkpoint {checkpoint}.")
+
+        qs = PropertyImage.objects.exclude(image="").filter(pk__gt=start_after)
+        if not options["all"]:
+            qs = qs.filter(processed_at__isnull=True)
+        remaining = qs.count()
+        self.stdout.write(
+            f"{remaining} image(s) to {'check' if dry_run else 'convert'} after id {start_after} "
+            f"with {workers} worker(s)."
+        )
+
+        stats = {"converted": 0, "unreadable": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        done = 0
+        started = time.monotonic()
+        last_id = start_after
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        try:
+            while True:
+                batch = list(
+                    qs.filter(pk__gt=last_id).order_by("pk").values_list("pk", "image")[:batch_size]
+                )
+                if not batch:
+                    break
+                tasks = [(pk, name, dry_run) for pk, name in batch]
+                chunk = max(1, len(tasks) // (workers * 4))
+                results = list(pool.map(_convert, tasks, chunksize=chunk))
+                if not dry_run:
+                    self._write_back(results, stats)
                 else:
-                    skipped += 1
-            except Exception:
-                failed += 1
+                    for _pk, _name, stored, error, size, _fields in results:
+                        self._count(stats, stored, error, size)
+                last_id = batch[-1][0]
+                done += len(batch)
+                if not dry_run:
+                    self._save_checkpoint(checkpoint, last_id, stats)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"  {done}/{remaining} ({100 * done / max(remaining, 1):.1f}%), "
+                    f"{done / elapsed:.1f} img/s, last id {last_id}"
+                )
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise CommandError(
+                f"Interrupted after id {last_id}; run again with --resume to continue."
+            )
+        pool.shutdown()
 
+        elapsed = time.monotonic() - started
         self.stdout.write(
             self.style.SUCCESS(
                 (
-                    "Backfill complete. "
-                    f"Total={total}, Converted={converted}, Skipped={skipped}, Failed={failed}"
+                    f"Backfill {'dry run ' if dry_run else ''}complete in {elapsed:.1f}s "
+                    f"({done / elapsed if elapsed else 0:.1f} img/s). "
+                    f"Total={done}, Converted={stats['converted']}, Unreadable={stats['unreadable']}, "
+                    f"Skipped={stats['skipped']}, Failed={stats['failed']}, "
+                    f"WebP bytes={stats['bytes']}, Last id={last_id}"
                 )
             )
         )
 
+    @staticmethod
+    def _count(stats, stored, error, size):
+        if error and error.startswith("unreadable"):
+            stats["unreadable"] += 1
+        elif error:
+            stats["failed"] += 1
+        else:
+            stats["converted"] += 1
+            stats["bytes"] += size
+
+    def _write_back(self, results, stats):
+        storage = _image_storage()
+        ids = [r[0] for r in results]
+        now = timezone.now()
+        stale = []
+        with transaction.atomic():
+            # Locked and re-read here: rows re-uploaded or deleted since the batch was read keep
+            # their new file, and nothing can replace it between this check and the update.
+            current = {
+                pk: (image, variants)
+                for pk, image, variants in PropertyImage.objects.select_for_update()
+                .filter(pk__in=ids)
+                .values_list("pk", "image", "variants")
+            }
+            rows, unreadable, replaced = [], [], []
+            for pk, name, stored, error, size, fields in results:
+                if pk not in current or current[pk][0] != name:
+                    if stored:
+                        stale.append(stored)
+                    stats["skipped"] += 1
+                    continue
+                self._count(stats, stored, error, size)
+                if stored:
+                    rows.append(
+                        PropertyImage(pk=pk, image=stored["full"], variants=stored, processed_at=now, **fields)
+                    )
+                    replaced.append((name, current[pk][1], stored))
+                elif error and error.startswith("unreadable"):
+                    unreadable.append(pk)
+            if rows:
+                PropertyImage.objects.bulk_update(
+                    rows,
+                    ["image", "variants", "placeholder", "dominant_color", "processed_at"],
+                    batch_size=500,
+                )
+                for name, old, stored in replaced:
+                    swap_refs(storage, image_refs(name, old), stored.values())
+            if unreadable:
+                PropertyImage.objects.filter(pk__in=unreadable, processed_at__isnull=True).update(processed_at=now)
+        for stored in stale:
+            discard_files(storage, stored.values())
+
+    @staticmethod
+    def _save_checkpoint(path, last_id, stats):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"last_id": last_id, "stats": stats, "saved_at": timezone.now().isoformat()}, fh)
+        os.replace(tmp, path)
@@ -0,0 +1,143 @@
+"""
+Measure peak memory (RSS) and time of rendering property image variants.
+
+Each run happens in a fresh process, so the numbers are not polluted by earlier runs. `unbounded`
+is the previous pipeline (full-resolution decode, EXIF rotation and mode conversion, then
+resizing); `bounded` is properties.images.render_variants.
+
+Usage (from backend/home_backend):
+  python manage.py bench_image_decode                         # synthetic 48 MP JPEG
+  python manage.py bench_image_decode --megapixels 12 --format png
+  python manage.py bench_image_decode --file ~/Pictures/IMG_0912.jpg
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+MODES = ("unbounded", "bounded")
+
+
+def _proc_status_mb(field):
+    with open("/proc/self/status", encoding="ascii") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise OSError(field)
+
+
+def _reset_peak_rss():
+    """Start the high-water mark from the current RSS (Linux); ru_maxrss even survives exec."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as fh:
+            fh.write("5")
+        return _proc_status_mb("VmRSS")
+    except OSError:
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    try:
+        return _proc_status_mb("VmHWM")
+    except OSError:
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _render_unbounded(fileobj):
+    from PIL import Image, ImageOps
+
+    from properties.images import IMAGE_VARIANTS, WEBP_METHOD
+
+    with Image.open(fileobj) as img:
+        img = ImageOps.exif_transpose(img)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        current = img.convert("RGBA" if has_alpha else "RGB")
+    out = {}
+    for name, edge, quality in IMAGE_VARIANTS:
+        if max(current.size) > edge:
+            current = current.copy()
+            current.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        current.save(buffer, format="WEBP", quality=quality, method=WEBP_METHOD)
+        out[name] = buffer.getvalue()
+    return out
+
+
+def _measure(mode, path, results):
+    import django
+
+    django.setup()
+    from properties.images import render_variants
+
+    render = (lambda fh: render_variants(fh).variants) if mode == "bounded" else _render_unbounded
+    baseline = _reset_peak_rss()
+    started = time.perf_counter()
+    with open(path, "rb") as fh:
+        out = render(fh)
+    elapsed = time.perf_counter() - started
+    peak = _peak_rss_mb()
+    results.put((mode, baseline, peak, elapsed, sum(len(b) for b in out.values())))
+
+
+def _synthetic_image(path, megapixels, fmt):
+    from PIL import Image
+
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    img = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+    exif = img.getexif()
+    exif[0x0112] = 6  # rotated 90°, as phones usually store portrait shots
+    img.save(path, format=fmt.upper(), exif=exif, **({"quality": 90} if fmt == "jpeg" else {}))
+    return width, height
+
+
+class Command(BaseCommand):
+    help = "Benchmark peak RSS of the unbounded vs bounded property image decode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="Image to render (default: a synthetic photo).")
+        parser.add_argument("--megapixels", type=float, default=48, help="Size of the synthetic image.")
+        parser.add_argument("--format", choices=("jpeg", "png"), default="jpeg")
+        parser.add_argument("--mode", choices=MODES, action="append", help="Run only this mode (repeatable).")
+
+    def handle(self, *args, **options):
+        tmp = None
+        path = options["file"]
+        if path:
+            if not os.path.exists(path):
+                raise CommandError(f"No such file: {path}")
+            label = os.path.basename(path)
+        else:
+            fd, tmp = tempfile.mkstemp(suffix=f".{options['format']}")
+            os.close(fd)
+            width, height = _synthetic_image(tmp, options["megapixels"], options["format"])
+            path = tmp
+            label = f"synthetic {width}x{height} {options['format'].upper()}"
+        self.stdout.write(f"{label}, {os.path.getsize(path) / 1_000_000:.1f} MB on disk")
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        try:
+            for mode in options["mode"] or MODES:
+                proc = ctx.Process(target=_measure, args=(mode, path, results))
+                proc.start()
+                proc.join()
+                if proc.exitcode != 0:
+                    self.stdout.write(self.style.ERROR(f"  {mode:<10} failed (exit code {proc.exitcode})"))
+                    continue
+                mode, baseline, peak, elapsed, size = results.get()
+                self.stdout.write(
+                    f"  {mode:<10} peak RSS {peak:7.1f} MB (+{peak - baseline:6.1f} MB over imports), "
+                    f"{elapsed:5.2f}s, WebP total {size / 1000:.0f} kB"
+                )
+        finally:
+            if tmp:
+                os.unlink(tmp)
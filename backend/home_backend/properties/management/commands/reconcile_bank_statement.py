@@ -0,0 +1,73 @@
+"""
+Match a CSV bank statement against open booking payments and mark the matches paid.
+
+Usage (from backend/home_backend):
+  python manage.py reconcile_bank_statement statement.csv
+  python manage.py reconcile_bank_statement statement.csv --host 12 --window 3 --dry-run --report review.json
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.models import BookingPayment
+from properties.reconciliation import (
+    RECONCILE_DEFAULT_WINDOW_DAYS,
+    StatementError,
+    parse_window,
+    read_statement,
+    reconcile_statement,
+)
+
+
+class Command(BaseCommand):
+    help = "Reconcile a CSV bank statement against pending/overdue BookingPayment rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("statement", help="Path to the CSV statement (UTF-8).")
+        parser.add_argument("--host", type=int, help="Only match payments on this host's listings.")
+        parser.add_argument(
+            "--window",
+            type=int,
+            default=RECONCILE_DEFAULT_WINDOW_DAYS,
+            help="Days either side of the due date for lines without a reference.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Match only; do not mark anything paid.")
+        parser.add_argument("--report", help="Write the full JSON report (matches, review, unmatched) here.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            with open(options["statement"], encoding="utf-8-sig") as fh:
+                lines = read_statement(fh.read())
+        except OSError as e:
+            raise CommandError(str(e))
+        except StatementError as e:
+            raise CommandError(str(e))
+
+        qs = BookingPayment.objects.all()
+        if options["host"]:
+            qs = qs.filter(booking__rented_property__owner_id=options["host"])
+
+        report = reconcile_statement(
+            lines,
+            qs,
+            window=parse_window(options["window"]),
+            dry_run=options["dry_run"],
+        )
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                (
+                    f"Reconciliation {'dry run ' if options['dry_run'] else ''}complete in {elapsed:.2f}s. "
+                    f"Lines={report['lines']}, Matched={report['matched_count']}, "
+                    f"Applied={report['applied_count']}, Review={report['review_count']}, "
+                    f"Unmatched={report['unmatched_count']}"
+                )
+            )
+        )
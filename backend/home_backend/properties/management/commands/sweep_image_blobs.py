@@ -0,0 +1,60 @@
+"""
+Delete content-addressed property image files that no PropertyImage uses any more.
+
+Usage (from backend/home_backend):
+  python manage.py sweep_image_blobs
+  python manage.py sweep_image_blobs --dry-run
+  python manage.py sweep_image_blobs --grace-hours 1 --orphans    # also files no blob row tracks
+
+Run it from cron (e.g. daily). Blobs stay for IMAGE_BLOB_SWEEP_GRACE_HOURS after their last
+reference goes, so an upload that is still being saved never loses its file.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.blobs import sweep_orphan_files, sweep_unreferenced
+from properties.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = "Delete unreferenced property image blobs (and, with --orphans, untracked files)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=getattr(settings, "IMAGE_BLOB_SWEEP_GRACE_HOURS", 24),
+            help="Keep blobs unreferenced for less than this.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted.")
+        parser.add_argument(
+            "--orphans",
+            action="store_true",
+            help="Also delete files under the upload directory that nothing tracks or references.",
+        )
+
+    def handle(self, *args, **options):
+        if options["grace_hours"] < 0:
+            raise CommandError("--grace-hours must be >= 0.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1.")
+        grace = timedelta(hours=options["grace_hours"])
+        dry_run = options["dry_run"]
+        field = PropertyImage._meta.get_field("image")
+        started = time.monotonic()
+
+        stats = sweep_unreferenced(field.storage, grace=grace, batch_size=options["batch_size"], dry_run=dry_run)
+        summary = f"Blobs deleted={stats['deleted']} ({stats['bytes']} bytes), kept={stats['kept']}"
+        if options["orphans"]:
+            orphans = sweep_orphan_files(field.storage, field.upload_to.strip("/"), grace=grace, dry_run=dry_run)
+            summary += f", orphan files deleted={orphans['deleted']} ({orphans['bytes']} bytes)"
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Image blob sweep {'dry run ' if dry_run else ''}done in {elapsed:.2f}s. {summary}")
+        )
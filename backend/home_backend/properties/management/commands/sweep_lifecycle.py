@@ -0,0 +1,53 @@
+"""
+Move bookings confirmed → active → completed and installments pending → overdue by date.
+
+Usage (from backend/home_backend):
+  python manage.py sweep_lifecycle
+  python manage.py sweep_lifecycle --dry-run
+  python manage.py sweep_lifecycle --loop --interval 900 --batch-size 500
+
+Run it from cron (e.g. hourly) or once as a long-lived process with --loop.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.lifecycle import LIFECYCLE_BATCH_SIZE, sweep_lifecycle
+
+
+class Command(BaseCommand):
+    help = "Apply date-driven booking and payment status transitions in batched UPDATEs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=LIFECYCLE_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Count due transitions only.")
+        parser.add_argument("--no-notify", action="store_true", help="Skip in-app notifications.")
+        parser.add_argument("--loop", action="store_true", help="Keep running, sweeping every --interval seconds.")
+        parser.add_argument("--interval", type=int, default=3600, help="Seconds between sweeps with --loop.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1.")
+        if options["interval"] < 1:
+            raise CommandError("--interval must be >= 1.")
+        while True:
+            started = time.monotonic()
+            counts = sweep_lifecycle(
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+                notify=not options["no_notify"],
+            )
+            elapsed = time.monotonic() - started
+            summary = ", ".join(f"{name}={n}" for name, n in counts.items())
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Lifecycle sweep {'dry run ' if options['dry_run'] else ''}done in {elapsed:.2f}s. {summary}"
+                )
+            )
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0013_property_facilities_engagement'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'check_in'], name='properties__status_a38337_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'check_out'], name='properties__status_791ddc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingpayment',
+            index=models.Index(fields=['status', 'due_date'], name='properties__status_408b78_idx'),
+        ),
+    ]
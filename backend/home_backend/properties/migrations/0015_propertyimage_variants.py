@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_lifecycle_sweep_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:25
+
+import properties.storage
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_existing_refs(apps, schema_editor):
+    """Start reference counts from the names existing rows already use (pre-hash names included)."""
+    PropertyImage = apps.get_model("properties", "PropertyImage")
+    ImageBlob = apps.get_model("properties", "ImageBlob")
+    counts = Counter()
+    for image, variants in PropertyImage.objects.values_list("image", "variants").iterator():
+        counts.update({n for n in (image, *(variants or {}).values()) if n})
+    ImageBlob.objects.bulk_create(
+        [ImageBlob(name=name, ref_count=n) for name, n in counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0015_propertyimage_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=models.ImageField(storage=properties.storage.property_image_storage, upload_to='property_images/'),
+        ),
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='properties__ref_cou_9e5af2_idx')],
+            },
+        ),
+        migrations.RunPython(count_existing_refs, migrations.RunPython.noop),
+    ]
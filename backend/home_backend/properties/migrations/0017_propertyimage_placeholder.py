@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0016_image_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='dominant_color',
+            field=models.CharField(blank=True, default='', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='placeholder',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
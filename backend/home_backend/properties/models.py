@@ -1,11 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.core.files.base import ContentFile
 from users.models import CustomUser
+from .storage import property_image_storage
+from .tracking import TrackedFieldsMixin
 from decimal import Decimal
-from io import BytesIO
-import os
 import calendar
 
 
@@ -33,7 +32,7 @@ class PropertyManager(models.Manager):
 
 
 # ============ PROPERTY MODEL ============
-class Property(models.Model):
+class Property(TrackedFieldsMixin, models.Model):
     # Property types
     PROPERTY_TYPES = (
         ('apartment', _("Apartment")),
@@ -158,6 +157,9 @@ class Property(models.Model):
     # Status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
     times_booked = models.PositiveIntegerField(default=0)
+
+    # Loaded values kept for save signals (properties.tracking): wishlist alerts, dashboard caches.
+    tracked_fields = ('status', 'owner_id')
     
     # Dates
     created_at = models.DateTimeField(auto_now_add=True)
@@ -189,6 +191,13 @@ class Property(models.Model):
     
     @property
     def primary_image(self):
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('images')
+        if prefetched is not None:
+            # List views prefetch images; reuse them instead of two queries per card.
+            rows = list(prefetched)
+            return next((i for i in rows if i.is_primary), None) or min(
+                rows, key=lambda i: i.uploaded_at, default=None
+            )
         primary = self.images.filter(is_primary=True).first()
         if primary:
             return primary
@@ -325,9 +334,16 @@ class PromoCode(models.Model):
 # ============ PROPERTY IMAGE MODEL ============
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
-    image = models.ImageField(upload_to='property_images/')
+    # Content-addressed (properties.storage): identical bytes share one file, see ImageBlob.
+    image = models.ImageField(upload_to='property_images/', storage=property_image_storage)
     is_primary = models.BooleanField(default=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Filled by the image worker (properties.images): {"thumb": name, "card": name, "full": name}.
+    variants = models.JSONField(default=dict, blank=True)
+    # First paint before any variant loads: data: URI of a ~20 px WebP and the dominant colour.
+    placeholder = models.TextField(blank=True, default='')
+    dominant_color = models.CharField(max_length=7, blank=True, default='')
+    processed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-is_primary', 'uploaded_at']
@@ -335,52 +351,44 @@ class PropertyImage(models.Model):
     def __str__(self):
         return f"Image for {self.property.title}"
     
-    def save(self, *args, **kwargs):
-        # Ensure only one primary image per property
-        if self.is_primary:
-            PropertyImage.objects.filter(
-                property=self.property, 
-                is_primary=True
-            ).exclude(id=self.id).update(is_primary=False)
-        self._convert_to_webp_if_needed()
-        super().save(*args, **kwargs)
+    def is_processing(self):
+        """True until the background job has rendered the WebP variants."""
+        return bool(self.image) and self.processed_at is None
 
-    def _convert_to_webp_if_needed(self):
-        """
-        Convert uploaded images to WebP before persisting.
-        Keeps existing WebP files unchanged.
-        """
-        if not self.image:
-            return
+    def save(self, *args, **kwargs):
+        # One transaction with the blob signals: pre_save locks the row to read the names it
+        # references now (the image job changes them with .update()).
+        with transaction.atomic():
+            # Ensure only one primary image per property
+            if self.is_primary:
+                PropertyImage.objects.filter(
+                    property=self.property, 
+                    is_primary=True
+                ).exclude(id=self.id).update(is_primary=False)
+            super().save(*args, **kwargs)
+
+
+# ============ IMAGE BLOBS (content-addressed files) ============
+class ImageBlob(models.Model):
+    """
+    One stored image file and how many PropertyImage rows use it (as `image` or a variant).
+    Files whose count drops to zero are removed by `manage.py sweep_image_blobs`.
+    """
 
-        name = self.image.name or ""
-        if name.lower().endswith(".webp"):
-            return
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last acquire/release; the sweep only removes blobs unreferenced for a grace period.
+    updated_at = models.DateTimeField(auto_now=True)
 
-        try:
-            from PIL import Image, UnidentifiedImageError
-        except Exception:
-            # If Pillow is unavailable for any reason, keep original upload.
-            return
+    class Meta:
+        indexes = [
+            models.Index(fields=["ref_count", "updated_at"]),
+        ]
 
-        try:
-            self.image.open("rb")
-            with Image.open(self.image) as img:
-                has_alpha = img.mode in ("RGBA", "LA") or (
-                    img.mode == "P" and "transparency" in img.info
-                )
-                converted = img.convert("RGBA" if has_alpha else "RGB")
-                buffer = BytesIO()
-                converted.save(buffer, format="WEBP", quality=85, method=6)
-                base, _ = os.path.splitext(name)
-                self.image.save(
-                    f"{base}.webp",
-                    ContentFile(buffer.getvalue()),
-                    save=False,
-                )
-        except (UnidentifiedImageError, OSError, ValueError):
-            # Non-image/corrupted upload handling remains with existing validators.
-            return
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} ref)"
 
 
 # ============ PROPERTY WISHLIST (customer saved listings) ============
@@ -518,6 +526,9 @@ class Booking(models.Model):
             models.Index(fields=['rented_property', 'check_in', 'check_out', 'status']),
             models.Index(fields=['user', 'status', '-created_at']),
             models.Index(fields=['rented_property', 'status', 'check_in']),
+            # lifecycle sweeper: confirmed → active by check_in, → completed by check_out
+            models.Index(fields=['status', 'check_in']),
+            models.Index(fields=['status', 'check_out']),
         ]
         ordering = ['-created_at']
         constraints = [
@@ -720,6 +731,7 @@ class BookingPayment(models.Model):
         indexes = [
             models.Index(fields=['booking', 'status', 'due_date']),
             models.Index(fields=['due_date', 'status']),
+            models.Index(fields=['status', 'due_date']),
         ]
     
     def __str__(self):
@@ -727,8 +739,8 @@ class BookingPayment(models.Model):
     
     @property
     def is_overdue(self):
-        """Check if payment is overdue"""
-        return (
+        """Check if payment is overdue (stored by the lifecycle sweeper, or past due since the last sweep)"""
+        return self.status == 'overdue' or (
             self.status == 'pending' and
             timezone.now().date() > self.due_date
         )
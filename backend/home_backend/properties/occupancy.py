@@ -0,0 +1,215 @@
+"""
+Per-property × per-day occupancy built from bookings, vectorized with NumPy.
+
+A night d is occupied when a confirmed/active/completed booking has check_in <= d < check_out.
+The matrix is assembled with a difference array (one +1 at check-in, one -1 at check-out, then a
+cumulative sum along the day axis), so cost is O(bookings + properties × days) with no Python
+loop over days. It is kept as a packed bit array (1 bit per property-night; 5k × 730 ≈ 450 KB).
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+
+from .booking_calendar import parse_property_ids
+from .models import Booking
+
+OCCUPANCY_STATUSES = ('confirmed', 'active', 'completed')
+OCCUPANCY_MAX_DAYS = 731
+OCCUPANCY_DEFAULT_DAYS = 30
+
+
+class OccupancyMatrix:
+    """Packed occupancy bits for `property_ids` (sorted) over [start, start + days)."""
+
+    def __init__(self, property_ids: np.ndarray, start: date, days: int, packed: np.ndarray):
+        self.property_ids = property_ids
+        self.start = start
+        self.days = days
+        self.packed = packed
+
+    @classmethod
+    def build(cls, property_ids, start: date, end: date) -> 'OccupancyMatrix':
+        """Occupancy for the inclusive night range [start, end]."""
+        days = (end - start).days + 1
+        ids = np.unique(np.asarray(list(property_ids), dtype=np.int64))
+        n = len(ids)
+        if n == 0 or days <= 0:
+            return cls(ids, start, max(days, 0), np.zeros((n, 0), dtype=np.uint8))
+
+        range_end = end + timedelta(days=1)
+        rows = list(
+            Booking.objects.filter(
+                rented_property_id__in=ids.tolist(),
+                status__in=OCCUPANCY_STATUSES,
+                check_in__lt=range_end,
+                check_out__gt=start,
+            ).values_list('rented_property_id', 'check_in', 'check_out')
+        )
+        occupied = np.zeros((n, days), dtype=bool)
+        if rows:
+            base = start.toordinal()
+            prop_col = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+            in_col = np.fromiter((r[1].toordinal() for r in rows), dtype=np.int64, count=len(rows))
+            out_col = np.fromiter((r[2].toordinal() for r in rows), dtype=np.int64, count=len(rows))
+            row_idx = np.searchsorted(ids, prop_col)
+            first = np.clip(in_col - base, 0, days)
+            stop = np.clip(out_col - base, 0, days)
+            width = days + 1
+            size = n * width
+            delta = (
+                np.bincount(row_idx * width + first, minlength=size)
+                - np.bincount(row_idx * width + stop, minlength=size)
+            ).reshape(n, width)
+            occupied = np.cumsum(delta, axis=1)[:, :days] > 0
+        return cls(ids, start, days, np.packbits(occupied, axis=1))
+
+    @property
+    def occupied(self) -> np.ndarray:
+        """Unpacked boolean view (properties × days)."""
+        return np.unpackbits(self.packed, axis=1, count=self.days).astype(bool)
+
+    def summarize(self, occupied: np.ndarray | None = None) -> dict:
+        occ = self.occupied if occupied is None else occupied
+        capacity = occ.size
+        booked = int(occ.sum())
+        return {
+            'properties': int(len(self.property_ids)),
+            'days': self.days,
+            'booked_nights': booked,
+            'available_nights': capacity,
+            'occupancy_rate': round(100 * booked / capacity, 2) if capacity else 0.0,
+        }
+
+    def per_property(self, occupied: np.ndarray | None = None) -> list[dict]:
+        """Booked nights, occupancy % and vacancy-gap stats for each property."""
+        occ = self.occupied if occupied is None else occupied
+        booked = occ.sum(axis=1)
+        gap_rows, gap_lengths = _vacancy_runs(occ)
+        gap_count = np.bincount(gap_rows, minlength=len(self.property_ids))
+        longest = np.zeros(len(self.property_ids), dtype=np.int64)
+        if len(gap_lengths):
+            np.maximum.at(longest, gap_rows, gap_lengths)
+        pct = np.round(100 * booked / self.days, 2) if self.days else np.zeros_like(booked, dtype=float)
+        return [
+            {
+                'property_id': int(pid),
+                'booked_nights': int(b),
+                'occupancy_rate': float(p),
+                'vacancy_gaps': int(g),
+                'longest_vacancy_nights': int(lg),
+            }
+            for pid, b, p, g, lg in zip(self.property_ids, booked, pct, gap_count, longest)
+        ]
+
+    def vacancy_gaps(self, min_nights: int = 1, limit: int = 100,
+                     occupied: np.ndarray | None = None) -> list[dict]:
+        """Longest vacant stretches across the portfolio (property, first night, length)."""
+        occ = self.occupied if occupied is None else occupied
+        rows, lengths, firsts = _vacancy_runs(occ, with_starts=True)
+        keep = lengths >= min_nights
+        rows, lengths, firsts = rows[keep], lengths[keep], firsts[keep]
+        order = np.argsort(-lengths, kind='stable')[:limit]
+        return [
+            {
+                'property_id': int(self.property_ids[rows[i]]),
+                'start': (self.start + timedelta(days=int(firsts[i]))).isoformat(),
+                'end': (self.start + timedelta(days=int(firsts[i] + lengths[i]))).isoformat(),
+                'nights': int(lengths[i]),
+            }
+            for i in order
+        ]
+
+    def heatmap(self, occupied: np.ndarray | None = None) -> dict:
+        """
+        Portfolio occupancy % per day laid out as ISO weeks (Mon..Sun). Cells outside the range
+        are null so the grid is always rectangular.
+        """
+        occ = self.occupied if occupied is None else occupied
+        n = len(self.property_ids)
+        daily = occ.mean(axis=0) * 100 if n else np.zeros(self.days)
+        lead = self.start.weekday()
+        total = lead + self.days
+        trail = (-total) % 7
+        grid = np.concatenate([np.full(lead, np.nan), daily, np.full(trail, np.nan)]).reshape(-1, 7)
+        week_start = self.start - timedelta(days=lead)
+        return {
+            'week_starts': [(week_start + timedelta(weeks=i)).isoformat() for i in range(len(grid))],
+            'weekdays': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+            'cells': [[None if np.isnan(v) else round(float(v), 1) for v in row] for row in grid],
+        }
+
+
+def _vacancy_runs(occupied: np.ndarray, with_starts: bool = False):
+    """Row index and length (and first day) of every maximal run of vacant nights."""
+    if occupied.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return (empty, empty, empty) if with_starts else (empty, empty)
+    vacant = np.pad(~occupied, ((0, 0), (1, 1))).astype(np.int8)
+    edges = np.diff(vacant, axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)
+    # argwhere is row-major, so the k-th start and k-th end belong to the same run.
+    rows = starts[:, 0]
+    lengths = ends[:, 1] - starts[:, 1]
+    if with_starts:
+        return rows, lengths, starts[:, 1]
+    return rows, lengths
+
+
+def parse_occupancy_params(query_params) -> dict:
+    """
+    Optional start/end (YYYY-MM-DD, inclusive; default: the last 30 nights ending today),
+    property_ids, properties=0 to omit per-property rows, gap_min_nights (default 7).
+    """
+    today = timezone.now().date()
+    try:
+        end = datetime.strptime(query_params['end'], '%Y-%m-%d').date() if query_params.get('end') else today
+        start = (
+            datetime.strptime(query_params['start'], '%Y-%m-%d').date()
+            if query_params.get('start')
+            else end - timedelta(days=OCCUPANCY_DEFAULT_DAYS - 1)
+        )
+    except ValueError:
+        raise ParseError('Invalid date format. Use YYYY-MM-DD.')
+    if end < start:
+        raise ParseError('"end" must be >= "start".')
+    if (end - start).days + 1 > OCCUPANCY_MAX_DAYS:
+        raise ParseError(f'Range is limited to {OCCUPANCY_MAX_DAYS} days.')
+    try:
+        gap_min = max(1, int(query_params.get('gap_min_nights', 7)))
+    except ValueError:
+        gap_min = 7
+    return {
+        'start': start,
+        'end': end,
+        'property_ids': parse_property_ids(query_params.get('property_ids')),
+        'include_properties': str(query_params.get('properties', '1')).lower() not in ('0', 'false', 'no'),
+        'gap_min_nights': gap_min,
+    }
+
+
+def occupancy_report(property_ids, start: date, end: date, *, include_properties: bool = True,
+                     gap_min_nights: int = 7) -> dict:
+    """Response body shared by the host and admin occupancy endpoints."""
+    matrix = OccupancyMatrix.build(property_ids, start, end)
+    occupied = matrix.occupied
+    report = {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'summary': matrix.summarize(occupied),
+        'heatmap': matrix.heatmap(occupied),
+        'vacancy_gaps': matrix.vacancy_gaps(min_nights=gap_min_nights, occupied=occupied),
+    }
+    if include_properties:
+        report['properties'] = matrix.per_property(occupied)
+    return report
+
+
+def occupancy_rate(property_ids, start: date, end: date) -> float:
+    """Share of property-nights booked in [start, end], 0–100."""
+    return OccupancyMatrix.build(property_ids, start, end).summarize()['occupancy_rate']
@@ -0,0 +1,406 @@
+"""
+Bank-statement reconciliation for offline (bank transfer / cash) booking payments.
+
+Open installments are loaded once as value tuples and indexed in memory:
+
+- by payment id (statement reference like "PAY 812" / "P-812"),
+- by (booking id, amount) (reference like "BOOKING 57" / "B57"),
+- by (amount, due day) so an unreferenced line probes a fixed ±window of days.
+
+Every statement line therefore costs a constant number of dict lookups. Lines with one clear
+candidate are matched; lines with several plausible candidates go to a review list. Matches are
+written in one transaction as set-based UPDATE ... FROM (VALUES ...) statements.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import dashboard_cache
+from .models import Booking, BookingPayment
+
+RECONCILE_OPEN_STATUSES = ('pending', 'overdue')
+RECONCILE_DEFAULT_WINDOW_DAYS = 5
+RECONCILE_MAX_WINDOW_DAYS = 31
+RECONCILE_BATCH_SIZE = 500
+RECONCILE_UPDATE_ROWS = 2000
+
+_DATE_COLUMNS = ('date', 'value_date', 'transaction_date', 'posting_date', 'booking_date')
+_AMOUNT_COLUMNS = ('amount', 'credit', 'credit_amount', 'paid_in')
+_REFERENCE_COLUMNS = ('reference', 'description', 'narrative', 'details', 'memo', 'narration')
+_TXN_COLUMNS = ('transaction_id', 'txn_id', 'bank_reference', 'id')
+_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d')
+
+_PAYMENT_REF = re.compile(r'\bP(?:AY(?:MENT)?)?[\s#:\-]*(\d+)\b', re.IGNORECASE)
+_BOOKING_REF = re.compile(r'\bB(?:K|OOKING)?[\s#:\-]*(\d+)\b', re.IGNORECASE)
+
+
+class StatementError(ValueError):
+    """The statement file itself is unusable (missing columns, not CSV)."""
+
+
+def _chunks(items, size=RECONCILE_BATCH_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _cents(amount: Decimal) -> int:
+    return int((amount * 100).to_integral_value())
+
+
+def _parse_amount(raw: str):
+    cleaned = re.sub(r'[^\d.\-]', '', raw or '')
+    if not cleaned:
+        return None
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+def _parse_date(raw: str):
+    raw = (raw or '').strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _pick_column(fieldnames, candidates):
+    lowered = {(name or '').strip().lower().replace(' ', '_'): name for name in fieldnames}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def read_statement(text: str) -> list[dict]:
+    """
+    Parse a CSV bank statement into credit lines: {'line', 'date', 'amount', 'reference', 'txn'}.
+    Debits (amount <= 0) are skipped; unparsable rows are returned with an `error`.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise StatementError('Statement is empty.')
+    date_col = _pick_column(reader.fieldnames, _DATE_COLUMNS)
+    amount_col = _pick_column(reader.fieldnames, _AMOUNT_COLUMNS)
+    if not date_col or not amount_col:
+        raise StatementError(
+            'Statement needs a date column (%s) and an amount column (%s).'
+            % ('/'.join(_DATE_COLUMNS), '/'.join(_AMOUNT_COLUMNS))
+        )
+    ref_col = _pick_column(reader.fieldnames, _REFERENCE_COLUMNS)
+    txn_col = _pick_column(reader.fieldnames, _TXN_COLUMNS)
+
+    lines = []
+    for n, row in enumerate(reader, start=2):  # line 1 is the header
+        amount = _parse_amount(row.get(amount_col))
+        day = _parse_date(row.get(date_col))
+        entry = {
+            'line': n,
+            'date': day,
+            'amount': amount,
+            'reference': (row.get(ref_col) or '').strip() if ref_col else '',
+            'txn': (row.get(txn_col) or '').strip() if txn_col else '',
+        }
+        if amount is None or day is None:
+            entry['error'] = 'Unreadable date or amount.'
+        elif amount <= 0:
+            continue
+        lines.append(entry)
+    return lines
+
+
+class OpenPaymentIndex:
+    """In-memory lookups over open installments (see module docstring)."""
+
+    def __init__(self, payments_qs):
+        self.rows = {}
+        self.open_bookings = set()
+        self.by_booking_amount = defaultdict(list)
+        self.by_amount_day = defaultdict(list)
+        values = (
+            payments_qs.filter(status__in=RECONCILE_OPEN_STATUSES)
+            .order_by('due_date', 'id')
+            .values_list('id', 'booking_id', 'amount', 'due_date', 'payment_type')
+            .iterator(chunk_size=5000)
+        )
+        for pid, booking_id, amount, due, ptype in values:
+            cents = _cents(amount)
+            self.rows[pid] = (pid, booking_id, cents, due, ptype)
+            self.open_bookings.add(booking_id)
+            self.by_booking_amount[(booking_id, cents)].append(pid)
+            self.by_amount_day[(cents, due.toordinal())].append(pid)
+        self.claimed: set[int] = set()
+        # Transfers already recorded on settled installments (see transfer_key): re-importing a
+        # statement must not pay a second installment with the same transfer.
+        self.recorded_transfers = set()
+        settled = (
+            payments_qs.exclude(status__in=RECONCILE_OPEN_STATUSES)
+            .exclude(transaction_id='')
+            .values_list('transaction_id', 'paid_date', 'amount')
+            .iterator(chunk_size=5000)
+        )
+        for txn, paid, amount in settled:
+            # Either a real bank transaction id or a reference recorded on that day for that amount.
+            self.recorded_transfers.add(('txn', txn))
+            if paid is not None:
+                self.recorded_transfers.add(('ref', paid, _cents(amount), txn))
+        self.settled_ids: set[int] = set()
+
+    def load_settled_references(self, payments_qs, lines) -> None:
+        """Remember which payment ids referenced by the statement exist but are no longer open."""
+        referenced = {
+            int(ref)
+            for line in lines if not line.get('error')
+            for ref in _PAYMENT_REF.findall(f"{line['reference']} {line['txn']}")
+        }
+        referenced.difference_update(self.rows)
+        for chunk in _chunks(referenced):
+            self.settled_ids.update(payments_qs.filter(id__in=chunk).values_list('id', flat=True))
+
+    def _free(self, ids):
+        return [pid for pid in ids if pid not in self.claimed]
+
+    def match(self, line: dict, window: int, by_amount: bool = True):
+        """
+        Returns (payment_id | None, rule, candidate ids). With by_amount=False only references are
+        tried and lines without a usable one come back as rule 'deferred'.
+        """
+        cents = _cents(line['amount'])
+        text = f"{line['reference']} {line['txn']}"
+        key = transfer_key(line)
+        if key and key in self.recorded_transfers:
+            return None, 'transaction_already_recorded', []
+
+        for ref in _PAYMENT_REF.findall(text):
+            row = self.rows.get(int(ref))
+            if row is None:
+                if int(ref) in self.settled_ids:
+                    return None, 'payment_not_open', [int(ref)]
+                continue
+            if row[2] != cents:
+                return None, 'payment_reference_amount_mismatch', [row[0]]
+            if row[0] in self.claimed:
+                return None, 'payment_already_matched', [row[0]]
+            return row[0], 'payment_reference', [row[0]]
+
+        for ref in _BOOKING_REF.findall(text):
+            booking_id = int(ref)
+            if booking_id not in self.open_bookings:
+                continue
+            free = self._free(self.by_booking_amount.get((booking_id, cents), ()))
+            if free:
+                # Installment due closest to the transfer date; ties go to the older one.
+                day = line['date'].toordinal()
+                pid = min(free, key=lambda p: (abs(self.rows[p][3].toordinal() - day), self.rows[p][3]))
+                return pid, 'booking_reference', [pid]
+            return None, 'booking_reference_amount_mismatch', []
+
+        if not by_amount:
+            return None, 'deferred', []
+        base = line['date'].toordinal()
+        candidates = []
+        for offset in range(-window, window + 1):
+            candidates.extend(self._free(self.by_amount_day.get((cents, base + offset), ())))
+        if len(candidates) == 1:
+            return candidates[0], 'amount_and_date', candidates
+        if candidates:
+            return None, 'ambiguous', sorted(candidates)
+        return None, 'no_candidate', []
+
+
+def transaction_key(line: dict) -> str:
+    """The bank reference stored as BookingPayment.transaction_id for a matched line."""
+    return (line['txn'] or line['reference'])[:100]
+
+
+def transfer_key(line: dict):
+    """
+    Identity of the transfer behind a line, for spotting re-imports: the bank transaction id when
+    the statement has one, else (value date, amount, reference). Free-text references repeat every
+    month for recurring rent, so on their own they are not unique.
+    """
+    if line['txn']:
+        return ('txn', line['txn'][:100])
+    if line['reference']:
+        return ('ref', line['date'], _cents(line['amount']), line['reference'][:100])
+    return None
+
+
+def _record(index, line, outcome, matched, review, unmatched) -> None:
+    pid, rule, candidates = outcome
+    if pid is not None:
+        index.claimed.add(pid)
+        # A repeated line later in the same statement must not pay another installment.
+        if transfer_key(line):
+            index.recorded_transfers.add(transfer_key(line))
+        matched.append({
+            'line': line['line'],
+            'payment_id': pid,
+            'booking_id': index.rows[pid][1],
+            'amount': str(line['amount']),
+            'date': line['date'].isoformat(),
+            'rule': rule,
+            '_txn': transaction_key(line),
+        })
+    elif rule == 'no_candidate':
+        unmatched.append({
+            'line': line['line'],
+            'amount': str(line['amount']),
+            'date': line['date'].isoformat(),
+            'reference': line['reference'],
+        })
+    else:
+        review.append({
+            'line': line['line'],
+            'reason': rule,
+            'amount': str(line['amount']),
+            'date': line['date'].isoformat(),
+            'reference': line['reference'],
+            'candidates': candidates,
+        })
+
+
+def reconcile_statement(lines: list[dict], payments_qs, *, window: int = RECONCILE_DEFAULT_WINDOW_DAYS,
+                        dry_run: bool = False) -> dict:
+    """
+    Match statement lines against open installments in `payments_qs` and (unless dry_run) mark
+    the matches paid. Returns a report with matched lines, lines needing review and unmatched lines.
+    """
+    index = OpenPaymentIndex(payments_qs)
+    index.load_settled_references(payments_qs, lines)
+    matched, review, unmatched = [], [], []
+    # Referenced lines first, so their installments are claimed before amount/date guessing.
+    deferred = []
+    for line in lines:
+        if line.get('error'):
+            review.append({'line': line['line'], 'reason': 'unreadable', 'candidates': []})
+            continue
+        outcome = index.match(line, window, by_amount=False)
+        if outcome[1] == 'deferred':
+            deferred.append(line)
+        else:
+            _record(index, line, outcome, matched, review, unmatched)
+    for line in deferred:
+        _record(index, line, index.match(line, window), matched, review, unmatched)
+    matched.sort(key=lambda m: m['line'])
+    review.sort(key=lambda r: r['line'])
+
+    applied = 0 if dry_run else apply_matches(matched, index)
+    for m in matched:
+        m.pop('_txn', None)
+    return {
+        'lines': len(lines),
+        'open_payments': len(index.rows),
+        'matched_count': len(matched),
+        'review_count': len(review),
+        'unmatched_count': len(unmatched),
+        'applied_count': applied,
+        'dry_run': dry_run,
+        'matched': matched,
+        'review': review,
+        'unmatched': unmatched,
+    }
+
+
+def _mark_paid(rows, now) -> None:
+    """
+    Set status/paid_date/transaction_id for (id, paid_date, transaction_id) rows. On PostgreSQL and
+    SQLite this is UPDATE ... FROM (VALUES ...), one statement per RECONCILE_UPDATE_ROWS rows;
+    other backends fall back to bulk_update (CASE per row, much slower to build).
+    """
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        BookingPayment.objects.bulk_update(
+            [
+                BookingPayment(id=pid, status='paid', paid_date=day, payment_method='bank',
+                               transaction_id=txn, updated_at=now)
+                for pid, day, txn in rows
+            ],
+            ['status', 'paid_date', 'payment_method', 'transaction_id', 'updated_at'],
+            batch_size=RECONCILE_BATCH_SIZE,
+        )
+        return
+
+    qn = connection.ops.quote_name
+    meta = BookingPayment._meta
+    table = qn(meta.db_table)
+    col = {name: qn(meta.get_field(name).column) for name in
+           ('id', 'status', 'paid_date', 'payment_method', 'transaction_id', 'updated_at')}
+    open_statuses = ', '.join('%s' for _ in RECONCILE_OPEN_STATUSES)
+    with connection.cursor() as cursor:
+        for chunk in _chunks(rows, RECONCILE_UPDATE_ROWS):
+            values = ', '.join('(%s, %s, %s)' for _ in chunk)
+            params = ['paid', 'bank', connection.ops.adapt_datetimefield_value(now)]
+            for pid, day, txn in chunk:
+                params.extend((pid, connection.ops.adapt_datefield_value(day), txn))
+            params.extend(RECONCILE_OPEN_STATUSES)
+            cursor.execute(
+                f'UPDATE {table} SET {col["status"]} = %s, {col["payment_method"]} = %s, '
+                f'{col["updated_at"]} = %s, {col["paid_date"]} = v.column2, '
+                f'{col["transaction_id"]} = v.column3 '
+                f'FROM (VALUES {values}) AS v '
+                f'WHERE {table}.{col["id"]} = v.column1 AND {table}.{col["status"]} IN ({open_statuses})',
+                params,
+            )
+
+
+def apply_matches(matched: list[dict], index: OpenPaymentIndex) -> int:
+    """Mark matched installments paid in one transaction; skips rows paid meanwhile."""
+    if not matched:
+        return 0
+    by_id = {m['payment_id']: m for m in matched}
+    now = timezone.now()
+    with transaction.atomic():
+        still_open = set()
+        for chunk in _chunks(by_id):
+            still_open.update(
+                BookingPayment.objects.select_for_update()
+                .filter(id__in=chunk, status__in=RECONCILE_OPEN_STATUSES)
+                .values_list('id', flat=True)
+            )
+        rows = [
+            (pid, date.fromisoformat(by_id[pid]['date']), by_id[pid]['_txn'])
+            for pid in still_open
+        ]
+        _mark_paid(rows, now)
+        deposit_bookings = {index.rows[pid][1] for pid in still_open if index.rows[pid][4] == 'deposit'}
+        for chunk in _chunks(deposit_bookings):
+            Booking.objects.filter(id__in=chunk, deposit_paid=False).update(
+                deposit_paid=True, deposit_paid_at=now, updated_at=now
+            )
+        # bulk_update skips post_save, so invalidate the affected hosts' dashboard caches here.
+        owner_ids = set()
+        for chunk in _chunks({index.rows[pid][1] for pid in still_open}):
+            owner_ids.update(
+                Booking.objects.filter(id__in=chunk).values_list('rented_property__owner_id', flat=True)
+            )
+
+        def bump_owners():
+            for owner_id in owner_ids:
+                dashboard_cache.bump_host(owner_id)
+
+        transaction.on_commit(bump_owners)
+    for m in matched:
+        if m['payment_id'] not in still_open:
+            m['rule'] = 'already_paid'
+    return len(still_open)
+
+
+def parse_window(raw) -> int:
+    try:
+        window = int(raw)
+    except (TypeError, ValueError):
+        return RECONCILE_DEFAULT_WINDOW_DAYS
+    return max(0, min(window, RECONCILE_MAX_WINDOW_DAYS))
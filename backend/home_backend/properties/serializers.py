@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Avg, F
+from .images import IMAGE_VARIANT_NAMES
 from .models import Property, PropertyImage, Booking, BookingPayment, PropertyReview, PromoCode
 from users.serializers import UserSerializer
 from django.utils import timezone
@@ -18,22 +19,33 @@ from .promo import (
 # ============ PROPERTY IMAGE SERIALIZER ============
 class PropertyImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_urls = serializers.SerializerMethodField()
+    processing = serializers.BooleanField(source='is_processing', read_only=True)
     
     class Meta:
         model = PropertyImage
-        fields = ('id', 'image', 'image_url', 'is_primary', 'uploaded_at')
-        read_only_fields = ('id', 'uploaded_at')
+        fields = (
+            'id', 'image', 'image_url', 'image_urls', 'processing',
+            'placeholder', 'dominant_color', 'is_primary', 'uploaded_at',
+        )
+        read_only_fields = ('id', 'placeholder', 'dominant_color', 'uploaded_at')
     
     def get_image_url(self, obj):
         if not obj.image:
             return None
-        path = obj.image.url
-        if path.startswith("http://") or path.startswith("https://"):
-            return path
-        request = self.context.get("request")
-        if request is not None:
-            return request.build_absolute_uri(path)
-        return path
+        return _absolute_media_url(self, obj.image.url)
+
+    def get_image_urls(self, obj):
+        """URL per size (thumb / card / full); the original upload until processing finishes."""
+        if not obj.image:
+            return None
+        variants = obj.variants or {}
+        storage = obj.image.storage
+        fallback = obj.image.url
+        return {
+            name: _absolute_media_url(self, storage.url(variants[name]) if name in variants else fallback)
+            for name in IMAGE_VARIANT_NAMES
+        }
     
     def validate(self, attrs):
         # Ensure only one primary image per property
@@ -280,13 +292,21 @@ def _absolute_media_url(serializer, path: str) -> str:
     return path
 
 
-def _booking_listing_thumbnail_url(serializer, rented_property) -> str | None:
-    """Primary (or first) property image URL for booking list cards."""
+def _booking_listing_image(rented_property):
     primary = rented_property.primary_image
     if not primary or not getattr(primary, "image", None):
         return None
+    return primary
+
+
+def _booking_listing_thumbnail_url(serializer, rented_property) -> str | None:
+    """Primary (or first) property image URL for booking list cards."""
+    primary = _booking_listing_image(rented_property)
+    if primary is None:
+        return None
+    card = (primary.variants or {}).get("card")
     try:
-        path = primary.image.url
+        path = primary.image.storage.url(card) if card else primary.image.url
     except ValueError:
         return None
     if not path:
@@ -300,6 +320,8 @@ class BookingSerializer(serializers.ModelSerializer):
     property_title = serializers.CharField(source='rented_property.title', read_only=True)
     property_address = serializers.CharField(source='rented_property.address', read_only=True)
     property_image = serializers.SerializerMethodField()
+    property_image_placeholder = serializers.SerializerMethodField()
+    property_image_color = serializers.SerializerMethodField()
     review_id = serializers.SerializerMethodField(read_only=True)
     can_review = serializers.SerializerMethodField(read_only=True)
     user_name = serializers.CharField(source='user.username', read_only=True)
@@ -353,6 +375,8 @@ class BookingSerializer(serializers.ModelSerializer):
             'property_title',
             'property_address',
             'property_image',
+            'property_image_placeholder',
+            'property_image_color',
             'review_id',
             'can_review',
             'user_name',
@@ -380,6 +404,8 @@ class BookingSerializer(serializers.ModelSerializer):
             'property_title',
             'property_address',
             'property_image',
+            'property_image_placeholder',
+            'property_image_color',
             'review_id',
             'can_review',
             'user_name',
@@ -390,6 +416,14 @@ class BookingSerializer(serializers.ModelSerializer):
     def get_property_image(self, obj):
         return _booking_listing_thumbnail_url(self, obj.rented_property)
 
+    def get_property_image_placeholder(self, obj):
+        primary = _booking_listing_image(obj.rented_property)
+        return primary.placeholder if primary else ""
+
+    def get_property_image_color(self, obj):
+        primary = _booking_listing_image(obj.rented_property)
+        return primary.dominant_color if primary else ""
+
     def get_review_id(self, obj):
         try:
             return obj.review.pk
@@ -616,8 +650,8 @@ class HostBookingSerializer(BookingSerializer):
         )
 
     def get_payments(self, obj):
-        payments = obj.payments.all().order_by('due_date')
-        return BookingPaymentSerializer(payments, many=True).data
+        # Meta.ordering is (due_date, month_number); .all() reuses a prefetch when the view has one.
+        return BookingPaymentSerializer(obj.payments.all(), many=True).data
 
 
 class AdminBookingListSerializer(BookingSerializer):
@@ -891,6 +925,7 @@ class HostDashboardSerializer(serializers.Serializer):
     activity_chart = serializers.JSONField()
     comparison = serializers.JSONField()
     currency = serializers.CharField()
+    cashflow = serializers.JSONField()
 
 
 class TenantDashboardSerializer(serializers.Serializer):
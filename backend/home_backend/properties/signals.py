@@ -1,33 +1,31 @@
-"""Wishlist status-change notifications."""
+"""Wishlist status-change notifications, dashboard cache invalidation and image bookkeeping."""
 
 from __future__ import annotations
 
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from notifications.models import Notification
-from notifications.services import create_notification
-
-from .models import Property, PropertyWishlist
-
-STATUS_LABELS = {
-    "available": "Available",
-    "rented": "Rented",
-    "maintenance": "Under maintenance",
-}
+from . import dashboard_cache
+from .blobs import image_refs, release
+from .images import swap_refs
+from .models import Booking, BookingPayment, Property, PropertyImage, PropertyWishlist
+from .tasks import notify_wishlist_status_change, process_property_image
+from .tracking import NOT_LOADED
 
 
 @receiver(pre_save, sender=Property)
 def property_stash_old_status_for_wishlist(sender, instance: Property, **kwargs):
     """Store DB status before save so post_save can detect listing status transitions."""
-    if not instance.pk:
-        instance._wishlist_prev_status = None
-        return
-    try:
-        prev = Property.objects.only("status").get(pk=instance.pk)
-        instance._wishlist_prev_status = prev.status
-    except Property.DoesNotExist:
-        instance._wishlist_prev_status = None
+    prev = instance.loaded_value("status")
+    if prev is NOT_LOADED:
+        # Only rows saved without being loaded (e.g. Property(pk=…).save()) need the SELECT.
+        prev = (
+            Property.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+            if instance.pk
+            else None
+        )
+    instance._wishlist_prev_status = prev
 
 
 @receiver(post_save, sender=Property)
@@ -38,24 +36,100 @@ def property_notify_wishlist_on_status_change(sender, instance: Property, create
     if old is None or old == instance.status:
         return
 
-    new = instance.status
-    old_label = STATUS_LABELS.get(old, old)
-    new_label = STATUS_LABELS.get(new, new)
-    title = f'Listing update: "{instance.title}"'
-    body = f"This saved property is now {new_label} (was {old_label})."
-    href = f"/properties/{instance.pk}"
-
-    qs = (
-        PropertyWishlist.objects.filter(property=instance)
-        .select_related("user")
-        .exclude(user_id=instance.owner_id)
+    # The fan-out (one alert per wishlisting user) runs in the worker, not in the host's save.
+    wishlisted = PropertyWishlist.objects.filter(property=instance).exclude(user_id=instance.owner_id)
+    if wishlisted.exists():
+        notify_wishlist_status_change.enqueue(
+            property_id=instance.pk,
+            old_status=old,
+            new_status=instance.status,
+            dedupe_key=f"wishlist-status:{instance.pk}:{instance.status}",
+        )
+
+
+def _bump_dashboards_on_commit(host_id) -> None:
+    transaction.on_commit(lambda: dashboard_cache.bump_host(host_id))
+
+
+def _booking_owner_id(booking_id):
+    return (
+        Booking.objects.filter(pk=booking_id)
+        .values_list("rented_property__owner_id", flat=True)
+        .first()
     )
-    for row in qs:
-        create_notification(
-            user=row.user,
-            notification_type=Notification.NotificationType.PROPERTY_ALERT,
-            title=title,
-            body=body,
-            action_href=href,
-            action_label="View listing",
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def property_invalidate_dashboards(sender, instance: Property, **kwargs):
+    _bump_dashboards_on_commit(instance.owner_id)
+    prev_owner = instance.loaded_value("owner_id")
+    if prev_owner not in (NOT_LOADED, None, instance.owner_id):
+        # Listing moved to another host: the previous host's figures change too.
+        _bump_dashboards_on_commit(prev_owner)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_invalidate_dashboards(sender, instance: Booking, **kwargs):
+    if Booking.rented_property.is_cached(instance):
+        owner_id = instance.rented_property.owner_id
+    else:
+        owner_id = (
+            Property.objects.filter(pk=instance.rented_property_id)
+            .values_list("owner_id", flat=True)
+            .first()
         )
+    _bump_dashboards_on_commit(owner_id)
+
+
+@receiver(post_save, sender=BookingPayment)
+@receiver(post_delete, sender=BookingPayment)
+def payment_invalidate_dashboards(sender, instance: BookingPayment, **kwargs):
+    booking = instance.booking if BookingPayment.booking.is_cached(instance) else None
+    if booking is not None and Booking.rented_property.is_cached(booking):
+        owner_id = booking.rented_property.owner_id
+    else:
+        owner_id = _booking_owner_id(instance.booking_id)
+    _bump_dashboards_on_commit(owner_id)
+
+
+@receiver(pre_save, sender=PropertyImage)
+def property_image_stash_old_refs(sender, instance: PropertyImage, **kwargs):
+    """Store the blob names the row held before save so post_save can move the reference counts."""
+    if not instance.pk:
+        instance._blob_prev_refs = set()
+        return
+    # Read (and lock) the current row, not the loaded instance: the image job and backfills
+    # change `image` / `variants` with .update(), so an instance's own values can be stale.
+    prev = (
+        PropertyImage.objects.select_for_update()
+        .filter(pk=instance.pk)
+        .values_list("image", "variants")
+        .first()
+    )
+    instance._blob_prev_refs = image_refs(*prev) if prev else set()
+
+
+# Connected before property_image_queue_processing: with JOBS_EAGER the job can run inside that
+# receiver and must find the upload's reference already counted.
+@receiver(post_save, sender=PropertyImage)
+def property_image_update_blob_refs(sender, instance: PropertyImage, **kwargs):
+    swap_refs(
+        instance.image.storage,
+        getattr(instance, "_blob_prev_refs", set()),
+        image_refs(instance.image.name, instance.variants),
+    )
+
+
+@receiver(post_delete, sender=PropertyImage)
+def property_image_release_blobs(sender, instance: PropertyImage, **kwargs):
+    release(image_refs(instance.image.name, instance.variants))
+
+
+@receiver(post_save, sender=PropertyImage)
+def property_image_queue_processing(sender, instance: PropertyImage, **kwargs):
+    """Render the WebP variants in the background once the upload row is committed."""
+    if instance.image and instance.processed_at is None:
+        process_property_image.enqueue(instance.pk, dedupe_key=f"property-image:{instance.pk}")
+
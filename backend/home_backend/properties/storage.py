@@ -0,0 +1,84 @@
+"""
+Content-addressed storage for property images.
+
+Every file is saved as `<top-level dir>/<h[:2]>/<h[2:4]>/<h>.<ext>`, where `h` is the SHA-256 of
+its bytes. Identical uploads (and identical rendered variants) therefore share one file. Who still
+uses a file is tracked by `ImageBlob.ref_count` (see properties.blobs), and
+`manage.py sweep_image_blobs` deletes files that nothing references. Because a name always maps
+to the same bytes, media under these names can be served with far-future cache headers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+
+_HASH_CHUNK = 1024 * 1024
+# property_images/ab/cd/abcd…(64 hex).webp
+CONTENT_ADDRESSED_NAME = re.compile(r'(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.[a-z0-9]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_content_addressed(name: str) -> bool:
+    return bool(name) and CONTENT_ADDRESSED_NAME.search(name) is not None
+
+
+def content_hash(content) -> str:
+    """SHA-256 hex digest of a django File, streamed in chunks; leaves it rewound."""
+    hasher = hashlib.sha256()
+    for chunk in content.chunks(_HASH_CHUNK):
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+def hashed_name(name: str, digest: str) -> str:
+    """Keep the top-level directory (the field's upload_to) and extension of `name`."""
+    top = name.split('/', 1)[0] if '/' in name else ''
+    ext = os.path.splitext(name)[1].lower()
+    path = f'{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+    return f'{top}/{path}' if top else path
+
+
+class ContentAddressedMixin:
+    """Storage mixin: `save()` names files by content and never writes the same bytes twice."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = hashed_name(str(name).replace('\\', '/'), content_hash(content))
+        if self.exists(name):
+            # Bump the mtime so a sweep running right now treats the blob as freshly used.
+            self._touch(name)
+            return name
+        stored = super().save(name, content, max_length=max_length)
+        if stored != name:
+            # A concurrent save of the same bytes won the race; drop our suffixed copy.
+            self.delete(stored)
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        if not self.exists(name):
+            return name
+        return super().get_available_name(name, max_length=max_length)
+
+    def _touch(self, name):
+        try:
+            os.utime(self.path(name))
+        except (NotImplementedError, OSError):
+            pass
+
+
+class ContentAddressedStorage(ContentAddressedMixin, FileSystemStorage):
+    pass
+
+
+def property_image_storage():
+    """Storage for PropertyImage.image (the STORAGES["property_images"] alias)."""
+    return storages['property_images']
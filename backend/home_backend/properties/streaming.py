@@ -0,0 +1,36 @@
+"""
+Bodies for StreamingHttpResponse that stay streamed under both WSGI and ASGI.
+
+Under ASGI, Django consumes a sync iterator with `sync_to_async(list)` before sending anything,
+so a large export or feed would be built in memory first. `stream_body` gives ASGI requests an
+async iterator instead: it pulls STREAM_BATCH_CHUNKS chunks at a time from the sync generator
+through `sync_to_async` (thread-sensitive, so the queryset's `.iterator()` cursor stays on the
+request's thread) and sends them as one part. WSGI requests get the generator itself.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+STREAM_BATCH_CHUNKS = 200
+
+
+async def _aiter_chunks(chunks, batch: int):
+    take = sync_to_async(lambda: "".join(islice(chunks, batch)))
+    try:
+        while part := await take():
+            yield part
+    finally:
+        # Client went away or the body is done: release the database cursor on its own thread.
+        await sync_to_async(getattr(chunks, "close", lambda: None))()
+
+
+def stream_body(request, chunks, *, batch: int = STREAM_BATCH_CHUNKS):
+    """`chunks` (a sync iterator of str) in the form the server in use streams without buffering."""
+    http_request = getattr(request, "_request", request)  # DRF Request wraps the HttpRequest
+    if isinstance(http_request, ASGIRequest):
+        return _aiter_chunks(iter(chunks), batch)
+    return chunks
@@ -0,0 +1,60 @@
+"""Background jobs for listings (see jobs.queue)."""
+
+from django.db import transaction
+
+from jobs.queue import task
+from notifications.models import Notification
+from notifications.services import bulk_create_notifications
+
+from . import images
+from .models import Property, PropertyWishlist
+
+STATUS_LABELS = {
+    "available": "Available",
+    "rented": "Rented",
+    "maintenance": "Under maintenance",
+}
+WISHLIST_FANOUT_BATCH = 500
+
+
+@task("properties.process_image", max_attempts=3, backoff_seconds=60)
+def process_property_image(image_id: int) -> None:
+    images.process_property_image(image_id)
+
+
+@task("properties.notify_wishlist_status", max_attempts=3, backoff_seconds=60)
+def notify_wishlist_status_change(*, property_id: int, old_status: str, new_status: str) -> None:
+    """
+    Alert everyone who saved the listing (except its owner) that its status changed. User ids are
+    streamed in keyset chunks over the (property, user) index and each chunk is one bulk INSERT.
+    All chunks share one transaction, so a failed run leaves nothing behind and its retry does not
+    alert anyone twice.
+    """
+    prop = Property.objects.filter(pk=property_id).values("title", "owner_id").first()
+    if prop is None:
+        return  # listing deleted since the job was queued
+    old_label = STATUS_LABELS.get(old_status, old_status)
+    new_label = STATUS_LABELS.get(new_status, new_status)
+    notification = {
+        "notification_type": Notification.NotificationType.PROPERTY_ALERT,
+        "title": f'Listing update: "{prop["title"]}"',
+        "body": f"This saved property is now {new_label} (was {old_label}).",
+        "action_href": f"/properties/{property_id}",
+        "action_label": "View listing",
+    }
+    wishlisters = PropertyWishlist.objects.filter(property_id=property_id).exclude(user_id=prop["owner_id"])
+    last_user_id = 0
+    with transaction.atomic():
+        while True:
+            user_ids = list(
+                wishlisters.filter(user_id__gt=last_user_id)
+                .order_by("user_id")
+                .values_list("user_id", flat=True)[:WISHLIST_FANOUT_BATCH]
+            )
+            if not user_ids:
+                return
+            last_user_id = user_ids[-1]
+            bulk_create_notifications(
+                ({"user_id": user_id, **notification} for user_id in user_ids),
+                batch_size=WISHLIST_FANOUT_BATCH,
+            )
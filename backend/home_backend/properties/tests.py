@@ -1,3 +1,112 @@
+from dataclasses import replace
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+
+from notifications.models import Notification
+from users.models import CustomUser
+
+from .lifecycle import TRANSITIONS, _run_transition
+from .models import Booking, BookingPayment, Property
+from .reconciliation import read_statement, reconcile_statement
+
+
+class ReconcileRecurringReferenceTests(TestCase):
+    """Statements without a transaction id column reuse the same reference every month."""
+
+    @classmethod
+    def setUpTestData(cls):
+        host = CustomUser.objects.create(username='rc-host', email='rc-host@example.com', user_type='owner')
+        tenant = CustomUser.objects.create(username='rc-tenant', email='rc-tenant@example.com')
+        prop = Property.objects.create(
+            owner=host, title='Flat', description='d', property_type='house', daily_price=Decimal('10'),
+            monthly_price=Decimal('300'), address='a', city='Accra', country='Ghana',
+        )
+        [cls.booking] = Booking.objects.bulk_create([
+            Booking(
+                rented_property=prop, user=tenant, check_in=date(2026, 1, 1), check_out=date(2026, 4, 1),
+                agreed_monthly_rate=Decimal('300'), months_booked=3, total_price=Decimal('900'),
+                status='active',
+            ),
+        ])
+        BookingPayment.objects.bulk_create([
+            BookingPayment(
+                booking=cls.booking, payment_type='rent', month_number=m, amount=Decimal('300'),
+                due_date=date(2026, m, 1), status='pending',
+            )
+            for m in (1, 2, 3)
+        ])
+        cls.payments = BookingPayment.objects.filter(booking=cls.booking)
+
+    def _reconcile(self, *rows, header='Date,Reference,Amount'):
+        text = '\n'.join((header, *rows)) + '\n'
+        return reconcile_statement(read_statement(text), self.payments)
+
+    def _paid_months(self):
+        return sorted(self.payments.filter(status='paid').values_list('month_number', flat=True))
+
+    def test_recurring_reference_in_later_statements(self):
+        ref = f'Rent B{self.booking.pk}'
+        for month in (1, 2, 3):
+            report = self._reconcile(f'2026-{month:02d}-01,{ref},300.00')
+            self.assertEqual(report['applied_count'], 1, report['review'])
+        self.assertEqual(self._paid_months(), [1, 2, 3])
+
+    def test_recurring_reference_in_one_statement(self):
+        ref = f'Rent B{self.booking.pk}'
+        report = self._reconcile(*(f'2026-{m:02d}-01,{ref},300.00' for m in (1, 2, 3)))
+        self.assertEqual(report['applied_count'], 3, report['review'])
+        self.assertEqual(self._paid_months(), [1, 2, 3])
+
+    def test_reimported_reference_line_goes_to_review(self):
+        line = f'2026-01-01,Rent B{self.booking.pk},300.00'
+        self.assertEqual(self._reconcile(line)['applied_count'], 1)
+        report = self._reconcile(line)
+        self.assertEqual(report['applied_count'], 0)
+        self.assertEqual([r['reason'] for r in report['review']], ['transaction_already_recorded'])
+        self.assertEqual(self._paid_months(), [1])
+
+    def test_repeated_transaction_id_goes_to_review(self):
+        ref = f'Rent B{self.booking.pk}'
+        report = self._reconcile(
+            f'2026-01-01,{ref},300.00,TX1',
+            f'2026-02-01,{ref},300.00,TX1',
+            header='Date,Reference,Amount,Transaction ID',
+        )
+        self.assertEqual(report['applied_count'], 1)
+        self.assertEqual([r['reason'] for r in report['review']], ['transaction_already_recorded'])
+
+
+class LifecycleChangedRowsTests(TestCase):
+    """Rows that leave the source status between the SELECT and the UPDATE get no notifications."""
+
+    def test_notifies_only_rows_the_update_moved(self):
+        host = CustomUser.objects.create(username='lc-host', email='lc-host@example.com', user_type='owner')
+        tenant = CustomUser.objects.create(username='lc-tenant', email='lc-tenant@example.com')
+        prop = Property.objects.create(
+            owner=host, title='Flat', description='d', property_type='house', daily_price=Decimal('10'),
+            monthly_price=Decimal('300'), address='a', city='Accra', country='Ghana',
+        )
+        moved, changed = Booking.objects.bulk_create([
+            Booking(
+                rented_property=prop, user=tenant, check_in=date(2026, 1, 1), check_out=date(2026, 4, 1),
+                agreed_monthly_rate=Decimal('300'), months_booked=3, total_price=Decimal('900'), status=status,
+            )
+            for status in ('confirmed', 'cancelled')
+        ])
+        activate = next(t for t in TRANSITIONS if t.name == 'activated')
+        # Stand-in for a concurrent edit: the cancelled row is selected but the guarded UPDATE skips it.
+        racing = replace(activate, candidates=lambda today: Booking.objects.filter(pk__in=(moved.pk, changed.pk)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            count = _run_transition(racing, date(2026, 2, 1), timezone.now(), batch_size=10, notify=True)
 
-# Create your tests here.
+        self.assertEqual(count, 1)
+        changed.refresh_from_db()
+        self.assertEqual(changed.status, 'cancelled')
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(
+            set(Notification.objects.values_list('user_id', flat=True)), {host.pk, tenant.pk},
+        )
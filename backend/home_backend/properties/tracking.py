@@ -0,0 +1,84 @@
+"""
+Remember selected field values as they were loaded from the database, so save signals can tell
+what changed without reading the row again.
+
+    class Property(TrackedFieldsMixin, models.Model):
+        tracked_fields = ("status", "owner_id")   # attnames: "owner_id", not "owner"
+
+    instance.loaded_value("status")   # value as loaded / last saved, or NOT_LOADED
+    instance.has_changed("status")    # True / False, or None when the old value is unknown
+
+Values are captured in `from_db` (deferred fields are skipped until they are loaded) and again
+after `save()` and `refresh_from_db()`. post_save receivers run inside `save()`, so they still see
+the values from before the save. Instances built in Python and never saved have no loaded values;
+callers fall back to a query for them. QuerySet.update() / bulk_update() bypass the snapshot, so
+do not track fields that code changes that way (PropertyImage.image / variants, for instance).
+"""
+
+from __future__ import annotations
+
+import copy
+
+from django.db.models.fields.files import FieldFile
+
+
+class _NotLoaded:
+    def __repr__(self):
+        return "NOT_LOADED"
+
+
+NOT_LOADED = _NotLoaded()
+
+
+def _plain(value):
+    # FileFields hold a str until first accessed, then a FieldFile; compare by name either way.
+    return value.name if isinstance(value, FieldFile) else value
+
+
+class TrackedFieldsMixin:
+    """Model mixin; list the attnames to track in `tracked_fields`."""
+
+    tracked_fields: tuple[str, ...] = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values(cls.tracked_fields)
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self._remember_loaded_values(self.tracked_fields)
+        else:
+            saved = set(update_fields)
+            self._remember_loaded_values(
+                name
+                for name in self.tracked_fields
+                if {self._meta.get_field(name).name, self._meta.get_field(name).attname} & saved
+            )
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._remember_loaded_values(
+            self.tracked_fields
+            if fields is None
+            else [n for n in self.tracked_fields if n in fields or self._meta.get_field(n).name in fields]
+        )
+
+    def _remember_loaded_values(self, names) -> None:
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        for name in names:
+            if name in self.__dict__:  # deferred fields are absent
+                loaded[name] = copy.deepcopy(_plain(self.__dict__[name]))
+
+    def loaded_value(self, name: str):
+        """Value of `name` when the row was loaded or last saved, or NOT_LOADED."""
+        return self.__dict__.get("_loaded_values", {}).get(name, NOT_LOADED)
+
+    def has_changed(self, name: str) -> bool | None:
+        old = self.loaded_value(name)
+        if old is NOT_LOADED or name not in self.__dict__:
+            return None
+        return old != _plain(self.__dict__[name])
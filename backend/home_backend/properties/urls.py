@@ -17,8 +17,14 @@ urlpatterns = [
         name='admin-booking-decision',
     ),
     path('admin/calendar/', views.AdminCalendarView.as_view(), name='admin-calendar'),
+    path('admin/occupancy/', views.AdminOccupancyView.as_view(), name='admin-occupancy'),
+    path('admin/finance/cashflow/', views.AdminCashflowView.as_view(), name='admin-cashflow'),
+    path('admin/payments/reconcile/', views.AdminReconcileStatementView.as_view(), name='admin-payments-reconcile'),
+    path('admin/exports/<slug:dataset>.<slug:fmt>', views.AdminExportView.as_view(), name='admin-export'),
     path('calendar/events/', ScheduleEventListCreateView.as_view(), name='schedule-event-list'),
     path('calendar/events/<int:pk>/', ScheduleEventDetailView.as_view(), name='schedule-event-detail'),
+    path('ical/host/<int:user_id>/<str:token>.ics', views.HostICalFeedView.as_view(), name='ical-host-feed'),
+    path('ical/properties/<int:pk>/<str:token>.ics', views.PropertyICalFeedView.as_view(), name='ical-property-feed'),
     # === PROPERTIES ===
     path('properties/', views.PropertyListView.as_view(), name='property-list'),
     path('properties/wishlist/my/', views.MyPropertyWishlistIdsView.as_view(), name='my-property-wishlist'),
@@ -27,6 +33,11 @@ urlpatterns = [
         views.PropertyImageUploadView.as_view(),
         name='property-images-upload',
     ),
+    path(
+        'properties/<int:pk>/images/bulk/',
+        views.PropertyImageBulkUploadView.as_view(),
+        name='property-images-bulk-upload',
+    ),
     path('properties/<int:pk>/wishlist/', views.PropertyWishlistView.as_view(), name='property-wishlist'),
     path('properties/<int:pk>/', views.PropertyDetailView.as_view(), name='property-detail'),
     path('properties/my/', views.MyPropertiesView.as_view(), name='my-properties'),
@@ -63,7 +74,12 @@ urlpatterns = [
     path('host/clients/<int:user_id>/', views.HostClientDetailView.as_view(), name='host-client-detail'),
     path('host/analytics/', views.HostAnalyticsView.as_view(), name='host-analytics'),
     path('host/calendar/', views.HostCalendarView.as_view(), name='host-calendar'),
+    path('host/occupancy/', views.HostOccupancyView.as_view(), name='host-occupancy'),
+    path('host/calendar/feeds/', views.HostCalendarFeedUrlsView.as_view(), name='host-calendar-feeds'),
     path('host/payments/', views.HostPaymentsListView.as_view(), name='host-payments-list'),
+    path('host/payments/reconcile/', views.HostReconcileStatementView.as_view(), name='host-payments-reconcile'),
+    path('host/cashflow/', views.HostCashflowView.as_view(), name='host-cashflow'),
+    path('host/exports/<slug:dataset>.<slug:fmt>', views.HostExportView.as_view(), name='host-export'),
     
     # === PAYMENTS ===
     path(
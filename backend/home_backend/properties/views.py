@@ -30,28 +30,75 @@ from .promo import (
     validate_promo_for_booking,
 )
 from .permissions import IsAdminUserType
+from .booking_calendar import (
+    CALENDAR_DEFAULT_LIMIT,
+    CALENDAR_MAX_LIMIT,
+    build_calendar_feed,
+    decode_calendar_cursor as decode_keyset_cursor,
+    encode_calendar_cursor as encode_keyset_cursor,
+    parse_calendar_params,
+)
+from .exports import (
+    EXPORT_FORMATS,
+    export_bookings_queryset,
+    filter_export_queryset,
+    iter_export_rows,
+    parse_export_params,
+)
+from .reconciliation import (
+    StatementError,
+    parse_window as parse_reconcile_window,
+    read_statement,
+    reconcile_statement,
+)
+from .cashflow import cached_cashflow_projection, parse_cashflow_params
+from . import dashboard_cache
+from .images import ImageDecodeError, ImageTooLarge, open_bounded
+from .image_uploads import (
+    MAX_IMAGES_PER_PROPERTY,
+    ImageUploadError,
+    add_property_images,
+    close_files,
+    files_from_archive,
+)
+from .streaming import stream_body
+from .occupancy import occupancy_rate as booked_occupancy_rate, occupancy_report, parse_occupancy_params
+from .ical import (
+    feed_etag as ical_feed_etag,
+    feed_queryset as ical_feed_queryset,
+    host_feed_token,
+    iter_ical_feed,
+    property_feed_token,
+    token_matches,
+)
 from users.serializers import UserSerializer
 import calendar
 from datetime import date, datetime, timedelta
 from typing import Optional
 from dateutil.relativedelta import relativedelta
-from rest_framework.exceptions import ValidationError, PermissionDenied
+from rest_framework.exceptions import ParseError, ValidationError, PermissionDenied
 from django.utils import timezone
 from django.db import transaction, models
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
 from django.conf import settings
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from collections import Counter
 import logging
 from notifications.models import Notification
-from notifications.services import create_notification
+from notifications.tasks import enqueue_email, enqueue_notification
 
 logger = logging.getLogger(__name__)
 
 _HOST_PAYMENT_STATUS_CODES = frozenset(c[0] for c in BookingPayment.STATUS_CHOICES)
+HOST_PAYMENTS_MAX_PAGE_SIZE = 500
+# Pre-pagination defaults, kept for requests that do not send `cursor`.
+HOST_PAYMENTS_LEGACY_LIMIT = 500
+HOST_PAYMENTS_LEGACY_MAX_LIMIT = 2000
 DEFAULT_COUNTRY_CHOICES = (
     "Ghana",
     "Nigeria",
@@ -79,7 +126,7 @@ def _increment_property_times_booked(booking: Booking) -> None:
 
 def _notify_booking_created(booking: Booking) -> None:
     """Notify owner + customer when booking request is submitted."""
-    create_notification(
+    enqueue_notification(
         user=booking.rented_property.owner,
         notification_type=Notification.NotificationType.PROPERTY_ALERT,
         title="New booking request",
@@ -87,7 +134,7 @@ def _notify_booking_created(booking: Booking) -> None:
         action_href="/dashboard/bookings",
         action_label="Review booking",
     )
-    create_notification(
+    enqueue_notification(
         user=booking.user,
         notification_type=Notification.NotificationType.PROPERTY_ALERT,
         title="Booking request submitted",
@@ -107,7 +154,7 @@ def _notify_booking_decision(booking: Booking, approved: bool, reason: str = "")
         body = f"Your booking for \"{booking.rented_property.title}\" was rejected."
         if reason:
             body = f"{body} Reason: {reason}"
-    create_notification(
+    enqueue_notification(
         user=booking.user,
         notification_type=Notification.NotificationType.PROPERTY_ALERT,
         title=title,
@@ -126,7 +173,7 @@ def _notify_booking_cancellation(
     """Notify tenant + owner when a booking is cancelled by admin/customer."""
     detail_suffix = f" Reason: {reason}" if reason else ""
     if cancelled_by == "customer":
-        create_notification(
+        enqueue_notification(
             user=booking.rented_property.owner,
             notification_type=Notification.NotificationType.PROPERTY_ALERT,
             title="Booking cancelled by customer",
@@ -140,7 +187,7 @@ def _notify_booking_cancellation(
         return
 
     # Admin/staff cancellation notifies both tenant and listing owner.
-    create_notification(
+    enqueue_notification(
         user=booking.user,
         notification_type=Notification.NotificationType.PROPERTY_ALERT,
         title="Booking cancelled by admin",
@@ -148,7 +195,7 @@ def _notify_booking_cancellation(
         action_href="/dashboard/bookings",
         action_label="View booking",
     )
-    create_notification(
+    enqueue_notification(
         user=booking.rented_property.owner,
         notification_type=Notification.NotificationType.PROPERTY_ALERT,
         title="Booking cancelled by admin",
@@ -235,7 +282,7 @@ class PublicPropertyCatalogMixin:
     responses={201: PropertyImageSerializer},
 )
 class PropertyImageUploadView(APIView):
-    """POST multipart image for a property (owner only)."""
+    """POST multipart image for a property (owner only). Returns 201 before the WebP variants exist."""
 
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
@@ -250,11 +297,19 @@ class PropertyImageUploadView(APIView):
                 {"detail": 'Missing file field "image".'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        if prop.images.count() >= 5:
+        if prop.images.count() >= MAX_IMAGES_PER_PROPERTY:
             return Response(
-                {"detail": "A maximum of 5 images is allowed per property."},
+                {"detail": f"A maximum of {MAX_IMAGES_PER_PROPERTY} images is allowed per property."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        try:
+            open_bounded(file_obj)  # header only
+        except ImageTooLarge as e:
+            return Response({"detail": f"Image is too large: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+        except ImageDecodeError:
+            pass  # stored as uploaded, like before
+        finally:
+            file_obj.seek(0)
         raw_primary = request.data.get("is_primary", False)
         if isinstance(raw_primary, bool):
             is_primary = raw_primary
@@ -267,10 +322,67 @@ class PropertyImageUploadView(APIView):
             image=file_obj,
             is_primary=is_primary,
         )
+        # WebP variants are rendered by the image job; with JOBS_EAGER it has already run.
+        row.refresh_from_db()
         ser = PropertyImageSerializer(row, context={"request": request})
         return Response(ser.data, status=status.HTTP_201_CREATED)
 
 
+@extend_schema(
+    tags=["Properties"],
+    summary="Upload several property images (or one zip)",
+    description=(
+        "Multipart form: repeat `images` (files), or send one zip as `archive`. Optional "
+        "`primary_index` (0-based) makes that file the primary image. At most 5 images per listing."
+    ),
+    request={
+        "multipart/form-data": {
+            "type": "object",
+            "properties": {
+                "images": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                "archive": {"type": "string", "format": "binary"},
+                "primary_index": {"type": "integer"},
+            },
+        }
+    },
+    responses={201: PropertyImageSerializer(many=True)},
+)
+class PropertyImageBulkUploadView(APIView):
+    """POST several images (repeated "images" field) or one zip ("archive") in one request (owner only)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, pk):
+        prop = get_object_or_404(Property, pk=pk)
+        if prop.owner_id != request.user.id:
+            raise PermissionDenied("You can only add images to your own properties.")
+        raw_index = request.data.get("primary_index")
+        try:
+            primary_index = int(raw_index) if raw_index not in (None, "") else None
+        except (TypeError, ValueError):
+            return Response({"detail": '"primary_index" must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        uploads = request.FILES.getlist("images")
+        archive = request.FILES.get("archive")
+        extracted = []
+        try:
+            if archive is not None:
+                if uploads:
+                    raise ImageUploadError('Send either "images" or "archive", not both.')
+                uploads = extracted = files_from_archive(archive)
+            rows = add_property_images(prop, uploads, primary_index=primary_index)
+        except ImageUploadError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            close_files(extracted)
+
+        # Re-read: with JOBS_EAGER the image jobs have already run after commit.
+        rows = PropertyImage.objects.filter(pk__in=[r.pk for r in rows]).order_by("pk")
+        ser = PropertyImageSerializer(rows, many=True, context={"request": request})
+        return Response(ser.data, status=status.HTTP_201_CREATED)
+
+
 @extend_schema(tags=['Customer catalog'], summary='List properties (customer)')
 class CustomerPropertyListView(PublicPropertyCatalogMixin, generics.ListAPIView):
     """Customer-facing catalog: GET only (same data as public list, explicit route for the website app)."""
@@ -446,12 +558,11 @@ class AdminBookingDecisionView(generics.UpdateAPIView):
                 except Exception:
                     logger.exception("Failed creating approval notification for booking_id=%s", booking.id)
                 if not settings.DEBUG:
-                    send_mail(
+                    enqueue_email(
                         "Booking Confirmed",
                         f"Your booking for {booking.rented_property.title} has been confirmed!",
-                        settings.DEFAULT_FROM_EMAIL,
                         [booking.user.email],
-                        fail_silently=True,
+                        dedupe_key=f"booking:{booking.id}:confirmed-email",
                     )
             elif action == "reject":
                 reason = request.data.get("reason", "No reason provided")
@@ -464,13 +575,11 @@ class AdminBookingDecisionView(generics.UpdateAPIView):
                 except Exception:
                     logger.exception("Failed creating rejection notification for booking_id=%s", booking.id)
                 if not settings.DEBUG:
-                    send_mail(
+                    enqueue_email(
                         "Booking Update",
                         f"Your booking request for {booking.rented_property.title} has been rejected.\n"
                         f"Reason: {reason}",
-                        settings.DEFAULT_FROM_EMAIL,
                         [booking.user.email],
-                        fail_silently=True,
                     )
             elif action == "cancel":
                 reason = request.data.get("reason", "")
@@ -524,12 +633,10 @@ class PropertyListView(PublicPropertyCatalogMixin, generics.ListCreateAPIView):
         
         # Send notification to admin (optional)
         if settings.DEBUG is False:
-            send_mail(
+            enqueue_email(
                 'New Property Listed',
                 f'A new property "{serializer.data.get("title")}" has been listed.',
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.ADMIN_EMAIL],
-                fail_silently=True,
+                [getattr(settings, 'ADMIN_EMAIL', '')],
             )
         
         return Response(
@@ -592,15 +699,21 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
         if instance.owner != self.request.user:
             raise PermissionDenied("You can only delete your own properties.")
         
-        # Soft delete - just mark as unavailable
-        instance.status = 'maintenance'
-        instance.save()
-        
-        # Cancel all pending bookings
-        instance.bookings.filter(status='pending').update(
-            status='cancelled',
-            rejection_reason='Property removed by host'
-        )
+        with transaction.atomic():
+            # Soft delete - just mark as unavailable
+            instance.status = 'maintenance'
+            instance.save()
+
+            # Cancel all pending bookings
+            cancelled = instance.bookings.filter(status='pending').update(
+                status='cancelled',
+                rejection_reason='Property removed by host',
+                updated_at=timezone.now(),
+            )
+            if cancelled:
+                # .update() sends no post_save, so the host's dashboard cache is bumped here.
+                owner_id = instance.owner_id
+                transaction.on_commit(lambda: dashboard_cache.bump_host(owner_id))
         
         return Response(
             {'message': 'Property has been removed from listings'},
@@ -864,26 +977,24 @@ class BookingCreateView(generics.CreateAPIView):
             current_date += relativedelta(months=1)
     
     def send_booking_notification(self, booking):
-        """Send email notifications to tenant and host"""
+        """Queue email notifications to tenant and host"""
         if settings.DEBUG:
             return  # Skip in development
         
         # To tenant
-        send_mail(
+        enqueue_email(
             'Booking Request Received',
             f'Your booking for {booking.rented_property.title} has been submitted and is pending confirmation.',
-            settings.DEFAULT_FROM_EMAIL,
             [booking.user.email],
-            fail_silently=True,
+            dedupe_key=f'booking:{booking.id}:created-email:tenant',
         )
         
         # To host
-        send_mail(
+        enqueue_email(
             'New Booking Request',
             f'You have a new booking request for {booking.rented_property.title} from {booking.user.username}.',
-            settings.DEFAULT_FROM_EMAIL,
             [booking.rented_property.owner.email],
-            fail_silently=True,
+            dedupe_key=f'booking:{booking.id}:created-email:host',
         )
     
     def create(self, request, *args, **kwargs):
@@ -1006,12 +1117,10 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         # Send cancellation email
         if not settings.DEBUG:
-            send_mail(
+            enqueue_email(
                 'Booking Cancelled',
                 f'Your booking for {instance.rented_property.title} has been cancelled.',
-                settings.DEFAULT_FROM_EMAIL,
                 [instance.user.email],
-                fail_silently=True,
             )
         
         return Response({
@@ -1043,7 +1152,7 @@ class HostBookingsView(generics.ListAPIView):
             return Booking.objects.none()
         queryset = Booking.objects.filter(
             rented_property__owner=self.request.user
-        ).select_related('user', 'rented_property').order_by('-created_at')
+        ).select_related('user', 'rented_property').prefetch_related('payments').order_by('-created_at')
         
         # Filter by status
         status = self.request.query_params.get('status')
@@ -1098,12 +1207,11 @@ class ConfirmBookingView(generics.UpdateAPIView):
                 
                 # Send confirmation email
                 if not settings.DEBUG:
-                    send_mail(
+                    enqueue_email(
                         'Booking Confirmed',
                         f'Your booking for {booking.rented_property.title} has been confirmed!',
-                        settings.DEFAULT_FROM_EMAIL,
                         [booking.user.email],
-                        fail_silently=True,
+                        dedupe_key=f'booking:{booking.id}:confirmed-email',
                     )
                 
             elif action == 'reject':
@@ -1120,12 +1228,10 @@ class ConfirmBookingView(generics.UpdateAPIView):
                 
                 # Send rejection email
                 if not settings.DEBUG:
-                    send_mail(
+                    enqueue_email(
                         'Booking Update',
                         f'Your booking request for {booking.rented_property.title} has been rejected.\nReason: {reason}',
-                        settings.DEFAULT_FROM_EMAIL,
                         [booking.user.email],
-                        fail_silently=True,
                     )
             else:
                 raise ValidationError({"action": "Must be 'confirm' or 'reject'"})
@@ -1175,8 +1281,10 @@ def _host_client_row_for_user(host, user):
 
     payments = BookingPayment.objects.filter(booking__in=bookings)
     today = timezone.now().date()
-    next_pay = payments.filter(status='pending').order_by('due_date').first()
-    has_overdue = payments.filter(status='pending', due_date__lt=today).exists()
+    next_pay = payments.filter(status__in=('pending', 'overdue')).order_by('due_date').first()
+    has_overdue = payments.filter(
+        models.Q(status='overdue') | models.Q(status='pending', due_date__lt=today)
+    ).exists()
     has_open = bookings.filter(status__in=['pending', 'confirmed', 'active']).exists()
 
     if has_overdue:
@@ -1293,7 +1401,7 @@ class HostClientDetailView(APIView):
         }
 
         bookings_brief = HostBookingSerializer(
-            bookings.order_by('-created_at')[:25],
+            bookings.prefetch_related('payments').order_by('-created_at')[:25],
             many=True,
             context={'request': request},
         ).data
@@ -1340,13 +1448,9 @@ class HostAnalyticsView(APIView):
         )
         clients_count = len(set(tenant_ids))
 
-        if total_props > 0:
-            occupied = prop_qs.filter(status='rented').count()
-            occupancy_rate = min(100, int(round(100 * occupied / total_props)))
-        else:
-            occupancy_rate = 0
-
         prop_ids = list(prop_qs.values_list('id', flat=True))
+        # Share of property-nights in the range covered by confirmed/active/completed bookings.
+        occupancy_rate = int(round(booked_occupancy_rate(prop_ids, start_date, today))) if prop_ids else 0
         promo_qs = PromoCode.objects.filter(is_active=True).filter(
             models.Q(applies_to_property_id__in=prop_ids)
             | models.Q(applies_to_property__isnull=True)
@@ -1430,122 +1534,308 @@ class HostAnalyticsView(APIView):
         })
 
 
-@extend_schema(tags=['Host'], summary='Host calendar events (bookings)')
-class HostCalendarView(APIView):
+class HostScopeMixin:
     """
-    Bookings on the host's properties, expanded to one entry per occupied night.
-    Query: start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive range of dates to return).
-    Occupied nights: check_in <= d < check_out.
+    Row scope shared by the host / admin pairs of report views below. Host views (the default)
+    see rows on the caller's listings only; admin views set `all_hosts = True` to see every host,
+    narrowed to one by ?host=<user_id> where `host_query_param` is set.
     """
 
-    permission_classes = [permissions.IsAuthenticated]
+    all_hosts = False
+    host_query_param = False
 
-    def get(self, request):
-        start_s = request.query_params.get('start')
-        end_s = request.query_params.get('end')
-        if not start_s or not end_s:
-            return Response(
-                {'detail': 'Query params "start" and "end" are required (YYYY-MM-DD).'},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+    def scope_host_id(self):
+        """Owner id to filter on, or None for every host."""
+        if not self.all_hosts:
+            return self.request.user.id
+        raw = self.request.query_params.get('host') if self.host_query_param else None
+        if not raw:
+            return None
         try:
-            start_date = datetime.strptime(start_s, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end_s, '%Y-%m-%d').date()
+            return int(raw)
         except ValueError:
-            return Response({'detail': 'Invalid date format. Use YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
-        if end_date < start_date:
-            return Response({'detail': '"end" must be >= "start".'}, status=status.HTTP_400_BAD_REQUEST)
+            raise ParseError('"host" must be an integer user id.')
 
-        host = request.user
-        bookings = (
-            Booking.objects.filter(
-                rented_property__owner=host,
-                status__in=['pending', 'confirmed', 'active', 'completed'],
-                check_in__lte=end_date,
-                check_out__gt=start_date,
+    def scoped(self, qs, owner_lookup, host_id=None):
+        """`qs` limited to the host in scope; `owner_lookup` leads from its model to the owner id."""
+        if host_id is None:
+            host_id = self.scope_host_id()
+        return qs if host_id is None else qs.filter(**{owner_lookup: host_id})
+
+
+class OccupancyBaseView(HostScopeMixin, APIView):
+    """
+    Booked-night occupancy matrix (properties × days) for the listings in scope.
+    Query: optional start/end (YYYY-MM-DD, default last 30 nights), property_ids,
+    properties=0 to drop per-property rows, gap_min_nights for the vacancy gap list.
+    """
+
+    def get(self, request):
+        params = parse_occupancy_params(request.query_params)
+        prop_qs = self.scoped(Property.objects.all(), 'owner_id')
+        if params['property_ids']:
+            prop_qs = prop_qs.filter(id__in=params['property_ids'])
+        report = occupancy_report(
+            prop_qs.values_list('id', flat=True),
+            params['start'],
+            params['end'],
+            include_properties=params['include_properties'],
+            gap_min_nights=params['gap_min_nights'],
+        )
+        if params['include_properties']:
+            titles = dict(prop_qs.values_list('id', 'title'))
+            for row in report['properties']:
+                row['title'] = titles.get(row['property_id'], '')
+        return Response(report)
+
+
+@extend_schema(
+    tags=['Host'],
+    summary='Occupancy matrix for your listings',
+    responses={200: OpenApiTypes.OBJECT},
+)
+class HostOccupancyView(OccupancyBaseView):
+    permission_classes = [permissions.IsAuthenticated]
+
+
+@extend_schema(
+    tags=['Admin'],
+    summary='Occupancy matrix — all listings (platform admin)',
+    description='Same shape as GET /api/host/occupancy/; staff or user_type=admin only.',
+    responses={200: OpenApiTypes.OBJECT},
+)
+class AdminOccupancyView(OccupancyBaseView):
+    permission_classes = [permissions.IsAuthenticated, IsAdminUserType]
+    all_hosts = True
+
+
+class CashflowProjectionBaseView(HostScopeMixin, APIView):
+    """
+    Outstanding (pending / overdue) installments grouped by due month and listing currency.
+    Query: months=3..24 (default 12), weighted=1 to add probability-weighted `expected` amounts.
+    """
+
+    def get(self, request):
+        params = parse_cashflow_params(request.query_params)
+        host_id = self.scope_host_id()
+        return Response(
+            cached_cashflow_projection(
+                dashboard_cache.PLATFORM_SCOPE if host_id is None else host_id,
+                self.scoped(BookingPayment.objects.all(), 'booking__rented_property__owner_id', host_id),
+                months=params['months'],
+                weighted=params['weighted'],
             )
-            .select_related('rented_property', 'user')
-            .order_by('check_in', 'id')
         )
 
-        events = []
-        for b in bookings:
-            tenant_label = (b.user.get_full_name() or '').strip() or b.user.username
-            title = f'{b.rented_property.title} · {tenant_label}'
-            events.append({
-                'id': str(b.id),
-                'booking_id': b.id,
-                'title': title,
-                'start': b.check_in.isoformat(),
-                'end': b.check_out.isoformat(),
-                'status': b.status,
-                'property_id': b.rented_property_id,
-                'property_title': b.rented_property.title,
-                'all_day': True,
-                'check_in': b.check_in.isoformat(),
-                'check_out': b.check_out.isoformat(),
-                'guests': b.guests,
-            })
 
-        return Response({'events': events})
+@extend_schema(
+    tags=['Host'],
+    summary='Projected rent income by month and currency',
+    responses={200: OpenApiTypes.OBJECT},
+)
+class HostCashflowView(CashflowProjectionBaseView):
+    permission_classes = [permissions.IsAuthenticated]
+
+
+@extend_schema(
+    tags=['Admin'],
+    summary='Projected rent income — all hosts (platform admin)',
+    description='Same shape as GET /api/host/cashflow/. Optional ?host=<user_id> narrows to one host.',
+    responses={200: OpenApiTypes.OBJECT},
+)
+class AdminCashflowView(CashflowProjectionBaseView):
+    permission_classes = [permissions.IsAuthenticated, IsAdminUserType]
+    all_hosts = True
+    host_query_param = True
+
+
+_CALENDAR_QUERY_PARAMETERS = [
+    {
+        'name': 'start',
+        'required': True,
+        'in': 'query',
+        'description': 'First calendar day to include (YYYY-MM-DD)',
+        'schema': {'type': 'string', 'format': 'date'},
+    },
+    {
+        'name': 'end',
+        'required': True,
+        'in': 'query',
+        'description': 'Last calendar day to include (YYYY-MM-DD, inclusive)',
+        'schema': {'type': 'string', 'format': 'date'},
+    },
+    {
+        'name': 'property_ids',
+        'required': False,
+        'in': 'query',
+        'description': 'Comma-separated property ids to restrict the feed to',
+        'schema': {'type': 'string'},
+    },
+    {
+        'name': 'group',
+        'required': False,
+        'in': 'query',
+        'description': '`property` nests events per listing under `groups`',
+        'schema': {'type': 'string', 'enum': ['property']},
+    },
+    {
+        'name': 'compact',
+        'required': False,
+        'in': 'query',
+        'description': 'Return interned `properties` / `tenants` tables and positional event tuples',
+        'schema': {'type': 'boolean'},
+    },
+    {
+        'name': 'limit',
+        'required': False,
+        'in': 'query',
+        'description': f'Bookings per page (default {CALENDAR_DEFAULT_LIMIT}, max {CALENDAR_MAX_LIMIT})',
+        'schema': {'type': 'integer', 'minimum': 1},
+    },
+    {
+        'name': 'cursor',
+        'required': False,
+        'in': 'query',
+        'description': 'Opaque `next_cursor` from the previous page',
+        'schema': {'type': 'string'},
+    },
+]
+
+
+class BookingCalendarBaseView(HostScopeMixin, APIView):
+    """
+    Bookings overlapping a date range (check_in <= end and check_out > start), one entry per booking.
+    Query: start=YYYY-MM-DD&end=YYYY-MM-DD, optional property_ids, group=property, compact=1,
+    limit + cursor (keyset on check_in, id). Subclasses only set the scope (HostScopeMixin).
+    """
+
+    def get(self, request):
+        params = parse_calendar_params(request.query_params)
+        qs = self.scoped(Booking.objects.all(), 'rented_property__owner_id')
+        return Response(build_calendar_feed(qs, params))
+
+
+@extend_schema(
+    tags=['Host'],
+    summary='Host calendar events (bookings)',
+    parameters=_CALENDAR_QUERY_PARAMETERS,
+)
+class HostCalendarView(BookingCalendarBaseView):
+    """Bookings on the host's properties for the dashboard calendar."""
+
+    permission_classes = [permissions.IsAuthenticated]
 
 
 @extend_schema(
     tags=['Admin'],
     summary='Admin calendar — all booking nights (platform admin)',
     description='Same shape as GET /api/host/calendar/; staff or user_type=admin only.',
+    parameters=_CALENDAR_QUERY_PARAMETERS,
 )
-class AdminCalendarView(APIView):
+class AdminCalendarView(BookingCalendarBaseView):
     """Platform-wide booking nights for the admin dashboard calendar."""
 
     permission_classes = [permissions.IsAuthenticated, IsAdminUserType]
+    all_hosts = True
+
+
+def _ical_streaming_response(request, bookings_qs, *, scope: str, calendar_name: str):
+    """Shared body for the .ics feeds: conditional 304 on a strong ETag, else a streamed calendar."""
+    qs = ical_feed_queryset(bookings_qs)
+    etag = ical_feed_etag(qs, scope)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        not_modified['Cache-Control'] = 'private, max-age=300'
+        return not_modified
+    body = iter_ical_feed(qs, calendar_name=calendar_name, host=request.get_host().split(':')[0])
+    response = StreamingHttpResponse(
+        stream_body(request, body),
+        content_type='text/calendar; charset=utf-8',
+    )
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=300'
+    response['Content-Disposition'] = 'inline; filename="bookings.ics"'
+    return response
+
+
+@extend_schema(
+    tags=['Host'],
+    summary='iCalendar feed URLs for your calendar apps',
+    description=(
+        'Secret, tokenized `.ics` URLs (one for all your listings, one per listing) to paste into '
+        'Google Calendar, Apple Calendar or Outlook. Anyone with a URL can read that feed.'
+    ),
+    responses={200: OpenApiTypes.OBJECT},
+)
+class HostCalendarFeedUrlsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        start_s = request.query_params.get('start')
-        end_s = request.query_params.get('end')
-        if not start_s or not end_s:
-            return Response(
-                {'detail': 'Query params "start" and "end" are required (YYYY-MM-DD).'},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        try:
-            start_date = datetime.strptime(start_s, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end_s, '%Y-%m-%d').date()
-        except ValueError:
-            return Response({'detail': 'Invalid date format. Use YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
-        if end_date < start_date:
-            return Response({'detail': '"end" must be >= "start".'}, status=status.HTTP_400_BAD_REQUEST)
-
-        bookings = (
-            Booking.objects.filter(
-                status__in=['pending', 'confirmed', 'active', 'completed'],
-                check_in__lte=end_date,
-                check_out__gt=start_date,
-            )
-            .select_related('rented_property', 'user')
-            .order_by('check_in', 'id')
+        host = request.user
+        props = Property.objects.filter(owner=host).order_by('title').values_list('id', 'title')
+        return Response({
+            'host_feed': request.build_absolute_uri(
+                reverse('ical-host-feed', args=[host.id, host_feed_token(host.id)])
+            ),
+            'properties': [
+                {
+                    'property_id': pid,
+                    'title': title,
+                    'feed': request.build_absolute_uri(
+                        reverse('ical-property-feed', args=[pid, property_feed_token(pid, host.id)])
+                    ),
+                }
+                for pid, title in props
+            ],
+        })
+
+
+@extend_schema(
+    tags=['Host'],
+    summary='iCalendar feed — all bookings on a host’s listings',
+    auth=[],
+    responses={(200, 'text/calendar'): OpenApiTypes.STR, 304: None, 404: None},
+)
+class HostICalFeedView(APIView):
+    """GET /api/ical/host/<user_id>/<token>.ics — token from /api/host/calendar/feeds/."""
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, user_id, token):
+        if not token_matches(host_feed_token(user_id), token):
+            raise Http404
+        return _ical_streaming_response(
+            request,
+            Booking.objects.filter(rented_property__owner_id=user_id),
+            scope=f'host:{user_id}',
+            calendar_name='Estatery bookings',
         )
 
-        events = []
-        for b in bookings:
-            tenant_label = (b.user.get_full_name() or '').strip() or b.user.username
-            title = f'{b.rented_property.title} · {tenant_label}'
-            events.append({
-                'id': str(b.id),
-                'booking_id': b.id,
-                'title': title,
-                'start': b.check_in.isoformat(),
-                'end': b.check_out.isoformat(),
-                'status': b.status,
-                'property_id': b.rented_property_id,
-                'property_title': b.rented_property.title,
-                'all_day': True,
-                'check_in': b.check_in.isoformat(),
-                'check_out': b.check_out.isoformat(),
-                'guests': b.guests,
-            })
 
-        return Response({'events': events})
+@extend_schema(
+    tags=['Host'],
+    summary='iCalendar feed — bookings on one listing',
+    auth=[],
+    responses={(200, 'text/calendar'): OpenApiTypes.STR, 304: None, 404: None},
+)
+class PropertyICalFeedView(APIView):
+    """GET /api/ical/properties/<pk>/<token>.ics — token from /api/host/calendar/feeds/."""
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk, token):
+        prop = Property.objects.filter(pk=pk).values('owner_id', 'title').first()
+        if not prop or not token_matches(property_feed_token(pk, prop['owner_id']), token):
+            raise Http404
+        return _ical_streaming_response(
+            request,
+            Booking.objects.filter(rented_property_id=pk),
+            scope=f'property:{pk}',
+            calendar_name=f'{prop["title"]} · Estatery',
+        )
 
 
 @extend_schema(tags=['Bookings'], summary='Reschedule booking (listing owner or platform admin)')
@@ -1642,7 +1932,10 @@ class BookingRescheduleView(APIView):
                 total_price=total_price,
                 security_deposit=deposit,
                 discount_applied=discount_pct,
+                updated_at=timezone.now(),
             )
+            # .update() sends no post_save, so the host's dashboard cache is bumped here.
+            transaction.on_commit(lambda: dashboard_cache.bump_host(prop.owner_id))
 
         booking.refresh_from_db()
         booking.generate_payment_schedule()
@@ -1665,24 +1958,43 @@ class BookingRescheduleView(APIView):
             'schema': {'type': 'string'},
         },
         {
-            'name': 'page',
+            'name': 'cursor',
             'required': False,
             'in': 'query',
-            'description': 'Page number (1-based). Use with page_size.',
-            'schema': {'type': 'integer', 'minimum': 1},
+            'description': (
+                'Keyset paging: empty for the first page, then next_cursor of the previous page'
+            ),
+            'schema': {'type': 'string'},
         },
         {
             'name': 'page_size',
             'required': False,
             'in': 'query',
-            'description': 'Page size (default 50, max 200)',
+            'description': 'Page size (default 50, max 500; 500 without cursor/page)',
+            'schema': {'type': 'integer', 'minimum': 1},
+        },
+        {
+            'name': 'summary',
+            'required': False,
+            'in': 'query',
+            'description': '1 to include summary on pages after the first',
+            'schema': {'type': 'string'},
+        },
+        {
+            'name': 'page',
+            'required': False,
+            'in': 'query',
+            'description': 'Legacy offset paging (1-based). Prefer cursor.',
             'schema': {'type': 'integer', 'minimum': 1},
         },
         {
             'name': 'limit',
             'required': False,
             'in': 'query',
-            'description': 'Legacy: first-page page size when page/page_size omitted (max 2000)',
+            'description': (
+                'Legacy: first-page size when page/page_size are omitted (default 500, max 2000; '
+                'max 500 with cursor)'
+            ),
             'schema': {'type': 'integer', 'minimum': 1},
         },
     ],
@@ -1690,8 +2002,11 @@ class BookingRescheduleView(APIView):
 class HostPaymentsListView(APIView):
     """
     Scheduled booking payments (deposit + rent installments) for listings you own.
-    Filtering: optional status (comma-separated). Pagination: page + page_size (defaults 1 and 50).
-    Legacy clients may pass limit only (no page) to fetch the first page with up to limit rows.
+    Filtering: optional status (comma-separated). Pagination: clients that send `cursor` (empty
+    for the first page) get keyset pages on (-due_date, -id) with page_size (default 50) and
+    `next_cursor`; summary is sent on the first page or with ?summary=1. Without `cursor` the
+    response is the offset page as before: page + page_size (defaults 1 and 50), limit only
+    (default 500, max 2000) or no hints (500 rows), always with the summary.
     Summary reflects the full filtered set (not just the current page).
     """
 
@@ -1707,48 +2022,124 @@ class HostPaymentsListView(APIView):
         if status_filter is not None:
             qs = qs.filter(status__in=status_filter)
 
-        summary = _host_payments_summary(qs)
-        total_count = summary['count']
-
         qp = request.query_params
-        try:
-            page = int(qp.get('page', 1))
-        except ValueError:
-            page = 1
-        page = max(1, page)
-
+        use_cursor = 'cursor' in qp
         if 'page_size' in qp:
             try:
                 page_size = int(qp['page_size'])
             except ValueError:
                 page_size = 50
-            page_size = max(1, min(page_size, 200))
+            page_size = max(1, min(page_size, HOST_PAYMENTS_MAX_PAGE_SIZE))
         elif 'limit' in qp:
             try:
-                page_size = int(qp.get('limit', 500))
+                page_size = int(qp['limit'])
             except ValueError:
-                page_size = 500
-            page_size = max(1, min(page_size, 2000))
-        elif 'page' in qp:
+                page_size = HOST_PAYMENTS_LEGACY_LIMIT
+            cap = HOST_PAYMENTS_MAX_PAGE_SIZE if use_cursor else HOST_PAYMENTS_LEGACY_MAX_LIMIT
+            page_size = max(1, min(page_size, cap))
+        elif 'page' in qp or use_cursor:
             page_size = 50
         else:
-            # No hints: same default cap as pre-pagination API (single "page")
-            page_size = 500
+            # No hints: same default cap as the pre-pagination API (single "page").
+            page_size = HOST_PAYMENTS_LEGACY_LIMIT
 
-        offset = (page - 1) * page_size
-        page_qs = qs[offset : offset + page_size]
-        payments = [_serialize_booking_payment_row(p) for p in page_qs]
+        want_summary = str(qp.get('summary', '')).strip().lower() in ('1', 'true', 'yes')
 
-        total_pages = max(1, (total_count + page_size - 1) // page_size) if total_count else 1
-
-        return Response({
+        if not use_cursor:
+            # Offset paging for older clients; totals come from the cached summary.
+            try:
+                page = max(1, int(qp.get('page', 1)))
+            except ValueError:
+                page = 1
+            summary = _host_payments_summary_cached(request.user, status_filter)
+            total_count = summary['count']
+            offset = (page - 1) * page_size
+            rows = list(qs[offset : offset + page_size])
+            body = {
+                'payments': [_serialize_booking_payment_row(p) for p in rows],
+                'page': page,
+                'page_size': page_size,
+                'total_count': total_count,
+                'total_pages': max(1, (total_count + page_size - 1) // page_size),
+                'next_cursor': (
+                    encode_keyset_cursor(rows[-1].due_date, rows[-1].id)
+                    if rows and offset + page_size < total_count else None
+                ),
+            }
+            body['has_more'] = body['next_cursor'] is not None
+            body['summary'] = summary
+            return Response(body)
+
+        cursor = qp.get('cursor')
+        if cursor:
+            c_due, c_id = decode_keyset_cursor(cursor)
+            qs = qs.filter(models.Q(due_date__lt=c_due) | models.Q(due_date=c_due, id__lt=c_id))
+
+        rows = list(qs[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        payments = [_serialize_booking_payment_row(p) for p in rows]
+        body = {
             'payments': payments,
-            'summary': summary,
-            'page': page,
             'page_size': page_size,
-            'total_count': total_count,
-            'total_pages': total_pages,
-        })
+            'next_cursor': (
+                encode_keyset_cursor(rows[-1].due_date, rows[-1].id) if has_more else None
+            ),
+            'has_more': has_more,
+        }
+        if not cursor or want_summary:
+            summary = _host_payments_summary_cached(request.user, status_filter)
+            body['summary'] = summary
+            body['total_count'] = summary['count']
+        return Response(body)
+
+
+@extend_schema(
+    tags=['Host'],
+    summary='Export payments or bookings (CSV / NDJSON, streamed)',
+    description=(
+        'GET /api/host/exports/payments.csv | payments.ndjson | bookings.csv | bookings.ndjson. '
+        'Query: start/end (YYYY-MM-DD, on due_date for payments, check_in for bookings), '
+        'status (comma-separated), property_ids.'
+    ),
+    responses={200: OpenApiTypes.BINARY},
+)
+class ExportBaseView(HostScopeMixin, APIView):
+    """Streams the whole filtered result set; rows are never materialized in memory."""
+
+    def get(self, request, dataset, fmt):
+        if dataset not in ('payments', 'bookings') or fmt not in EXPORT_FORMATS:
+            raise Http404
+        params = parse_export_params(dataset, request.query_params)
+        if dataset == 'payments':
+            base = self.scoped(BookingPayment.objects.all(), 'booking__rented_property__owner_id')
+        else:
+            base = export_bookings_queryset(self.scoped(Booking.objects.all(), 'rented_property__owner_id'))
+        qs = filter_export_queryset(dataset, base, params)
+        response = StreamingHttpResponse(
+            stream_body(request, iter_export_rows(dataset, qs, fmt)),
+            content_type=EXPORT_FORMATS[fmt],
+        )
+        stamp = timezone.now().date().isoformat()
+        response['Content-Disposition'] = f'attachment; filename="{dataset}-{stamp}.{fmt}"'
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+
+class HostExportView(ExportBaseView):
+    permission_classes = [permissions.IsAuthenticated]
+
+
+@extend_schema(
+    tags=['Admin'],
+    summary='Export payments or bookings — all hosts (platform admin)',
+    description='Same formats and filters as /api/host/exports/; optional ?host=<user_id>.',
+    responses={200: OpenApiTypes.BINARY},
+)
+class AdminExportView(ExportBaseView):
+    permission_classes = [permissions.IsAuthenticated, IsAdminUserType]
+    all_hosts = True
+    host_query_param = True
 
 
 # ============ PAYMENT VIEWS ============
@@ -1868,6 +2259,58 @@ class BulkMarkBookingPaymentsPaidView(APIView):
         )
 
 
+class ReconcileStatementBaseView(HostScopeMixin, APIView):
+    """
+    POST multipart `statement` (CSV bank statement). Optional form fields: `window` (days around
+    the due date for unreferenced lines, default 5, max 31) and `dry_run` (match without saving).
+    """
+
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        file_obj = request.FILES.get('statement')
+        if not file_obj:
+            return Response(
+                {'detail': 'Missing file field "statement".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            lines = read_statement(file_obj.read().decode('utf-8-sig'))
+        except UnicodeDecodeError:
+            return Response({'detail': 'Statement must be UTF-8 CSV.'}, status=status.HTTP_400_BAD_REQUEST)
+        except StatementError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes', 'on')
+        report = reconcile_statement(
+            lines,
+            self.scoped(BookingPayment.objects.all(), 'booking__rented_property__owner_id'),
+            window=parse_reconcile_window(request.data.get('window')),
+            dry_run=dry_run,
+        )
+        return Response(report)
+
+
+@extend_schema(
+    tags=['Payments'],
+    summary='Reconcile a bank statement against your open installments',
+    request={'multipart/form-data': OpenApiTypes.OBJECT},
+    responses={200: OpenApiTypes.OBJECT},
+)
+class HostReconcileStatementView(ReconcileStatementBaseView):
+    permission_classes = [permissions.IsAuthenticated]
+
+
+@extend_schema(
+    tags=['Admin'],
+    summary='Reconcile a bank statement — all hosts (platform admin)',
+    request={'multipart/form-data': OpenApiTypes.OBJECT},
+    responses={200: OpenApiTypes.OBJECT},
+)
+class AdminReconcileStatementView(ReconcileStatementBaseView):
+    permission_classes = [permissions.IsAuthenticated, IsAdminUserType]
+    all_hosts = True
+
+
 @extend_schema(tags=['Payments'])
 class MyPaymentsListView(generics.ListAPIView):
     """All scheduled / completed payments for the authenticated tenant's bookings."""
@@ -2047,22 +2490,32 @@ def _parse_host_payments_status_param(raw: Optional[str]):
 
 
 def _host_payments_summary(qs):
-    """Counts and outstanding amount for the (filtered) queryset, before pagination."""
-    total = qs.count()
-    agg = {row['status']: row['n'] for row in qs.values('status').annotate(n=models.Count('id'))}
-    outstanding = (
-        qs.filter(status__in=['pending', 'overdue']).aggregate(t=models.Sum('amount'))['t']
-        or Decimal('0')
+    """Counts and outstanding amount for the (filtered) queryset, in one aggregate query."""
+    agg = qs.order_by().aggregate(
+        count=models.Count('id'),
+        **{
+            code: models.Count('id', filter=models.Q(status=code))
+            for code in ('paid', 'pending', 'overdue', 'cancelled', 'refunded')
+        },
+        outstanding=models.Sum('amount', filter=models.Q(status__in=['pending', 'overdue'])),
+    )
+    outstanding = agg.pop('outstanding') or Decimal('0')
+    return {**agg, 'outstanding_amount': str(outstanding)}
+
+
+def _host_payments_summary_cached(user, status_filter):
+    """Per (host, status filter) summary; payment writes bump the host's dashboard cache version."""
+    status_key = ','.join(sorted(status_filter)) if status_filter else '*'
+    return dashboard_cache.get_or_build(
+        user.id,
+        'payments_summary',
+        (status_key,),
+        lambda: _host_payments_summary(
+            BookingPayment.objects.filter(booking__rented_property__owner=user, status__in=status_filter)
+            if status_filter
+            else BookingPayment.objects.filter(booking__rented_property__owner=user)
+        ),
     )
-    return {
-        'count': total,
-        'paid': agg.get('paid', 0),
-        'pending': agg.get('pending', 0),
-        'overdue': agg.get('overdue', 0),
-        'cancelled': agg.get('cancelled', 0),
-        'refunded': agg.get('refunded', 0),
-        'outstanding_amount': str(outstanding),
-    }
 
 
 def _serialize_recent_payments_for_host(user, limit=100):
@@ -2286,7 +2739,7 @@ class HostDashboardView(APIView):
         # Recent bookings
         recent_bookings = Booking.objects.filter(
             rented_property__owner=user
-        ).select_related('user', 'rented_property').order_by('-created_at')[:5]
+        ).select_related('user', 'rented_property').prefetch_related('payments').order_by('-created_at')[:5]
 
         primary_currency = (
             prop_base.values_list('currency', flat=True).first() or 'ghs'
@@ -2326,6 +2779,12 @@ class HostDashboardView(APIView):
                 ),
             },
             'currency': primary_currency,
+            'cashflow': cached_cashflow_projection(
+                user.id,
+                BookingPayment.objects.filter(booking__rented_property__owner=user),
+                months=12,
+                weighted=False,
+            ),
         })
 
 
@@ -0,0 +1,132 @@
+"""
+ASGI app for the realtime event stream, mounted in front of Django.
+
+Django's ASGI handler gives every request its own thread-sensitive executor thread for as long as
+the response runs, about 150 KB per connection for a stream that is idle almost all the time.
+This app handles `GET /api/realtime/events/` directly and passes every other request to Django.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from .stream import EVENTS_PATH, authenticate, event_frames
+from .tickets import redeem_ticket
+
+
+def _cors_headers(scope) -> list[tuple[bytes, bytes]]:
+    """Mirror django-cors-headers for this path (EventSource sends no credentials)."""
+    origin = dict(scope.get("headers") or []).get(b"origin")
+    if not origin:
+        return []
+    if getattr(settings, "CORS_ALLOW_ALL_ORIGINS", False):
+        return [(b"access-control-allow-origin", b"*")]
+    if origin.decode("latin-1") in getattr(settings, "CORS_ALLOWED_ORIGINS", ()):
+        return [(b"access-control-allow-origin", origin), (b"vary", b"Origin")]
+    return []
+
+
+def _raw_token(scope) -> str | None:
+    header = dict(scope.get("headers") or []).get(b"authorization", b"").decode("latin-1")
+    if header.startswith("Bearer "):
+        return header[len("Bearer "):].strip() or None
+    return None
+
+
+def _ticket(scope) -> str | None:
+    # Only a single-use ticket goes in the URL (see realtime.tickets); never the JWT itself.
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("ticket")
+    return values[0] if values else None
+
+
+async def _json_response(send, scope, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), *_cors_headers(scope)],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _wait_for_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def event_stream_app(scope, receive, send) -> None:
+    if scope["method"] != "GET":
+        await _json_response(send, scope, 405, f'Method "{scope["method"]}" not allowed.')
+        return
+    raw = _raw_token(scope)
+    ticket = None if raw else _ticket(scope)
+    if not raw and not ticket:
+        await _json_response(send, scope, 401, "Authentication credentials were not provided.")
+        return
+    if ticket:
+        redeemed = await sync_to_async(redeem_ticket, thread_sensitive=False)(ticket)
+        if redeemed is None:
+            await _json_response(send, scope, 401, "Invalid or expired ticket.")
+            return
+        user_id, expires_at = redeemed
+    else:
+        try:
+            user_id, expires_at = await sync_to_async(authenticate, thread_sensitive=False)(raw)
+        except (InvalidToken, AuthenticationFailed, TokenError) as e:
+            detail = getattr(e, "detail", e)
+            if isinstance(detail, dict):
+                detail = detail.get("detail", "Invalid token.")
+            await _json_response(send, scope, 401, str(detail))
+            return
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),  # nginx: pass frames through unbuffered
+                *_cors_headers(scope),
+            ],
+        }
+    )
+
+    async def pump():
+        async for frame in event_frames(user_id, expires_at):
+            await send({"type": "http.response.body", "body": frame.encode(), "more_body": True})
+
+    pump_task = asyncio.ensure_future(pump())
+    disconnect_task = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await asyncio.wait({pump_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (pump_task, disconnect_task):
+            task.cancel()
+        await asyncio.gather(pump_task, disconnect_task, return_exceptions=True)
+    if not disconnect_task.cancelled() and disconnect_task.done() and disconnect_task.exception() is None:
+        return  # client went away; nothing more to send
+    try:
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    except OSError:
+        pass
+
+
+def with_event_stream(django_app):
+    """Wrap the Django ASGI app so the event stream path is served by event_stream_app."""
+
+    async def application(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == EVENTS_PATH:
+            await event_stream_app(scope, receive, send)
+        else:
+            await django_app(scope, receive, send)
+
+    return application
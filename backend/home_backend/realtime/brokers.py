@@ -0,0 +1,301 @@
+"""
+Pub/sub brokers behind the realtime event stream (realtime.views).
+
+A broker delivers events published on a channel (`user:<id>`) to every open subscription of that
+channel. `publish` is synchronous and thread-safe, so request code running in a worker thread can
+call it; subscriptions are consumed on the ASGI event loop. Pick the implementation with the
+REALTIME_BROKER setting (dotted path):
+
+- DatabaseBroker (default): writes each event to the realtime_realtimeevent table; every process
+  with open streams polls it (REALTIME_POLL_SECONDS). Works on any database, so events published
+  by `run_worker` or by another ASGI worker reach the stream.
+- PostgresNotifyBroker: publishes with NOTIFY and fans out to the local subscribers of every
+  process that LISTENs. Same reach as DatabaseBroker without the polling; use it in production on
+  PostgreSQL.
+- InProcessBroker: subscribers in this process only. Only correct when nothing publishes from
+  another process (no `run_worker`, one ASGI worker), e.g. tests.
+
+Other brokers (Redis, …) subclass Broker and implement `publish` / `subscribe` / `unsubscribe`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+REALTIME_CHANNEL_PREFIX = "estatery_realtime"
+
+
+class Subscription:
+    """Bounded event queue of one connection. When it is full the oldest event is dropped."""
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.channel = channel
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _put(self, event: dict) -> None:
+        # Runs on the subscriber's loop.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def deliver(self, event: dict) -> None:
+        """Thread-safe: hand `event` to the subscriber's event loop."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # loop closed; the connection is gone
+
+    async def get(self, timeout: float | None = None) -> dict | None:
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker(ABC):
+    @abstractmethod
+    def publish(self, channel: str, event: dict) -> None:
+        """Deliver `event` to every subscription of `channel`, in any process the broker reaches."""
+
+    def publish_many(self, messages) -> None:
+        """Publish `(channel, event)` pairs; brokers that can batch the writes override this."""
+        for channel, event in messages:
+            try:
+                self.publish(channel, event)
+            except Exception:
+                logger.exception("Realtime publish to %s failed", channel)
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> Subscription:
+        """Register a subscription on the running event loop; call `unsubscribe` when done."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering to `subscription`."""
+
+    def subscriber_count(self) -> int:
+        return 0
+
+
+class InProcessBroker(Broker):
+    def __init__(self, queue_size: int | None = None):
+        self.queue_size = queue_size or getattr(settings, "REALTIME_QUEUE_SIZE", 100)
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def publish(self, channel: str, event: dict) -> None:
+        self._fan_out(channel, event)
+
+    def _fan_out(self, channel: str, event: dict) -> None:
+        event = {**event, "id": next(self._ids)}
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            sub.deliver(event)
+
+    def subscribe(self, channel: str) -> Subscription:
+        sub = Subscription(channel, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(sub)
+        return sub
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(subscription.channel)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+class PostgresNotifyBroker(InProcessBroker):
+    """
+    Cross-process fan-out over PostgreSQL LISTEN/NOTIFY (psycopg2). Publishing runs
+    `pg_notify` on the request's connection; one listener thread per process (started with the
+    first subscription) forwards notifications to local subscribers. NOTIFY payloads are limited to
+    8000 bytes, so larger events are sent without `data` and clients refetch.
+    """
+
+    _PAYLOAD_LIMIT = 7900
+
+    def __init__(self, queue_size: int | None = None):
+        super().__init__(queue_size)
+        self._listener: threading.Thread | None = None
+
+    def publish(self, channel: str, event: dict) -> None:
+        from django.db import connection
+
+        payload = json.dumps({"channel": channel, "event": event}, separators=(",", ":"), default=str)
+        if len(payload.encode()) > self._PAYLOAD_LIMIT:
+            stub = {k: v for k, v in event.items() if k != "data"}
+            stub["truncated"] = True
+            payload = json.dumps({"channel": channel, "event": stub}, separators=(",", ":"), default=str)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [REALTIME_CHANNEL_PREFIX, payload])
+
+    def subscribe(self, channel: str) -> Subscription:
+        self._ensure_listener()
+        return super().subscribe(channel)
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen_forever, name="realtime-listen", daemon=True)
+                self._listener.start()
+
+    def _listen_forever(self) -> None:
+        from django.db import connections
+
+        wrapper = connections["default"]
+        while True:
+            try:
+                conn = wrapper.Database.connect(**wrapper.get_connection_params())
+                conn.set_session(autocommit=True)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {REALTIME_CHANNEL_PREFIX}")
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        try:
+                            message = json.loads(note.payload)
+                            self._fan_out(message["channel"], message["event"])
+                        except (ValueError, KeyError):
+                            logger.warning("Ignoring malformed realtime notification: %.200s", note.payload)
+            except Exception:
+                logger.exception("Realtime LISTEN connection failed; reconnecting in 5s")
+                threading.Event().wait(5)
+
+
+class DatabaseBroker(InProcessBroker):
+    """
+    Cross-process fan-out through the RealtimeEvent table. Publishing inserts the events and
+    delivers them to local subscribers at once; one poller thread per process (started with the
+    first subscription) reads rows other processes inserted since its last poll. Rows are kept for
+    REALTIME_EVENT_RETENTION_SECONDS, so a poller also rereads a short window of recent rows to pick
+    up inserts that committed after a higher id was already seen.
+    """
+
+    def __init__(self, queue_size: int | None = None):
+        super().__init__(queue_size)
+        self.origin = uuid.uuid4().hex
+        self.poll_seconds = getattr(settings, "REALTIME_POLL_SECONDS", 1.0)
+        self.retention = timedelta(seconds=getattr(settings, "REALTIME_EVENT_RETENTION_SECONDS", 60))
+        self._poller: threading.Thread | None = None
+        self._last_purge = 0.0
+
+    def publish(self, channel: str, event: dict) -> None:
+        self.publish_many([(channel, event)])
+
+    def publish_many(self, messages) -> None:
+        from .models import RealtimeEvent
+
+        messages = list(messages)
+        if not messages:
+            return
+        RealtimeEvent.objects.bulk_create(
+            [RealtimeEvent(channel=channel, event=event, origin=self.origin) for channel, event in messages]
+        )
+        for channel, event in messages:
+            self._fan_out(channel, event)
+        self._purge_expired()
+
+    def subscribe(self, channel: str) -> Subscription:
+        self._ensure_poller()
+        return super().subscribe(channel)
+
+    def _purge_expired(self) -> None:
+        from .models import RealtimeEvent
+
+        now = time.monotonic()
+        if now - self._last_purge < self.retention.total_seconds():
+            return
+        self._last_purge = now
+        RealtimeEvent.objects.filter(created_at__lt=timezone.now() - self.retention).delete()
+
+    def _ensure_poller(self) -> None:
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_forever, name="realtime-poll", daemon=True)
+                self._poller.start()
+
+    def _poll_forever(self) -> None:
+        from .models import RealtimeEvent
+
+        # Reread this window every poll; a transaction may commit a lower id after a higher one.
+        lookback = timedelta(seconds=max(5.0, self.poll_seconds * 5))
+        last_id = None
+        seen: dict[int, float] = {}
+        wait = threading.Event().wait
+        while True:
+            try:
+                close_old_connections()
+                if last_id is None:
+                    # Start from now: streams opened here never replay older events.
+                    last = RealtimeEvent.objects.order_by("-id").values_list("id", flat=True).first()
+                    last_id = last or 0
+                rows = (
+                    RealtimeEvent.objects.filter(
+                        Q(id__gt=last_id) | Q(created_at__gte=timezone.now() - lookback)
+                    )
+                    .exclude(origin=self.origin)
+                    .order_by("id")
+                    .values_list("id", "channel", "event")
+                )
+                now = time.monotonic()
+                for row_id, channel, event in rows:
+                    last_id = max(last_id, row_id)
+                    if row_id in seen:
+                        continue
+                    seen[row_id] = now
+                    self._fan_out(channel, event)
+                cutoff = now - 2 * lookback.total_seconds()
+                seen = {k: t for k, t in seen.items() if t >= cutoff}
+                self._purge_expired()
+            except Exception:
+                logger.exception("Realtime event poll failed; retrying in %ss", self.poll_seconds)
+            wait(self.poll_seconds)
+
+
+_broker: Broker | None = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> Broker:
+    """The process-wide broker configured by REALTIME_BROKER."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, "REALTIME_BROKER", "realtime.brokers.DatabaseBroker")
+                _broker = import_string(path)()
+    return _broker
@@ -0,0 +1,37 @@
+"""
+Publish realtime events to users (see realtime.views for the stream they arrive on).
+
+Events are published after the surrounding transaction commits, so a client never hears about a
+row it cannot read yet, and nothing is sent for work that rolls back. Publishing is best-effort:
+clients that were offline catch up with the regular REST endpoints.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.db import transaction
+
+from .brokers import get_broker
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def publish_to_users(user_ids, event_type: str, data: dict) -> None:
+    """Send `{"type": event_type, "data": data}` to every open stream of `user_ids` on commit."""
+    user_ids = sorted({uid for uid in user_ids if uid})
+    if not user_ids:
+        return
+
+    def send():
+        event = {"type": event_type, "data": data}
+        try:
+            get_broker().publish_many([(user_channel(uid), event) for uid in user_ids])
+        except Exception:
+            logger.exception("Realtime publish of %s to users %s failed", event_type, user_ids)
+
+    transaction.on_commit(send)
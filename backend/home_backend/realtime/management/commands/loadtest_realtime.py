@@ -0,0 +1,178 @@
+"""
+Open many idle connections to the realtime event stream and report what one server process holds.
+
+Start the ASGI server first (one worker), e.g.
+  uvicorn home_backend_site.asgi:application --port 8000 --workers 1
+
+then, from backend/home_backend:
+  python manage.py loadtest_realtime --user alice --connections 2000
+  python manage.py loadtest_realtime --user alice --connections 5000 --ramp 500 --hold 60 --server-pid 12345
+
+Each connection authenticates, waits for the `ready` frame and then stays idle (heartbeats only).
+With --server-pid the server's RSS and open file descriptors are sampled before and after, giving
+the memory cost per idle connection. The client needs one file descriptor per connection; the
+soft RLIMIT_NOFILE is raised to the hard limit, and the server needs the same headroom (ulimit -n).
+"""
+
+import asyncio
+import os
+import resource
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def _proc_stats(pid):
+    """(RSS MB, open fds) of a local process, or None when /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as fh:
+            rss = next(int(line.split()[1]) for line in fh if line.startswith("VmRSS:")) / 1024
+        return rss, len(os.listdir(f"/proc/{pid}/fd"))
+    except (OSError, StopIteration):
+        return None
+
+
+def _raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed + 64:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+class _Connection:
+    def __init__(self):
+        self.writer = None
+        self.connect_seconds = None
+        self.error = None
+        self.closed_early = False
+
+
+async def _open(host, port, path, token, timeout, conn):
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        conn.writer = writer
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAuthorization: Bearer {token}\r\n"
+            "Accept: text/event-stream\r\nCache-Control: no-cache\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readline(), timeout)
+        if b" 200 " not in status:
+            raise ConnectionError(status.decode(errors="replace").strip() or "no response")
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if not line:
+                raise ConnectionError("closed before the ready event")
+            if line.strip() == b"event: ready":
+                break
+        conn.connect_seconds = time.perf_counter() - started
+        # Drain heartbeats until the test ends; EOF means the server dropped us.
+        while await reader.readline():
+            pass
+        conn.closed_early = True
+    except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+        conn.error = f"{type(e).__name__}: {e}"
+    except asyncio.CancelledError:
+        pass
+
+
+class Command(BaseCommand):
+    help = "Load-test how many idle realtime (SSE) connections one ASGI worker can hold."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the ASGI server.")
+        parser.add_argument("--user", help="Username to mint an access token for.")
+        parser.add_argument("--token", help="JWT access token to use instead of --user.")
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--ramp", type=int, default=200, help="New connections per second.")
+        parser.add_argument("--hold", type=float, default=30, help="Seconds to keep all connections idle.")
+        parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for each ready event.")
+        parser.add_argument("--server-pid", type=int, help="Sample RSS / fds of this local server process.")
+
+    def handle(self, *args, **options):
+        n = options["connections"]
+        if n < 1 or options["ramp"] < 1:
+            raise CommandError("--connections and --ramp must be >= 1.")
+        token = options["token"]
+        if not token:
+            if not options["user"]:
+                raise CommandError("Pass --user or --token.")
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user {options['user']!r}.")
+            token = str(RefreshToken.for_user(user).access_token)
+
+        parts = urlsplit(options["url"])
+        if parts.scheme != "http":
+            raise CommandError("Only http:// URLs are supported (run against the worker directly).")
+        host, port = parts.hostname, parts.port or 80
+        path = parts.path.rstrip("/") + "/api/realtime/events/"
+
+        limit = _raise_fd_limit(n)
+        if limit < n + 64:
+            self.stdout.write(self.style.WARNING(f"RLIMIT_NOFILE is {limit}; expect failures above ~{limit - 64}."))
+        asyncio.run(self._run(host, port, path, token, n, options))
+
+    async def _run(self, host, port, path, token, n, options):
+        pid = options["server_pid"]
+        before = _proc_stats(pid) if pid else None
+        conns = [_Connection() for _ in range(n)]
+        tasks = []
+        started = time.perf_counter()
+        for i, conn in enumerate(conns):
+            tasks.append(asyncio.create_task(_open(host, port, path, token, options["timeout"], conn)))
+            if (i + 1) % options["ramp"] == 0:
+                await asyncio.sleep(1)
+        # Wait until every connection is ready or failed.
+        while any(c.connect_seconds is None and c.error is None for c in conns):
+            await asyncio.sleep(0.2)
+            if time.perf_counter() - started > n / options["ramp"] + options["timeout"] + 5:
+                break
+        ramp_seconds = time.perf_counter() - started
+        ready = [c for c in conns if c.connect_seconds is not None]
+        self.stdout.write(f"{len(ready)}/{n} connected in {ramp_seconds:.1f}s")
+        if ready:
+            times = sorted(c.connect_seconds for c in ready)
+            p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+            self.stdout.write(f"  time to ready: median {statistics.median(times) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms")
+        loaded = _proc_stats(pid) if pid else None
+
+        self.stdout.write(f"Holding for {options['hold']:.0f}s…")
+        await asyncio.sleep(options["hold"])
+        alive = sum(1 for c in ready if not c.closed_early and c.error is None)
+        self.stdout.write(f"  {alive}/{len(ready)} still open after the hold")
+
+        errors = {}
+        for c in conns:
+            if c.error:
+                errors[c.error] = errors.get(c.error, 0) + 1
+        for message, count in sorted(errors.items(), key=lambda kv: -kv[1])[:5]:
+            self.stdout.write(self.style.WARNING(f"  {count} × {message}"))
+
+        if before and loaded:
+            rss_delta = loaded[0] - before[0]
+            per_conn = rss_delta * 1024 / len(ready) if ready else 0
+            self.stdout.write(
+                f"Server pid {pid}: RSS {before[0]:.1f} → {loaded[0]:.1f} MB "
+                f"(+{rss_delta:.1f} MB, {per_conn:.1f} KB per connection), fds {before[1]} → {loaded[1]}"
+            )
+
+        for t in tasks:
+            t.cancel()
+        for c in conns:
+            if c.writer is not None:
+                c.writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if pid:
+            await asyncio.sleep(2)
+            after = _proc_stats(pid)
+            if after:
+                self.stdout.write(f"  after disconnect: RSS {after[0]:.1f} MB, fds {after[1]}")
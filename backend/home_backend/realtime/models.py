@@ -0,0 +1,18 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class RealtimeEvent(models.Model):
+    """
+    One published event, kept briefly so DatabaseBroker can hand it to the streams held by other
+    processes (see realtime.brokers). Rows are deleted after REALTIME_EVENT_RETENTION_SECONDS.
+    """
+
+    channel = models.CharField(max_length=100)
+    event = models.JSONField(encoder=DjangoJSONEncoder)
+    # Publishing process; its own poller skips these (they were delivered locally at once).
+    origin = models.CharField(max_length=32)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.channel} #{self.pk}"
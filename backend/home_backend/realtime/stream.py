@@ -0,0 +1,68 @@
+"""
+The realtime event stream: authentication and Server-Sent Events framing.
+
+Served by realtime.asgi in front of Django (see home_backend_site/asgi.py), so an idle connection is
+one suspended coroutine: no request thread, no database connection. Frames are
+`event: message` / `event: notification` with the JSON payload as `data`, plus `ready` on connect,
+`resync` when events were dropped for a slow client, `expired` when the access token runs out,
+and a comment heartbeat every REALTIME_HEARTBEAT_SECONDS.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .brokers import get_broker
+from .events import user_channel
+
+EVENTS_PATH = "/api/realtime/events/"
+RETRY_MILLISECONDS = 5000
+
+
+def authenticate(raw: str) -> tuple[int, float | None]:
+    """(user id, token expiry as a UNIX time) for a JWT access token; raises simplejwt errors."""
+    auth = JWTAuthentication()
+    try:
+        token = auth.get_validated_token(raw.encode())
+        return auth.get_user(token).pk, token.get("exp")
+    finally:
+        # Runs in a worker thread outside the request cycle; the stream itself never uses the DB.
+        close_old_connections()
+
+
+def _frame(event: dict) -> str:
+    data = json.dumps(event.get("data"), separators=(",", ":"), default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+async def event_frames(user_id: int, expires_at: float | None):
+    """SSE frames for one connection until the token expires (or the consumer stops iterating)."""
+    broker = get_broker()
+    heartbeat = getattr(settings, "REALTIME_HEARTBEAT_SECONDS", 20)
+    sub = broker.subscribe(user_channel(user_id))
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\nevent: ready\ndata: {{}}\n\n"
+        while True:
+            timeout = heartbeat
+            if expires_at is not None:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    yield "event: expired\ndata: {}\n\n"
+                    return
+                timeout = min(timeout, remaining)
+            event = await sub.get(timeout)
+            if sub.dropped:
+                # The client fell behind and lost events; it should refetch over REST.
+                sub.dropped = 0
+                yield "event: resync\ndata: {}\n\n"
+            if event is None:
+                yield ": ping\n\n"  # keeps proxies from closing an idle connection
+            else:
+                yield _frame(event)
+    finally:
+        broker.unsubscribe(sub)
@@ -0,0 +1,46 @@
+"""
+Short-lived, single-use tickets for opening the realtime event stream.
+
+Browsers' EventSource cannot send an Authorization header, and a JWT in the query string ends up
+in proxy and server access logs. Clients therefore exchange their access token for a ticket
+(POST /api/realtime/tickets/) and open the stream with `?ticket=`. A ticket works once and only
+for REALTIME_TICKET_SECONDS; the stream it opens still ends when the access token expires.
+
+Tickets live in the default cache, so with several ASGI workers that cache must be shared
+(Redis, database cache), not LocMemCache.
+"""
+
+from __future__ import annotations
+
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+TICKET_KEY_PREFIX = "realtime:ticket:"
+
+
+def ticket_ttl() -> int:
+    return getattr(settings, "REALTIME_TICKET_SECONDS", 30)
+
+
+def issue_ticket(user_id: int, expires_at: float | None) -> str:
+    """New ticket for `user_id`; `expires_at` is the access token's expiry (UNIX time)."""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(f"{TICKET_KEY_PREFIX}{ticket}", (user_id, expires_at), ticket_ttl())
+    return ticket
+
+
+def redeem_ticket(ticket: str) -> tuple[int, float | None] | None:
+    """(user id, token expiry) for a valid ticket, which is used up; None if unknown or expired."""
+    key = f"{TICKET_KEY_PREFIX}{ticket}"
+    try:
+        value = cache.get(key)
+        # delete() reports whether the key was still there, so of two concurrent redeems one wins.
+        if value is None or not cache.delete(key):
+            return None
+        return value
+    finally:
+        # Runs in a worker thread of the ASGI app; a database cache would leave a connection open.
+        close_old_connections()
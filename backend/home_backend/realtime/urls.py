@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("events/", views.event_stream, name="realtime-events"),
+    path("tickets/", views.StreamTicketView.as_view(), name="realtime-tickets"),
+]
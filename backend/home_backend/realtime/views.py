@@ -0,0 +1,31 @@
+"""
+Stream tickets, plus the fallback for the realtime event stream when Django itself serves it.
+
+The stream is handled by realtime.asgi before Django sees it; `event_stream` only answers when the
+site runs under WSGI (e.g. `manage.py runserver`), where a long-lived stream would tie up a worker.
+"""
+
+from django.http import JsonResponse
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .tickets import issue_ticket, ticket_ttl
+
+
+def event_stream(request):
+    return JsonResponse(
+        {"detail": "The event stream is served by the ASGI app (e.g. uvicorn home_backend_site.asgi:application)."},
+        status=501,
+    )
+
+
+class StreamTicketView(APIView):
+    """POST: a single-use ticket for GET /api/realtime/events/?ticket=… (see realtime.tickets)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        expires_at = request.auth.get("exp") if request.auth is not None else None
+        ticket = issue_ticket(request.user.pk, expires_at)
+        return Response({"ticket": ticket, "expires_in": ticket_ttl()})
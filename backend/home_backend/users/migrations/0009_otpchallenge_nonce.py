@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0008_customuser_country"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="otpchallenge",
+            name="nonce",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
@@ -43,6 +43,8 @@ class OtpChallenge(models.Model):
     email = models.EmailField(db_index=True)
     purpose = models.CharField(max_length=32, choices=Purpose.choices)
     code_hash = models.CharField(max_length=64)
+    # Random per challenge; the code is derived from it (see users.otp.challenge_code).
+    nonce = models.CharField(max_length=32, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     consumed_at = models.DateTimeField(null=True, blank=True)
@@ -4,10 +4,10 @@ import secrets
 from datetime import timedelta
 
 from django.conf import settings
-from django.core.mail import send_mail
 from django.utils import timezone
 
 from .models import CustomUser, OtpChallenge
+from .tasks import send_otp_email
 
 OTP_LENGTH = 6
 OTP_TTL_MINUTES = 10
@@ -19,8 +19,14 @@ def _digest(email: str, code: str) -> str:
     return hmac.new(settings.SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()
 
 
-def _generate_code() -> str:
-    return f"{secrets.randbelow(10 ** OTP_LENGTH):0{OTP_LENGTH}d}"
+def challenge_code(challenge: OtpChallenge) -> str:
+    """
+    The code for `challenge`, derived with SECRET_KEY so the mail job can rebuild it from the
+    challenge id instead of carrying it in its payload.
+    """
+    msg = f"otp-code:{challenge.pk}:{challenge.purpose}:{challenge.email}:{challenge.nonce}".encode()
+    digest = hmac.new(settings.SECRET_KEY.encode(), msg, hashlib.sha256).digest()
+    return f"{int.from_bytes(digest[:8], 'big') % 10 ** OTP_LENGTH:0{OTP_LENGTH}d}"
 
 
 def issue_otp(*, email: str, purpose: str) -> bool:
@@ -42,21 +48,16 @@ def issue_otp(*, email: str, purpose: str) -> bool:
         consumed_at__isnull=True,
     ).delete()
 
-    code = _generate_code()
-    now = timezone.now()
-    OtpChallenge.objects.create(
+    challenge = OtpChallenge.objects.create(
         email=email_norm,
         purpose=purpose,
-        code_hash=_digest(email_norm, code),
-        expires_at=now + timedelta(minutes=OTP_TTL_MINUTES),
+        nonce=secrets.token_hex(16),
+        expires_at=timezone.now() + timedelta(minutes=OTP_TTL_MINUTES),
     )
+    challenge.code_hash = _digest(email_norm, challenge_code(challenge))
+    challenge.save(update_fields=["code_hash"])
 
-    subject = "Your verification code"
-    body = (
-        f"Your code is {code}. It expires in {OTP_TTL_MINUTES} minutes.\n"
-        f"If you did not request this, you can ignore this message."
-    )
-    send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [email_norm], fail_silently=True)
+    send_otp_email.enqueue(challenge_id=challenge.pk)
     return True
 
 
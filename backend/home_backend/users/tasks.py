@@ -0,0 +1,30 @@
+"""Background jobs for accounts (see jobs.queue)."""
+
+from __future__ import annotations
+
+from django.utils import timezone
+
+from jobs.queue import task
+from notifications.tasks import send_email
+
+from .models import OtpChallenge
+
+
+@task("users.send_otp_email", max_attempts=5, backoff_seconds=30)
+def send_otp_email(*, challenge_id: int) -> None:
+    """
+    Mail the code for one OTP challenge. Only the challenge id is queued; the code is derived
+    again here, so it never sits in Job.payload.
+    """
+    from .otp import OTP_TTL_MINUTES, challenge_code
+
+    challenge = OtpChallenge.objects.filter(
+        pk=challenge_id, consumed_at__isnull=True, expires_at__gt=timezone.now()
+    ).first()
+    if challenge is None:
+        return  # used, expired or replaced by a newer code since the job was queued
+    body = (
+        f"Your code is {challenge_code(challenge)}. It expires in {OTP_TTL_MINUTES} minutes.\n"
+        f"If you did not request this, you can ignore this message."
+    )
+    send_email(subject="Your verification code", message=body, recipient_list=[challenge.email])
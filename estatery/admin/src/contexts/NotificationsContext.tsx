@@ -1,7 +1,8 @@
 "use client";
 
 /**
- * Polls /api/notifications/unread-count/ while authenticated and exposes
+ * Keeps the unread count fresh while authenticated (realtime stream, with polling of
+ * /api/notifications/unread-count/ as the fallback) and exposes
  * list refresh + mark-read for the admin notification bell and panel.
  */
 import * as React from "react";
@@ -10,8 +11,9 @@ import { api, getAccessToken } from "@/lib/api-client";
 import { fetchWithAuthRetry } from "@/lib/auth-session";
 import type { Notification } from "@/lib/notifications";
 import { mapApiNotification } from "@/lib/notifications";
+import { isRealtimeConnected, onRealtimeEvent } from "@/lib/realtime";
 
-/** Poll unread count so new notifications show up without a full page reload */
+/** Poll unread count so new notifications show up without a full page reload (skipped while the realtime stream is open) */
 const POLL_MS = 15_000;
 
 type NotificationsContextValue = {
@@ -102,7 +104,16 @@ export function NotificationsProvider({ children }: { children: React.ReactNode
     }
     void refreshUnreadCount();
     const retrySoon = window.setTimeout(() => void refreshUnreadCount(), 250);
-    const id = window.setInterval(() => void refreshUnreadCount(), POLL_MS);
+    const id = window.setInterval(() => {
+      if (!isRealtimeConnected()) void refreshUnreadCount();
+    }, POLL_MS);
+    const offNotification = onRealtimeEvent("notification", (data) => {
+      // Coalesced message alerts update an existing unread row; the count does not change.
+      if (data.coalesced) return;
+      setUnreadCount((n) => n + 1);
+      if (data.type === "message") setMessageUnreadCount((n) => n + 1);
+    });
+    const offResync = onRealtimeEvent("resync", () => void refreshUnreadCount());
     const onVisibleOrFocus = () => {
       if (document.visibilityState === "visible") void refreshUnreadCount();
     };
@@ -112,6 +123,8 @@ export function NotificationsProvider({ children }: { children: React.ReactNode
     return () => {
       window.clearTimeout(retrySoon);
       window.clearInterval(id);
+      offNotification();
+      offResync();
       document.removeEventListener("visibilitychange", onVisibleOrFocus);
       window.removeEventListener("focus", onWindowFocus);
     };
@@ -5,6 +5,8 @@
  */
 import type {
   ConversationSummary,
+  ThreadMessagesPage,
+  MessageSearchPage,
   HostAnalyticsResponse,
   HostCalendarResponse,
   HostClientDetailResponse,
@@ -98,7 +100,8 @@ export const api = {
       `${API_BASE}/calendar/events/?start=${encodeURIComponent(start)}&end=${encodeURIComponent(end)}`,
     scheduleEventDetail: (id: number) => `${API_BASE}/calendar/events/${id}/`,
     bookingReschedule: (id: number) => `${API_BASE}/bookings/${id}/reschedule/`,
-    hostPayments: (limit: number) => `${API_BASE}/host/payments/?limit=${limit}`,
+    hostPayments: (pageSize: number, cursor = "") =>
+      `${API_BASE}/host/payments/?page_size=${pageSize}&cursor=${encodeURIComponent(cursor)}`,
     /** Payments */
     markPaymentPaid: (id: number) => `${API_BASE}/payments/${id}/mark-paid/`,
     /** Reviews */
@@ -120,6 +123,10 @@ export const api = {
     messagesOpenConversation: `${API_BASE}/messages/conversations/open/`,
     messagesInConversation: (conversationId: number) =>
       `${API_BASE}/messages/conversations/${conversationId}/messages/`,
+    messagesSearch: `${API_BASE}/messages/search/`,
+    /** Server-Sent Events: new messages / notifications (single-use ?ticket= from realtimeTickets) */
+    realtimeEvents: `${API_BASE}/realtime/events/`,
+    realtimeTickets: `${API_BASE}/realtime/tickets/`,
     /** In-app notifications (authenticated) */
     notifications: `${API_BASE}/notifications/`,
     notificationsUnreadCount: `${API_BASE}/notifications/unread-count/`,
@@ -423,13 +430,26 @@ export async function deleteProperty(id: number): Promise<{ ok: boolean; message
   return { ok: true, message: msg };
 }
 
-/** GET /api/host/payments/?limit= — all scheduled booking payments on your properties. */
+/** GET /api/host/payments/ — scheduled booking payments on your properties, newest due first (up to `limit`). */
 export async function fetchHostPayments(limit = 500): Promise<HostPaymentsListResponse | null> {
-  const res = await fetch(api.endpoints.hostPayments(limit), {
-    headers: apiHeaders(true),
-  });
-  if (!res.ok) return null;
-  return res.json() as Promise<HostPaymentsListResponse>;
+  const pageSize = Math.min(limit, 500);
+  const payments: HostPaymentsListResponse["payments"] = [];
+  let summary: HostPaymentsListResponse["summary"] | undefined;
+  let cursor: string | null | undefined = null;
+  do {
+    const res = await fetch(api.endpoints.hostPayments(pageSize, cursor ?? ""), { headers: apiHeaders(true) });
+    if (!res.ok) return null;
+    const page = (await res.json()) as HostPaymentsListResponse;
+    summary = summary ?? page.summary;
+    payments.push(...(page.payments ?? []));
+    cursor = page.next_cursor;
+  } while (cursor && payments.length < limit);
+  return {
+    payments: payments.slice(0, limit),
+    summary: summary as HostPaymentsListResponse["summary"],
+    next_cursor: cursor ?? null,
+    has_more: Boolean(cursor),
+  };
 }
 
 /** GET /api/dashboard/host/ — aggregated host stats, charts, payments. */
@@ -453,16 +473,27 @@ export async function fetchHostAnalytics(
   return res.json() as Promise<HostAnalyticsResponse>;
 }
 
+/** Follows `next_cursor` until the calendar feed is exhausted and merges the pages. */
+async function fetchCalendarPages(baseUrl: string): Promise<HostCalendarResponse | null> {
+  const events: HostCalendarResponse["events"] = [];
+  let cursor: string | null | undefined = null;
+  do {
+    const url: string = cursor ? `${baseUrl}&cursor=${encodeURIComponent(cursor)}` : baseUrl;
+    const res = await fetch(url, { headers: apiHeaders(true) });
+    if (!res.ok) return null;
+    const page = (await res.json()) as HostCalendarResponse;
+    events.push(...(page.events ?? []));
+    cursor = page.next_cursor;
+  } while (cursor);
+  return { events, next_cursor: null, has_more: false };
+}
+
 /** GET /api/host/calendar/?start=&end= — booking nights on your properties (YYYY-MM-DD, inclusive). */
 export async function fetchHostCalendar(
   start: string,
   end: string
 ): Promise<HostCalendarResponse | null> {
-  const res = await fetch(api.endpoints.hostCalendar(start, end), {
-    headers: apiHeaders(true),
-  });
-  if (!res.ok) return null;
-  return res.json() as Promise<HostCalendarResponse>;
+  return fetchCalendarPages(api.endpoints.hostCalendar(start, end));
 }
 
 /** GET /api/admin/calendar/?start=&end= — all booking nights (platform admin). */
@@ -470,11 +501,7 @@ export async function fetchAdminCalendar(
   start: string,
   end: string
 ): Promise<HostCalendarResponse | null> {
-  const res = await fetch(api.endpoints.adminCalendar(start, end), {
-    headers: apiHeaders(true),
-  });
-  if (!res.ok) return null;
-  return res.json() as Promise<HostCalendarResponse>;
+  return fetchCalendarPages(api.endpoints.adminCalendar(start, end));
 }
 
 /** PATCH /api/bookings/:id/reschedule/ — host (listing owner) or platform admin. */
@@ -635,7 +662,7 @@ export async function deleteAdminDiscount(id: number): Promise<{ ok: boolean; me
   return { ok: true };
 }
 
-/** GET /api/messages/conversations/ */
+/** GET /api/messages/conversations/ (first cursor page; `{ next, previous, results }`) */
 export async function fetchMessageConversations(): Promise<ConversationSummary[]> {
   const res = await fetch(api.endpoints.messagesConversations, { headers: apiHeaders(true) });
   if (!res.ok) return [];
@@ -671,14 +698,48 @@ export async function openMessageConversation(
   return data as { conversation: ConversationSummary };
 }
 
-/** GET messages in a thread */
-export async function fetchConversationMessages(conversationId: number): Promise<ThreadMessage[]> {
-  const res = await fetch(api.endpoints.messagesInConversation(conversationId), {
-    headers: apiHeaders(true),
-  });
-  if (!res.ok) return [];
+export type ConversationMessagesQuery = { beforeId?: number; afterId?: number; limit?: number };
+
+/**
+ * GET one page of a thread, oldest first: the latest messages, `beforeId` for older history, or
+ * `afterId` for only what arrived since (polling). `has_more` = more beyond the page in that direction.
+ */
+export async function fetchConversationMessages(
+  conversationId: number,
+  query: ConversationMessagesQuery = {}
+): Promise<ThreadMessagesPage> {
+  const url = new URL(api.endpoints.messagesInConversation(conversationId));
+  if (query.beforeId) url.searchParams.set("before_id", String(query.beforeId));
+  if (query.afterId) url.searchParams.set("after_id", String(query.afterId));
+  if (query.limit) url.searchParams.set("limit", String(query.limit));
+  const res = await fetch(url.toString(), { headers: apiHeaders(true) });
+  if (!res.ok) return { results: [], has_more: false };
   const data = await res.json();
-  return Array.isArray(data) ? data : [];
+  return {
+    results: Array.isArray(data?.results) ? data.results : [],
+    has_more: Boolean(data?.has_more),
+  };
+}
+
+export type MessageSearchQuery = { conversationId?: number; cursor?: string | null; limit?: number };
+
+/** GET full-text search over your conversations (newest first); pass `next_cursor` for the next page. */
+export async function searchMessages(q: string, query: MessageSearchQuery = {}): Promise<MessageSearchPage> {
+  const empty: MessageSearchPage = { results: [], next_cursor: null, has_more: false };
+  if (!q.trim()) return empty;
+  const url = new URL(api.endpoints.messagesSearch);
+  url.searchParams.set("q", q.trim());
+  if (query.conversationId) url.searchParams.set("conversation", String(query.conversationId));
+  if (query.cursor) url.searchParams.set("cursor", query.cursor);
+  if (query.limit) url.searchParams.set("limit", String(query.limit));
+  const res = await fetch(url.toString(), { headers: apiHeaders(true) });
+  if (!res.ok) return empty;
+  const data = await res.json();
+  return {
+    results: Array.isArray(data?.results) ? data.results : [],
+    next_cursor: data?.next_cursor ?? null,
+    has_more: Boolean(data?.has_more),
+  };
 }
 
 /** POST a text message */
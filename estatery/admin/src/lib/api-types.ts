@@ -61,9 +61,19 @@ export type PropertyStatusApi = "available" | "rented" | "maintenance";
 
 export type PropertyConditionApi = "newly_built" | "fairly_used" | "used";
 
+export type PropertyImageSize = "thumb" | "card" | "full";
+
 export type PropertyImage = {
   id?: number;
   image: string;
+  image_url?: string | null;
+  /** Per-size URLs; all point at the original upload while `processing` is true. */
+  image_urls?: Record<PropertyImageSize, string> | null;
+  processing?: boolean;
+  /** `data:image/webp;base64,…` (~20 px) to show blurred until the real image loads; "" if unknown. */
+  placeholder?: string;
+  /** "#rrggbb", or "" if unknown. */
+  dominant_color?: string;
   is_primary?: boolean;
 };
 
@@ -154,6 +164,8 @@ export type Booking = {
   property_title?: string;
   property_address?: string;
   property_image?: string;
+  property_image_placeholder?: string;
+  property_image_color?: string;
   user?: number;
   user_name?: string;
   user_email?: string;
@@ -235,6 +247,8 @@ export type AdminBookingRow = {
   property_address?: string;
   property_city?: string;
   property_image?: string | null;
+  property_image_placeholder?: string;
+  property_image_color?: string;
   user_name?: string;
   user_email?: string;
   host_name?: string;
@@ -318,6 +332,8 @@ export type MessageParticipant = {
 };
 
 export type ConversationLastMessage = {
+  id: number | null;
+  /** Preview: first 200 characters, "…" when cut. */
   body: string;
   created_at: string;
   sender_id: number;
@@ -327,6 +343,10 @@ export type ConversationSummary = {
   id: number;
   other_user: MessageParticipant | null;
   last_message: ConversationLastMessage | null;
+  /** Messages from the other user you have not opened yet. */
+  unread_count: number;
+  /** Id of the newest message you have seen (read cursor). */
+  read_up_to: number | null;
   updated_at: string;
 };
 
@@ -339,6 +359,23 @@ export type ThreadMessage = {
   created_at: string;
 };
 
+export type ThreadMessagesPage = {
+  results: ThreadMessage[];
+  has_more: boolean;
+};
+
+export type MessageSearchHit = ThreadMessage & {
+  /** HTML-escaped excerpt; matches wrapped in <mark>…</mark>. */
+  snippet: string;
+  other_user: { id: number; username: string } | null;
+};
+
+export type MessageSearchPage = {
+  results: MessageSearchHit[];
+  next_cursor: string | null;
+  has_more: boolean;
+};
+
 /* ---- Host dashboard (GET /api/dashboard/host/) ---- */
 
 export type HostDashboardProperties = {
@@ -414,11 +451,15 @@ export type HostPaymentsSummary = {
   overdue: number;
   cancelled: number;
   refunded: number;
+  outstanding_amount?: string;
 };
 
 export type HostPaymentsListResponse = {
   payments: HostRecentPaymentRow[];
+  /** Sent on the first page (or with ?summary=1). */
   summary: HostPaymentsSummary;
+  next_cursor?: string | null;
+  has_more?: boolean;
 };
 
 /** Admin promo codes — GET/POST /api/admin/discounts/, PATCH/DELETE /api/admin/discounts/:id/ */
@@ -521,6 +562,9 @@ export type HostCalendarEventApi = {
 
 export type HostCalendarResponse = {
   events: HostCalendarEventApi[];
+  /** Keyset cursor for the next page; null on the last page. */
+  next_cursor?: string | null;
+  has_more?: boolean;
 };
 
 export type HostClientsSummary = {
@@ -582,6 +626,20 @@ export type HostClientDetailResponse = {
   transactions: HostClientTransactionApi[];
 };
 
+/** Outstanding installments per due month and listing currency (decimal strings). */
+export type CashflowProjection = {
+  months: number;
+  weighted: boolean;
+  labels: string[];
+  currencies: string[];
+  series: Record<string, { amount: string[]; expected?: string[] }>;
+  totals: Record<
+    string,
+    { amount: string; overdue_amount: string; expected?: string; overdue_expected?: string }
+  >;
+  probabilities?: Record<string, number>;
+};
+
 export type HostDashboardResponse = {
   properties: HostDashboardProperties;
   bookings: HostDashboardBookings;
@@ -592,4 +650,5 @@ export type HostDashboardResponse = {
   activity_chart: HostActivityChart;
   comparison: HostDashboardComparison;
   currency: string;
+  cashflow?: CashflowProjection;
 };
@@ -10,6 +10,8 @@ export type Notification = {
   time: string;
   unread: boolean;
   body: string;
+  /** Messages coalesced into this alert (1 for everything else). */
+  count?: number;
   action_href?: string;
   action_label?: string;
   created_at?: string;
@@ -26,6 +28,7 @@ export function mapApiNotification(raw: Record<string, unknown>): Notification {
     type,
     title: String(raw.title ?? ""),
     body: String(raw.body ?? ""),
+    count: typeof raw.count === "number" ? raw.count : 1,
     time: String(raw.time ?? ""),
     unread: Boolean(raw.unread),
     action_href: raw.action_href ? String(raw.action_href) : undefined,
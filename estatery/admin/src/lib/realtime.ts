@@ -0,0 +1,134 @@
+/**
+ * One shared Server-Sent Events connection per tab to GET /api/realtime/events/.
+ * Components register with onRealtimeEvent(); the stream opens with the first listener and closes
+ * with the last. Polling stays as the fallback: check isRealtimeConnected() before polling.
+ * After a reconnect a "resync" event is dispatched, since events sent while offline are not replayed.
+ * Every (re)connect first trades the access token for a single-use ticket, so no JWT goes in the URL.
+ */
+import { api, getAccessToken } from "@/lib/api-client";
+import {
+  isAccessTokenExpired,
+  persistRefreshedTokens,
+  readStoredAuth,
+  refreshAccessToken,
+} from "@/lib/auth-session";
+
+export type RealtimeEventType = "message" | "notification" | "resync";
+type RealtimeHandler = (data: Record<string, unknown>) => void;
+
+const RECONNECT_MS = 5_000;
+const EVENT_TYPES: RealtimeEventType[] = ["message", "notification", "resync"];
+
+const listeners = new Map<RealtimeEventType, Set<RealtimeHandler>>();
+let source: EventSource | null = null;
+let connected = false;
+let everConnected = false;
+let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+
+function listenerCount(): number {
+  let n = 0;
+  listeners.forEach((set) => (n += set.size));
+  return n;
+}
+
+function dispatch(type: RealtimeEventType, data: Record<string, unknown>) {
+  listeners.get(type)?.forEach((handler) => handler(data));
+}
+
+async function currentToken(): Promise<string | null> {
+  const token = getAccessToken();
+  if (token && !isAccessTokenExpired(token)) return token;
+  const stored = readStoredAuth();
+  if (!stored?.refresh) return null;
+  const next = await refreshAccessToken(stored.refresh);
+  if (!next?.access) return null;
+  persistRefreshedTokens(stored.storage, next);
+  return next.access;
+}
+
+/** Exchange the access token for a single-use stream ticket, so the JWT never goes in a URL. */
+async function streamTicket(): Promise<string | null> {
+  const token = await currentToken();
+  if (!token) return null;
+  try {
+    const res = await fetch(api.endpoints.realtimeTickets, {
+      method: "POST",
+      headers: { Accept: "application/json", Authorization: `Bearer ${token}` },
+    });
+    if (!res.ok) return null;
+    const data = (await res.json()) as { ticket?: unknown };
+    return typeof data.ticket === "string" ? data.ticket : null;
+  } catch {
+    return null;
+  }
+}
+
+function scheduleReconnect() {
+  if (reconnectTimer || listenerCount() === 0) return;
+  reconnectTimer = setTimeout(() => {
+    reconnectTimer = null;
+    void connect();
+  }, RECONNECT_MS);
+}
+
+function disconnect() {
+  if (reconnectTimer) clearTimeout(reconnectTimer);
+  reconnectTimer = null;
+  source?.close();
+  source = null;
+  connected = false;
+}
+
+async function connect() {
+  if (source || typeof window === "undefined" || typeof EventSource === "undefined") return;
+  const ticket = await streamTicket();
+  if (!ticket || source || listenerCount() === 0) {
+    if (!ticket) scheduleReconnect();
+    return;
+  }
+  const es = new EventSource(`${api.endpoints.realtimeEvents}?ticket=${encodeURIComponent(ticket)}`);
+  source = es;
+  es.addEventListener("ready", () => {
+    connected = true;
+    if (everConnected) dispatch("resync", {});
+    everConnected = true;
+  });
+  for (const type of EVENT_TYPES) {
+    es.addEventListener(type, (ev) => {
+      try {
+        dispatch(type, JSON.parse((ev as MessageEvent).data) as Record<string, unknown>);
+      } catch {
+        /* malformed frame */
+      }
+    });
+  }
+  const restart = () => {
+    es.close();
+    if (source === es) source = null;
+    connected = false;
+    scheduleReconnect();
+  };
+  // Token ran out: reconnect with a new ticket (EventSource would retry with the used one).
+  es.addEventListener("expired", restart);
+  es.onerror = () => {
+    // Tickets are single-use, so EventSource's own retry with the same URL cannot succeed.
+    restart();
+  };
+}
+
+/** Subscribe to one event type; returns the unsubscribe function. */
+export function onRealtimeEvent(type: RealtimeEventType, handler: RealtimeHandler): () => void {
+  let set = listeners.get(type);
+  if (!set) listeners.set(type, (set = new Set()));
+  set.add(handler);
+  void connect();
+  return () => {
+    set?.delete(handler);
+    if (listenerCount() === 0) disconnect();
+  };
+}
+
+/** True while the stream is open; pollers can skip their interval fetches. */
+export function isRealtimeConnected(): boolean {
+  return connected;
+}
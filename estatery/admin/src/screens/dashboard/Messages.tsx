@@ -27,6 +27,7 @@ import {
   postConversationMessage,
 } from "@/lib/api-client";
 import type { ConversationSummary, ThreadMessage } from "@/lib/api-types";
+import { isRealtimeConnected, onRealtimeEvent } from "@/lib/realtime";
 
 function useQuery() {
   const { search } = useLocation();
@@ -69,6 +70,8 @@ export default function Messages() {
   const [newUsername, setNewUsername] = React.useState("");
   const [listLoading, setListLoading] = React.useState(true);
   const [threadLoading, setThreadLoading] = React.useState(false);
+  const [hasOlder, setHasOlder] = React.useState(false);
+  const [loadingOlder, setLoadingOlder] = React.useState(false);
   const [listError, setListError] = React.useState<string | null>(null);
   const [sendError, setSendError] = React.useState<string | null>(null);
   const [opening, setOpening] = React.useState(false);
@@ -96,7 +99,9 @@ export default function Messages() {
 
   React.useEffect(() => {
     if (!isAuthenticated) return;
-    const t = setInterval(() => void loadConversations(), 15000);
+    const t = setInterval(() => {
+      if (!isRealtimeConnected()) void loadConversations();
+    }, 15000);
     return () => clearInterval(t);
   }, [isAuthenticated, loadConversations]);
 
@@ -104,8 +109,9 @@ export default function Messages() {
     async (conversationId: number) => {
       setThreadLoading(true);
       try {
-        const msgs = await fetchConversationMessages(conversationId);
-        setThread(msgs);
+        const page = await fetchConversationMessages(conversationId);
+        setThread(page.results);
+        setHasOlder(page.has_more);
         void refreshUnreadCount();
       } finally {
         setThreadLoading(false);
@@ -114,15 +120,68 @@ export default function Messages() {
     [refreshUnreadCount]
   );
 
+  const threadRef = React.useRef<ThreadMessage[]>([]);
+  threadRef.current = thread;
+
+  /** Poll only for messages newer than the last one on screen. */
+  const pollThread = React.useCallback(
+    async (conversationId: number) => {
+      const last = threadRef.current[threadRef.current.length - 1];
+      if (!last) return loadThread(conversationId);
+      const page = await fetchConversationMessages(conversationId, { afterId: last.id });
+      if (page.results.length === 0) return;
+      setThread((prev) => {
+        const seen = new Set(prev.map((m) => m.id));
+        return [...prev, ...page.results.filter((m) => !seen.has(m.id))];
+      });
+      void refreshUnreadCount();
+    },
+    [loadThread, refreshUnreadCount]
+  );
+
+  const loadOlder = async () => {
+    const first = thread[0];
+    if (!selectedId || !first) return;
+    setLoadingOlder(true);
+    try {
+      const page = await fetchConversationMessages(selectedId, { beforeId: first.id });
+      setThread((prev) => [...page.results, ...prev]);
+      setHasOlder(page.has_more);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   React.useEffect(() => {
     if (!selectedId) {
       setThread([]);
+      setHasOlder(false);
       return;
     }
+    setThread([]);
     void loadThread(selectedId);
-    const poll = setInterval(() => void loadThread(selectedId), 5000);
+    const poll = setInterval(() => {
+      if (!isRealtimeConnected()) void pollThread(selectedId);
+    }, 5000);
     return () => clearInterval(poll);
-  }, [selectedId, loadThread]);
+  }, [selectedId, loadThread, pollThread]);
+
+  /* Pushed messages: fetch what is new in the open thread, refresh the inbox order. */
+  React.useEffect(() => {
+    if (!isAuthenticated) return;
+    const offMessage = onRealtimeEvent("message", (data) => {
+      if (selectedId && data.conversation === selectedId) void pollThread(selectedId);
+      void loadConversations();
+    });
+    const offResync = onRealtimeEvent("resync", () => {
+      if (selectedId) void pollThread(selectedId);
+      void loadConversations();
+    });
+    return () => {
+      offMessage();
+      offResync();
+    };
+  }, [isAuthenticated, selectedId, pollThread, loadConversations]);
 
   /* Deep link: ?username= or ?userId= — open once */
   React.useEffect(() => {
@@ -197,6 +256,7 @@ export default function Messages() {
 
   const selectConversation = (id: number) => {
     setSelectedId(id);
+    setConversations((prev) => prev.map((c) => (c.id === id ? { ...c, unread_count: 0 } : c)));
     navigate(`/dashboard/messages?conversationId=${id}`);
   };
 
@@ -214,6 +274,7 @@ export default function Messages() {
             ? {
                 ...c,
                 last_message: {
+                  id: msg.id,
                   body: msg.body.slice(0, 200),
                   created_at: msg.created_at,
                   sender_id: msg.sender_id,
@@ -252,9 +313,11 @@ export default function Messages() {
     }
   };
 
+  // Follow new messages only; prepending older history keeps the scroll position.
+  const lastMessageId = thread[thread.length - 1]?.id;
   React.useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
-  }, [thread]);
+  }, [lastMessageId]);
 
   const handleKeyDown: React.KeyboardEventHandler<HTMLTextAreaElement> = (e) => {
     if (e.key === "Enter" && !e.shiftKey) {
@@ -378,6 +441,11 @@ export default function Messages() {
                           <p className="text-xs italic text-[#94a3b8]">No messages yet</p>
                         )}
                       </div>
+                      {c.unread_count > 0 && !active && (
+                        <span className="flex min-w-5 shrink-0 items-center justify-center rounded-full bg-[var(--logo)] px-1.5 text-[10px] font-semibold leading-5 text-white">
+                          {c.unread_count > 99 ? "99+" : c.unread_count}
+                        </span>
+                      )}
                       <ChevronRight
                         className={cn(
                           "size-4 shrink-0 text-[#cbd5e1]",
@@ -446,6 +514,20 @@ export default function Messages() {
                 </div>
               ) : (
                 <div className="space-y-4">
+                  {hasOlder && (
+                    <div className="flex justify-center">
+                      <Button
+                        type="button"
+                        size="sm"
+                        variant="outline"
+                        disabled={loadingOlder}
+                        onClick={() => void loadOlder()}
+                        className="rounded-xl text-xs"
+                      >
+                        {loadingOlder ? "Loading…" : "Load earlier messages"}
+                      </Button>
+                    </div>
+                  )}
                   {thread.map((m) => {
                     const isMe = m.sender_id === user?.id;
                     return (